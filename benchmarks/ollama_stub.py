@@ -0,0 +1,90 @@
+"""
+Ollama Stub
+
+A local stand-in for the Ollama generate API, so benchmarks measure the
+transcription pipeline and not the LLM. It answers /api/generate with a short
+canned summary streamed as NDJSON, the way Ollama does, after an optional
+fixed delay.
+
+Example:
+    >>> from ollama_stub import OllamaStub
+    >>> with OllamaStub() as stub:
+    ...     settings["ollama_host"] = stub.url
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_SUMMARY = "### Summary\nBenchmark summary.\n### Notes\n- 🧪 Produced by the Ollama stub\n"
+
+class OllamaStub:
+    def __init__(self, delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            delay: Seconds to wait before answering each generate request
+            host: Interface to bind to
+            port: Port to bind to; 0 picks a free port
+        """
+        self.delay = delay
+        self.requests = 0
+        # Bodies of all generate requests, in the order they arrived
+        self.received = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ollama-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OllamaStub":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                    stub.received.append(request)
+
+                # Warm-up requests carry no prompt and get an empty answer
+                words = CANNED_SUMMARY.split(" ") if request.get("prompt") else []
+                if words and stub.delay:
+                    time.sleep(stub.delay)
+                lines = [{"response": word + " ", "done": False} for word in words]
+                lines.append({"response": "", "done": True})
+                body = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,299 @@
+"""
+Transcription Benchmark Suite
+
+Benchmarks TranscriptionManager offline on audio fixtures for every
+combination of model size and compute_type, and reports wall time, model load
+time, real-time factor, segments per second and peak RSS. Summaries go to a
+local Ollama stub, so only the transcription pipeline is measured.
+
+Every case runs in a fresh process, so peak RSS and model load time are not
+skewed by the cases before it. Results are written to JSON; pass a previous
+results file as --baseline to flag regressions (the exit code is 1 if any
+case got slower or bigger than --threshold allows).
+
+Fixtures are the audio files in --fixtures or, by default, generated
+speech-like clips (see autotune.generate_reference_clip) of --lengths seconds.
+Generated clips contain no words, so their transcripts are meaningless; they
+exercise decoding, VAD and the decoder loop the same way on every machine.
+
+Example:
+    $ python benchmarks/run.py --models tiny base --compute-types int8 float32 \\
+          --lengths 30 300 --output results.json
+    $ python benchmarks/run.py --models tiny base --compute-types int8 float32 \\
+          --lengths 30 300 --output new.json --baseline results.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+import numpy as np
+from audio_processor import SAMPLE_RATE, PCM_EXTENSION
+from autotune import generate_reference_clip, load_reference_clip
+from utils import create_temp_audio_file, cleanup_temp_file
+from ollama_stub import OllamaStub
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is reported as null there
+    resource = None
+
+DEFAULT_LENGTHS = [30, 120, 600]
+DEFAULT_THRESHOLD = 0.10
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm", PCM_EXTENSION)
+
+# Seconds between checks that a benchmark process is still alive
+RESULT_POLL_SECONDS = 1
+
+# Metrics compared against the baseline; all of them are "lower is better"
+COMPARED_METRICS = ("real_time_factor", "wall_seconds", "peak_rss_mb")
+
+def load_fixtures(fixtures_dir: Optional[str], lengths: List[float]) -> List[dict]:
+    """
+    List the fixtures to benchmark on.
+
+    Returns:
+        List[dict]: {'name', 'path'} for files, {'name', 'seconds'} for generated clips
+    """
+    if fixtures_dir:
+        names = sorted(name for name in os.listdir(fixtures_dir) if name.lower().endswith(AUDIO_EXTENSIONS))
+        if not names:
+            raise SystemExit(f"No audio fixtures found in {fixtures_dir}")
+        return [{'name': name, 'path': os.path.join(fixtures_dir, name)} for name in names]
+    return [{'name': f"generated-{seconds:g}s", 'seconds': seconds} for seconds in lengths]
+
+def fixture_audio(fixture: dict) -> np.ndarray:
+    if 'path' in fixture:
+        return load_reference_clip(fixture['path'])
+    return generate_reference_clip(fixture['seconds'])
+
+def write_pcm(audio: np.ndarray) -> str:
+    """Write samples as the 16 kHz s16le file the pipeline transcribes"""
+    path = create_temp_audio_file() + PCM_EXTENSION
+    (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tofile(path)
+    return path
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_case(case: dict, settings: dict, models_dir: str, repeat: int, results) -> None:
+    """Benchmark one fixture/model/compute_type case; runs in its own process"""
+    from transcription import TranscriptionManager
+    from metrics import track_job
+
+    try:
+        audio = fixture_audio(case['fixture'])
+        audio_seconds = len(audio) / SAMPLE_RATE
+        manager = TranscriptionManager(models_dir, {
+            **settings, 'model': case['model'], 'compute_type': case['compute_type']
+        })
+
+        start = time.perf_counter()
+        manager.load_models()
+        load_seconds = time.perf_counter() - start
+
+        runs = []
+        for _ in range(repeat):
+            manager.temp_audio_file = write_pcm(audio)
+            try:
+                with track_job() as timings:
+                    start = time.perf_counter()
+                    segments, _language = manager.transcribe_segments()
+                    transcribed = time.perf_counter() - start
+                    manager.send_to_ollama(manager.format_transcription(segments))
+                    wall = time.perf_counter() - start
+            finally:
+                cleanup_temp_file(manager.temp_audio_file)
+            runs.append({
+                'wall_seconds': wall,
+                'transcription_seconds': transcribed,
+                'segments': len(segments),
+                'stages': timings,
+            })
+
+        # Median run by wall time, so one noisy repeat does not decide the result
+        median = sorted(runs, key=lambda run: run['wall_seconds'])[len(runs) // 2]
+        results.put({
+            **case,
+            'audio_seconds': audio_seconds,
+            'model_load_seconds': load_seconds,
+            'wall_seconds': median['wall_seconds'],
+            'wall_seconds_all': [run['wall_seconds'] for run in runs],
+            'real_time_factor': median['transcription_seconds'] / audio_seconds if audio_seconds else None,
+            'segments': median['segments'],
+            'segments_per_second': median['segments'] / median['transcription_seconds'],
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': median['stages'],
+        })
+    except Exception as e:
+        results.put({**case, 'error': str(e)})
+
+def run_isolated(case: dict, settings: dict, models_dir: str, repeat: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_case, args=(case, settings, models_dir, repeat, results))
+    process.start()
+    result = None
+    try:
+        # A case that crashes (e.g. killed for running out of memory) never puts a result
+        while result is None and process.is_alive():
+            try:
+                result = results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                pass
+        if result is None:
+            # The result may have been flushed just before the process exited
+            try:
+                result = results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                pass
+    finally:
+        process.join()
+    if result is None:
+        return {**case, 'error': f"Benchmark process exited with code {process.exitcode} without a result"}
+    if process.exitcode and 'error' not in result:
+        result['error'] = f"Benchmark process exited with code {process.exitcode}"
+    return result
+
+def case_key(result: dict) -> tuple:
+    return (result['fixture']['name'], result['model'], result['compute_type'], result['device'])
+
+def compare(results: List[dict], baseline: dict, threshold: float) -> List[dict]:
+    """
+    Compare results with a previous run.
+
+    Returns:
+        List[dict]: One entry per metric that got worse by more than threshold
+    """
+    previous = {case_key(result): result for result in baseline['results'] if 'error' not in result}
+    regressions = []
+    for result in results:
+        old = previous.get(case_key(result))
+        if not old or 'error' in result:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change > threshold:
+                regressions.append({
+                    'case': "/".join(case_key(result)),
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': change,
+                })
+    return regressions
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    try:
+        from importlib.metadata import version
+        faster_whisper_version = version("faster-whisper")
+    except Exception:
+        faster_whisper_version = None
+    return {
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'commit': commit,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'faster_whisper': faster_whisper_version,
+    }
+
+def main() -> int:
+    from config import config
+
+    parser = argparse.ArgumentParser(description='Benchmark the transcription pipeline')
+    parser.add_argument('--models', nargs='+', default=["tiny", "base"], help='Whisper model sizes')
+    parser.add_argument('--compute-types', nargs='+', default=["int8"], help='CTranslate2 compute types')
+    parser.add_argument('--device', type=str, default=config.settings["device"], help='cpu or cuda')
+    parser.add_argument('--fixtures', type=str, default=None, help='Directory with audio fixtures')
+    parser.add_argument('--lengths', nargs='+', type=float, default=DEFAULT_LENGTHS,
+                        help='Lengths in seconds of the generated clips (without --fixtures)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the median is reported')
+    parser.add_argument('--ollama-delay', type=float, default=0.0,
+                        help='Seconds the Ollama stub waits before answering')
+    parser.add_argument('--output', type=str, default=None, help='Write the results to this JSON file')
+    parser.add_argument('--baseline', type=str, default=None, help='Previous results to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown flagged as a regression (0.1 = 10%%)')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures, args.lengths)
+    cases = [
+        {'fixture': fixture, 'model': model, 'compute_type': compute_type, 'device': args.device}
+        for fixture in fixtures
+        for model in args.models
+        for compute_type in args.compute_types
+    ]
+
+    results = []
+    with OllamaStub(args.ollama_delay) as stub:
+        settings = {
+            **config.settings,
+            'device': args.device,
+            'parallelism': 1,
+            'ollama_host': stub.url,
+            'ollama_retries': 0,
+        }
+        for i, case in enumerate(cases, 1):
+            label = "/".join(case_key(case))
+            print(f"[{i}/{len(cases)}] {label}", flush=True)
+            result = run_isolated(case, settings, config.models_dir, max(1, args.repeat))
+            if 'error' in result:
+                print(f"    failed: {result['error']}")
+            else:
+                rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "n/a"
+                print(f"    wall {result['wall_seconds']:.2f}s  load {result['model_load_seconds']:.2f}s  "
+                      f"RTF {result['real_time_factor']:.3f}  {result['segments_per_second']:.1f} seg/s  "
+                      f"peak RSS {rss}")
+            results.append(result)
+
+    report = {'environment': environment(), 'results': results}
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['baseline'] = {'path': args.baseline, 'environment': baseline.get('environment')}
+        report['regressions'] = compare(results, baseline, args.threshold)
+        for regression in report['regressions']:
+            print(f"REGRESSION {regression['case']} {regression['metric']}: "
+                  f"{regression['baseline']:.3f} -> {regression['current']:.3f} ({regression['change']:+.0%})")
+        if report['regressions']:
+            exit_code = 1
+        else:
+            print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Saved results to {args.output}")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,81 @@
 import sys
 sys.path.append('src')
-import tkinter as tk
-from src.gui import URLProcessorApp
-from src.api import start_api
 import argparse
 
+# The GUI, the API and their dependencies are imported only for the mode being started
+
+def run_autotune(clip_path=None):
+    from autotune import autotune
+    from config import config
+
+    def report(message, progress=None):
+        print(message)
+
+    best = autotune(config.models_dir, config.settings, clip_path, report)
+    print(f"{'compute_type':<14}{'cpu_threads':>12}{'num_workers':>12}{'x real time':>13}")
+    for result in sorted(best['results'], key=lambda r: r['throughput'], reverse=True):
+        print(f"{result['compute_type']:<14}{result['cpu_threads']:>12}{result['num_workers']:>12}{result['throughput']:>13.2f}")
+
+    config.update_settings({
+        'compute_type': best['compute_type'],
+        'cpu_threads': best['cpu_threads'],
+        'num_workers': best['num_workers'],
+        # The tuned values are ignored when the settings are used on another device
+        'tuned_device': best['device']
+    })
+    print(f"Saved tuned settings to {config.settings_file}")
+
+def run_startup_profile(mode, budget=None):
+    from startup_profile import profile_startup
+
+    try:
+        report = profile_startup(mode, budget)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    print(f"{'package':<40}{'seconds':>10}")
+    for package, seconds in report['slowest']:
+        print(f"{package:<40}{seconds:>10.3f}")
+    print(f"Startup imports ({mode}): {report['import_seconds']:.3f}s "
+          f"(budget {report['budget_seconds']:.3f}s, {report['wall_seconds']:.3f}s with interpreter start)")
+    if report['heavy_modules']:
+        print(f"Heavy modules imported at startup: {', '.join(report['heavy_modules'])}")
+    if not report['within_budget']:
+        print("Startup budget exceeded")
+        sys.exit(1)
+
 def main():
     parser = argparse.ArgumentParser(description='URL Processor Application')
     parser.add_argument('--api', action='store_true', help='Run in API mode')
     parser.add_argument('--port', type=int, default=5000, help='Port for API server')
     parser.add_argument('--host', type=str, default='0.0.0.0', help='Host for API server')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Run the API on gunicorn with this many worker processes')
+    parser.add_argument('--autotune', action='store_true',
+                        help='Benchmark compute_type, cpu_threads and num_workers and save the fastest')
+    parser.add_argument('--autotune-clip', type=str, default=None,
+                        help='Audio file to benchmark on instead of the generated reference clip')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='Measure the startup import time of the GUI (or the API with --api) against a budget')
+    parser.add_argument('--startup-budget', type=float, default=None,
+                        help='Startup import time budget in seconds for --startup-profile')
     
     args = parser.parse_args()
     
-    if args.api:
+    if args.startup_profile:
+        run_startup_profile('api' if args.api else 'gui', args.startup_budget)
+    elif args.autotune:
+        run_autotune(args.autotune_clip)
+    elif args.api and args.workers:
+        from server import run_server
+        run_server(host=args.host, port=args.port, workers=args.workers)
+    elif args.api:
+        from api import start_api
         print(f"Starting API server on {args.host}:{args.port}")
         start_api(host=args.host, port=args.port)
     else:
+        import tkinter as tk
+        from gui import URLProcessorApp
         root = tk.Tk()
         app = URLProcessorApp(root)
         root.mainloop()
@@ -1,10 +1,22 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import parse_form_data
+import hashlib
+import io
+import json
+import os
+import re
 from flask_cors import CORS
-from transcription import TranscriptionManager
-from audio_processor import AudioProcessor
+from jobs import JobManager, JobStatus
+from job_store import JobStore
+from audio_processor import AudioProcessor, AudioDownloadError, CONTENT_ID_PREFIX
+from utils import create_temp_audio_file, cleanup_temp_dir
+from transcript_store import TranscriptStore, TranscriptStoreError
+from segments import FORMATS
+from summarizer import get_client
+import metrics
 from config import config
 from logger import logger
-import os
 
 app = Flask(__name__)
 CORS(app, resources={
@@ -20,46 +32,296 @@ CORS(app, resources={
     }
 })
 
-# Initialize managers
-transcription_manager = TranscriptionManager(config.models_dir, config.settings)
-audio_processor = AudioProcessor(config.settings.get("ffmpeg_path"))
+transcript_store = TranscriptStore.from_settings(config.data_dir, config.settings)
+# Runs the jobs. Only the process that runs them builds a JobManager (with its
+# caches and models), in start_api(); the HTTP workers of the multi-process
+# server get a RemoteJobManager that hands the jobs to the inference process.
+job_manager = None
+
+def get_request_data():
+    """Return the request payload for both JSON and form data"""
+    logger.info(f"Received request: {request.data}")
+    if request.is_json:
+        data = request.get_json()
+    else:
+        data = request.form.to_dict()
+    logger.info(f"Processed request data: {data}")
+    return data
+
+def get_job_options(data):
+    """
+    Extract per-job setting overrides from the request payload.
+
+    Raises:
+        ValueError: If an override has an unsupported value
+    """
+    options = {}
+    model = data.get('model')
+    if model:
+        if model not in config.AVAILABLE_MODELS:
+            raise ValueError(f"Unsupported model '{model}'. Available models: {', '.join(config.AVAILABLE_MODELS)}")
+        options['model'] = model
+    return options
+
+# Extensions of uploaded files are kept so ffmpeg and PyAV can pick the demuxer
+UPLOAD_EXTENSION = re.compile(r"^\.[A-Za-z0-9]{1,10}$")
+
+class UploadFile(io.FileIO):
+    """Destination of an uploaded file that hashes the content while it is written"""
+
+    def __init__(self, path: str):
+        super().__init__(path, 'w+b')
+        self.path = path
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data) -> int:
+        view = memoryview(data)
+        self.sha256.update(view)
+        written = 0
+        while written < len(view):
+            written += super().write(view[written:])
+        return written
+
+def receive_upload():
+    """
+    Parse a multipart upload, streaming every file straight to a temporary file.
+
+    Werkzeug hands the parts over in chunks, so the upload is never held in
+    memory as a whole and never copied once received.
+
+    Returns:
+        Tuple[dict, Optional[UploadFile], str]: The form fields, the file sent as
+        'file' (closed) and its original file name
+    """
+    uploads = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        extension = os.path.splitext(filename or "")[1]
+        path = create_temp_audio_file() + (extension if UPLOAD_EXTENSION.match(extension) else "")
+        upload = UploadFile(path)
+        uploads.append(upload)
+        return upload
+
+    max_bytes = int(config.settings.get("upload_max_mb", 4096)) * 1024 * 1024
+    try:
+        _, form, files = parse_form_data(
+            request.environ, stream_factory=stream_factory, max_content_length=max_bytes, silent=False
+        )
+    except Exception:
+        for upload in uploads:
+            upload.close()
+            cleanup_temp_dir(upload.path)
+        raise
+
+    storage = files.get('file')
+    kept = storage.stream if storage and storage.filename else None
+    for upload in uploads:
+        upload.close()
+        if upload is not kept:
+            cleanup_temp_dir(upload.path)
+    return form.to_dict(), kept, storage.filename if kept else ""
+
+@app.route('/upload', methods=['POST'])
+def upload_file():
+    """Transcribe an uploaded audio or video file (multipart field 'file')"""
+    try:
+        data, upload, filename = receive_upload()
+    except RequestEntityTooLarge:
+        return jsonify({'error': f"File larger than {config.settings.get('upload_max_mb', 4096)} MB"}), 413
+    except Exception as e:
+        logger.error("Error receiving upload: %s", str(e), exc_info=True)
+        return jsonify({'error': f"Invalid upload: {str(e)}"}), 400
+    if not upload:
+        error_msg = "Missing 'file' in multipart request"
+        logger.error(error_msg)
+        return jsonify({'error': error_msg}), 400
+
+    try:
+        options = get_job_options(data)
+    except ValueError as e:
+        cleanup_temp_dir(upload.path)
+        return jsonify({'error': str(e)}), 400
+
+    file_id = CONTENT_ID_PREFIX + upload.sha256.hexdigest()
+    logger.info(f"Received upload {filename} ({os.path.getsize(upload.path)} bytes) as {file_id}")
+    job = job_manager.submit(file_id, options, title=filename, audio_file=upload.path)
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f"/jobs/{job.id}",
+        'stream_url': f"/jobs/{job.id}/stream"
+    }), 202
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    data = get_request_data()
+    if not data or 'url' not in data:
+        error_msg = "Missing 'url' parameter in request"
+        logger.error(error_msg)
+        return jsonify({'error': error_msg}), 400
+
+    try:
+        options = get_job_options(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    job = job_manager.submit(data['url'], options)
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f"/jobs/{job.id}"
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    # The job may run in another server process; its state is then read from the job store
+    state = job_manager.find_job_state(job_id)
+    if not state:
+        return jsonify({'error': f"Job not found: {job_id}"}), 404
+    return jsonify(state)
+
+def stream_job(events):
+    """
+    Stream a job's segments as they are transcribed.
+
+    Clients asking for `text/event-stream` (or passing ?format=sse) receive
+    server-sent events; everyone else receives newline-delimited JSON.
+    """
+    use_sse = (request.args.get('format') == 'sse'
+               or 'text/event-stream' in request.headers.get('Accept', ''))
+
+    def generate():
+        for event, payload in events:
+            if event == 'heartbeat':
+                yield ": keep-alive\n\n" if use_sse else "\n"
+                continue
+            data = json.dumps({'type': event, **payload}, ensure_ascii=False)
+            if use_sse:
+                yield f"event: {event}\ndata: {data}\n\n"
+            else:
+                yield data + "\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if use_sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/jobs/<job_id>/stream', methods=['GET'])
+def get_job_stream(job_id):
+    events = job_manager.follow(job_id)
+    if events is None:
+        return jsonify({'error': f"Job not found: {job_id}"}), 404
+    return stream_job(events)
+
+TRANSCRIPT_MIMETYPES = {
+    'text': 'text/plain',
+    'timestamped': 'text/plain',
+    'srt': 'application/x-subrip',
+    'vtt': 'text/vtt',
+    'json': 'application/json',
+}
+
+@app.route('/jobs/<job_id>/transcript', methods=['GET'])
+def get_job_transcript(job_id):
+    """Render a job's segments as text, timestamped text, SRT, VTT or JSON (?format=)"""
+    fmt = request.args.get('format', 'text')
+    if fmt not in FORMATS:
+        return jsonify({'error': f"Unsupported format '{fmt}'. Available formats: {', '.join(FORMATS)}"}), 400
+    segments = job_manager.find_job_segments(job_id)
+    if segments is None:
+        return jsonify({'error': f"Job not found: {job_id}"}), 404
+    return Response(segments.render(fmt), mimetype=TRANSCRIPT_MIMETYPES[fmt])
+
+@app.route('/batch', methods=['POST'])
+def create_batch():
+    data = get_request_data()
+    urls = data.get('urls') if data else None
+    if isinstance(urls, str):
+        urls = [line.strip() for line in urls.splitlines() if line.strip()]
+    if not urls and data and data.get('url'):
+        urls = [data['url']]
+    if not urls or not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+        error_msg = "Missing 'urls' (list of URLs) or 'url' (playlist or channel URL) parameter in request"
+        logger.error(error_msg)
+        return jsonify({'error': error_msg}), 400
+
+    try:
+        options = get_job_options(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    audio_processor = AudioProcessor(config.settings.get("ffmpeg_path"), config.settings.get("audio_extraction", "pcm"))
+    try:
+        items, duplicates = audio_processor.expand_urls(urls, int(config.settings.get("batch_max_items", 1000)))
+    except AudioDownloadError as e:
+        return jsonify({'error': str(e)}), 400
+    if not items:
+        return jsonify({'error': "No videos found for the given URLs"}), 400
+
+    batch = job_manager.submit_batch(items, options, duplicates)
+    return jsonify({
+        'batch_id': batch.id,
+        'status_url': f"/batch/{batch.id}",
+        'duplicates': duplicates,
+        'jobs': [
+            {'job_id': job.id, 'url': job.url, 'title': job.title, 'status_url': f"/jobs/{job.id}"}
+            for job in batch.jobs
+        ]
+    }), 202
+
+@app.route('/batch/<batch_id>', methods=['GET'])
+def get_batch(batch_id):
+    state = job_manager.find_batch_state(batch_id)
+    if not state:
+        return jsonify({'error': f"Batch not found: {batch_id}"}), 404
+    return jsonify(state)
+
+@app.route('/transcribe/stream', methods=['POST'])
+def transcribe_stream():
+    data = get_request_data()
+    if not data or 'url' not in data:
+        error_msg = "Missing 'url' parameter in request"
+        logger.error(error_msg)
+        return jsonify({'error': error_msg}), 400
+
+    try:
+        options = get_job_options(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    job = job_manager.submit(data['url'], options)
+    return stream_job(job.follow())
 
 @app.route('/transcribe', methods=['POST'])
 def transcribe():
     try:
-        # Log incoming request
-        logger.info(f"Received request: {request.data}")
-        
-        # Handle both JSON and form data
-        if request.is_json:
-            data = request.get_json()
-        else:
-            data = request.form.to_dict()
-        
-        logger.info(f"Processed request data: {data}")
+        data = get_request_data()
         
         if not data or 'url' not in data:
             error_msg = "Missing 'url' parameter in request"
             logger.error(error_msg)
             return jsonify({'error': error_msg}), 400
 
+        try:
+            options = get_job_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         url = data['url']
         logger.info(f"Processing URL: {url}")
 
-        # Download audio
-        audio_file = audio_processor.download_audio(url)
-        logger.info(f"Audio downloaded to: {audio_file}")
-        
-        # Set the audio file in transcription manager
-        transcription_manager.temp_audio_file = audio_file
-        
-        # Perform transcription
-        transcription, summary = transcription_manager.transcribe()
-        
+        # Run on the worker pool and wait, so concurrent requests never share pipeline state
+        job = job_manager.submit(url, options)
+        job.wait()
+
+        if job.status == JobStatus.FAILED:
+            return jsonify({'status': 'error', 'error': job.error}), 500
+
         response = {
             'status': 'success',
-            'transcription': transcription,
-            'summary': summary
+            'transcription': job.result['transcription'],
+            'summary': job.result['summary']
         }
         
         logger.info("Transcription completed successfully")
@@ -70,15 +332,65 @@ def transcribe():
         logger.error(error_msg, exc_info=True)
         return jsonify({'status': 'error', 'error': error_msg}), 500
 
-    finally:
-        if hasattr(transcription_manager, 'temp_audio_file') and transcription_manager.temp_audio_file:
-            audio_processor.cleanup(transcription_manager.temp_audio_file)
-            logger.info("Temporary files cleaned up")
+@app.route('/models', methods=['GET'])
+def list_models():
+    # Models are loaded by the process running the jobs, which may not have reported yet
+    state = job_manager.models_state()
+    if state is None:
+        return jsonify({'error': "The inference process is starting"}), 503
+    return jsonify({
+        'available': config.AVAILABLE_MODELS,
+        'default': config.settings['model'],
+        **state
+    })
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    stats = job_manager.cache_stats()
+    if stats is None:
+        return jsonify({'error': "The inference process is starting"}), 503
+    return jsonify(stats)
+
+@app.route('/search', methods=['GET'])
+def search_transcripts():
+    """Full-text search over the segments of all stored transcripts"""
+    if not transcript_store:
+        return jsonify({'error': "Transcript store is disabled"}), 404
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': "Missing 'q' parameter in request"}), 400
+    try:
+        results = transcript_store.search(
+            query,
+            request.args.get('limit', 50, type=int),
+            request.args.get('offset', 0, type=int)
+        )
+    except TranscriptStoreError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'query': query, 'results': results})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(job_manager.render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy'}), 200
 
 def start_api(host='0.0.0.0', port=5000):
+    global job_manager
     logger.info(f"Starting API server on {host}:{port}")
-    app.run(host=host, port=port, debug=True) 
\ No newline at end of file
+    get_client(config.settings).warm_up_async()
+    # The debug reloader serves from a child process; only that one runs jobs
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        # Checkpoints of running jobs, so the jobs a crash interrupted are resumed
+        job_store = JobStore(config.jobs_dir) if config.settings.get("resume_jobs", True) else None
+        job_manager = JobManager.from_settings(
+            config.models_dir, config.cache_dir, config.data_dir, config.settings, job_store
+        )
+        metrics.registry.add_collector(job_manager.collect_metrics)
+        if job_store:
+            job_store.prune()
+            job_manager.resume_unfinished()
+    app.run(host=host, port=port, debug=True) 
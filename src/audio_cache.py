@@ -0,0 +1,118 @@
+"""
+Audio Cache Module
+
+This module keeps downloaded audio on disk, so running a video again (with a
+different model, language or prompt, or after its transcript was evicted)
+does not download it again. Entries are keyed by the canonical video ID and
+stored as compact 16 kHz mono audio: FLAC by default (about half the size of
+raw PCM), or raw s16le PCM with the "pcm" format, which needs no decoding on a
+hit. It is a DiskLRUCache, so writes are atomic, the total size is bounded by
+audio_cache_max_mb and the least recently used entries are evicted first;
+several workers and processes can share one cache directory.
+
+A hit hands out a hard link (or a copy) of the entry in a temporary directory,
+which the caller owns like a fresh download; evicting the entry meanwhile does
+not affect it.
+
+Example:
+    >>> from audio_cache import AudioCache
+    >>> cache = AudioCache.from_settings(config.cache_dir, config.settings)
+    >>> cache.store("youtube:dQw4w9WgXcQ", "/tmp/tmpab12/audio.pcm", audio_processor)
+    >>> cache.fetch("youtube:dQw4w9WgXcQ")
+    '/tmp/tmpcd34/audio.flac'
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Optional
+from disk_cache import DiskLRUCache
+from audio_processor import AudioProcessor, PCM_EXTENSION
+from utils import create_temp_audio_file, cleanup_temp_dir
+from logger import logger
+
+AUDIO_FORMATS = ("flac", "pcm")
+
+class AudioCache(DiskLRUCache):
+    def __init__(self, cache_dir: str, max_bytes: int, audio_format: str = "flac"):
+        if audio_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported audio cache format '{audio_format}'. "
+                             f"Available formats: {', '.join(AUDIO_FORMATS)}")
+        super().__init__(cache_dir, max_bytes, suffix="." + audio_format, name="audio")
+        self.audio_format = audio_format
+        self._remove_other_formats()
+
+    @classmethod
+    def from_settings(cls, cache_dir: str, settings: dict) -> Optional["AudioCache"]:
+        """Create the cache described by settings, or None if audio caching is disabled"""
+        if not settings.get("audio_cache_enabled", True):
+            return None
+        max_bytes = int(settings.get("audio_cache_max_mb", 2048)) * 1024 * 1024
+        return cls(os.path.join(cache_dir, "audio"), max_bytes, settings.get("audio_cache_format", "flac"))
+
+    def fetch(self, video_id: str) -> Optional[str]:
+        """
+        Return a temporary copy of the cached audio of a video.
+
+        Returns:
+            Optional[str]: Path of a file in a new temporary directory, owned by
+            the caller, or None on a miss
+        """
+        path = self.get_path(video_id)
+        if not path:
+            return None
+        target = create_temp_audio_file() + self.suffix
+        try:
+            self._link_or_copy(path, target)
+        except FileNotFoundError:
+            # Evicted by another worker since the lookup
+            cleanup_temp_dir(target)
+            return None
+        return target
+
+    @staticmethod
+    def _link_or_copy(path: str, target: str) -> None:
+        try:
+            os.link(path, target)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # Different file system, or links are not supported
+            shutil.copyfile(path, target)
+
+    def store(self, video_id: str, audio_file: str, audio_processor: AudioProcessor) -> None:
+        """
+        Add downloaded audio to the cache; a failure is logged, never raised.
+
+        Args:
+            video_id: Canonical video ID, e.g. 'youtube:dQw4w9WgXcQ'
+            audio_file: The downloaded audio (.pcm, or any file ffmpeg reads); it is left in place
+            audio_processor: Runs ffmpeg to compress or convert the audio
+        """
+        try:
+            if self.audio_format == "pcm" and audio_file.endswith(PCM_EXTENSION):
+                self.put_file(video_id, audio_file)
+            else:
+                fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                os.close(fd)
+                try:
+                    if self.audio_format == "flac":
+                        audio_processor.encode_flac(audio_file, temp_path)
+                    else:
+                        audio_processor.extract_pcm(audio_file, temp_path)
+                except Exception:
+                    self._discard(temp_path)
+                    raise
+                self._commit(video_id, temp_path)
+            logger.info("Cached audio for video: %s", video_id)
+        except Exception as e:
+            logger.error("Error caching audio of %s: %s", video_id, str(e), exc_info=True)
+
+    def _remove_other_formats(self) -> None:
+        # Entries of a previously configured format would never be hit nor count towards the quota
+        for audio_format in AUDIO_FORMATS:
+            if audio_format == self.audio_format:
+                continue
+            for name in os.listdir(self.cache_dir):
+                if name.endswith("." + audio_format):
+                    self._discard(os.path.join(self.cache_dir, name))
@@ -1,7 +1,39 @@
-import yt_dlp
-from utils import create_temp_audio_file, cleanup_temp_file
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import numpy as np
+# yt_dlp takes a noticeable time to import, so the methods that need it import it on first use
+from utils import create_temp_audio_file, cleanup_temp_file, cleanup_temp_dir, find_ffmpeg
+from metrics import timed
 from logger import logger
-from typing import Optional, Callable
+from typing import Optional, Callable, List, Tuple
+
+# Whisper consumes 16 kHz mono audio; "pcm" extraction writes exactly that as raw
+# signed 16-bit little-endian samples so nothing has to be resampled again later.
+SAMPLE_RATE = 16000
+PCM_EXTENSION = ".pcm"
+PCM_BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+# Formats ffmpeg can read straight from the source URL
+STREAMABLE_PROTOCOLS = ("http", "https", "m3u8", "m3u8_native")
+
+# yt-dlp extractors whose results are lists of videos (e.g. YoutubeTab, BandcampPlaylist)
+PLAYLIST_IE_SUFFIXES = ("Tab", "Playlist", "Channel", "Album", "Set", "User")
+
+# How deep nested playlists (channel -> tab -> playlist) are followed
+MAX_EXPAND_DEPTH = 2
+
+# Local files and uploads are identified by their content instead of a video ID
+CONTENT_ID_PREFIX = "sha256:"
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
 
 class AudioProcessingError(Exception):
     """Base exception for audio processing errors"""
@@ -11,59 +43,227 @@ class AudioDownloadError(AudioProcessingError):
     """Exception raised when audio download fails"""
     pass
 
+def read_pcm(file_path: str, offset: int = 0, length: Optional[int] = None) -> np.ndarray:
+    """
+    Read a raw 16 kHz mono s16le file as float32 samples.
+
+    The file is memory-mapped, so the only full-size allocation is the
+    float32 buffer handed to Whisper.
+
+    Args:
+        file_path: Path to a file written by AudioProcessor in "pcm" mode
+        offset: Byte offset of the samples, e.g. the data chunk of a WAV file
+        length: Number of sample bytes; defaults to the rest of the file
+
+    Returns:
+        np.ndarray: Samples in the range [-1, 1]
+    """
+    available = os.path.getsize(file_path) - offset
+    count = (available if length is None else min(length, available)) // 2
+    if count <= 0:
+        return np.zeros(0, dtype=np.float32)
+    samples = np.memmap(file_path, dtype="<i2", mode="r", offset=offset, shape=(count,))
+    return samples.astype(np.float32) / 32768.0
+
+def wav_pcm_layout(file_path: str) -> Optional[Tuple[int, int]]:
+    """
+    Check whether a file is a WAV file that Whisper can use without transcoding.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Optional[Tuple[int, int]]: Offset and size in bytes of the sample data
+        if the file is 16 kHz mono signed 16-bit PCM, None otherwise
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+                return None
+            matches = False
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+                if chunk_id == b'data':
+                    return (f.tell(), chunk_size) if matches else None
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size + chunk_size % 2)
+                    if len(fmt) < 16:
+                        return None
+                    audio_format, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                    if audio_format == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                        # The actual format is the first two bytes of the sub-format GUID
+                        audio_format = struct.unpack('<H', fmt[24:26])[0]
+                    matches = (audio_format == WAVE_FORMAT_PCM and channels == 1
+                               and sample_rate == SAMPLE_RATE and bits == 16)
+                else:
+                    # Chunks are padded to an even size
+                    f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+def content_id(file_path: str) -> str:
+    """Return the 'sha256:<hex digest>' ID of a file, used as its transcript cache key"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return CONTENT_ID_PREFIX + digest.hexdigest()
+
+class PCMStream:
+    """
+    16 kHz mono PCM produced by a running `yt-dlp | ffmpeg` pipeline.
+
+    A background thread drains ffmpeg's output into a growing .pcm file, so
+    the download never waits for the consumer. read() returns samples from
+    that file as soon as they are available, which lets transcription overlap
+    with the network transfer.
+    """
+
+    def __init__(self, processes: list, stderr_files: list, path: str, duration: Optional[float] = None,
+                 progress_hook: Optional[Callable] = None, cleanup_paths: tuple = ()):
+        self.processes = processes
+        self.stderr_files = stderr_files
+        self.path = path
+        self.duration = duration
+        self.progress_hook = progress_hook
+        self.cleanup_paths = cleanup_paths
+        self.error = None
+        self._written = 0
+        self._consumed = 0
+        self._finished = False
+        self._condition = threading.Condition()
+        self._file = open(path, 'wb+')
+        self._pump_thread = threading.Thread(target=self._pump, name="pcm-stream", daemon=True)
+        self._pump_thread.start()
+
+    @property
+    def eof(self) -> bool:
+        """
+        True once the pipeline has finished and every sample has been read.
+
+        Stays False if the pipeline failed, so the next read() raises the error.
+        """
+        with self._condition:
+            # A killed ffmpeg can leave half a sample at the end, which read() never returns
+            return self._finished and not self.error and self._consumed >= self._written - self._written % 2
+
+    def read(self, seconds: float) -> np.ndarray:
+        """
+        Read up to `seconds` of audio, blocking until it is available.
+
+        Returns fewer samples only at the end of the stream.
+
+        Raises:
+            AudioDownloadError: If the pipeline failed
+        """
+        wanted = int(seconds * SAMPLE_RATE) * 2
+        with self._condition:
+            while self._written - self._consumed < wanted and not self._finished:
+                self._condition.wait()
+            if self.error:
+                raise self.error
+            available = self._written - self._consumed
+            # Only whole samples; a partial trailing sample can only occur at the very end
+            size = min(wanted, available - available % 2)
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._consumed)
+            data = f.read(size)
+        self._consumed += len(data)
+        return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+    def close(self) -> None:
+        """Stop the pipeline (if still running) and remove its temporary files"""
+        for process in self.processes:
+            if process.poll() is None:
+                process.kill()
+        self._pump_thread.join()
+        self._file.close()
+        for stderr_file in self.stderr_files:
+            stderr_file.close()
+        for path in self.cleanup_paths:
+            cleanup_temp_dir(path)
+
+    def _pump(self) -> None:
+        output = self.processes[-1].stdout
+        total_bytes = int(self.duration * PCM_BYTES_PER_SECOND) if self.duration else None
+        try:
+            while True:
+                chunk = output.read1(PCM_BYTES_PER_SECOND) if hasattr(output, 'read1') else output.read(PCM_BYTES_PER_SECOND)
+                if not chunk:
+                    break
+                self._file.write(chunk)
+                self._file.flush()
+                with self._condition:
+                    self._written += len(chunk)
+                    self._condition.notify_all()
+                if self.progress_hook:
+                    self.progress_hook({
+                        'status': 'downloading',
+                        'downloaded_bytes': self._written,
+                        'total_bytes': total_bytes,
+                    })
+            self._check_exit()
+            if self.progress_hook:
+                self.progress_hook({'status': 'finished', 'filename': self.path})
+        except Exception as e:
+            self.error = e if isinstance(e, AudioDownloadError) else AudioDownloadError(str(e))
+        finally:
+            output.close()
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def _check_exit(self) -> None:
+        for process, stderr_file in zip(self.processes, self.stderr_files):
+            if process.wait() != 0:
+                stderr_file.seek(0)
+                error = stderr_file.read().decode("utf-8", errors="replace").strip()
+                raise AudioDownloadError(f"Audio pipeline failed with code {process.returncode}: {error}")
+
 class AudioProcessor:
-    def __init__(self, ffmpeg_path: Optional[str] = None):
+    def __init__(self, ffmpeg_path: Optional[str] = None, extraction_mode: str = "pcm"):
         self.ffmpeg_path = ffmpeg_path
-        logger.info(f"AudioProcessor initialized with ffmpeg_path: {ffmpeg_path}")
-        
+        self.extraction_mode = extraction_mode
+        logger.info(f"AudioProcessor initialized with ffmpeg_path: {ffmpeg_path}, extraction_mode: {extraction_mode}")
+
     def download_audio(self, url: str, progress_hook: Optional[Callable] = None) -> str:
         """
         Download audio from URL and save to temporary file
-        
+
         Args:
             url: URL to download from
             progress_hook: Optional callback function to report download progress
-            
+
         Returns:
-            str: Path to downloaded audio file
-            
+            str: Path to downloaded audio file (.pcm in "pcm" mode, .wav in "wav" mode)
+
         Raises:
             AudioDownloadError: If download fails or receives empty response
         """
+        if self.extraction_mode == "pcm":
+            return self.download_pcm(url, progress_hook)
+        return self.download_wav(url, progress_hook)
+
+    def download_wav(self, url: str, progress_hook: Optional[Callable] = None) -> str:
+        """Download audio and convert it to a full-rate WAV file with yt-dlp"""
         temp_file = create_temp_audio_file()
         logger.info(f"Created temporary audio file: {temp_file}")
         logger.info(f"Starting audio download from URL: {url}")
 
         try:
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'wav',
-                }],
-                'outtmpl': temp_file,
-                'quiet': True,
-                'no_warnings': True,
-                'extract_audio': True,
-                'socket_timeout': 30,
-                'retries': 3,
-            }
-
-            if self.ffmpeg_path:
-                ydl_opts['ffmpeg_location'] = self.ffmpeg_path
-            
-            if progress_hook:
-                ydl_opts['progress_hooks'] = [progress_hook]
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                try:
-                    error_code = ydl.download([url])
-                    if error_code != 0:
-                        raise AudioDownloadError(f"yt-dlp returned error code: {error_code}")
-                except yt_dlp.utils.DownloadError as e:
-                    if "Empty reply from server" in str(e):
-                        raise AudioDownloadError("Otrzymano pustą odpowiedź z serwera. Spróbuj ponownie później.") from e
-                    raise AudioDownloadError(f"Błąd podczas pobierania: {str(e)}") from e
+            ydl_opts = self._ydl_opts(temp_file, progress_hook)
+            ydl_opts['postprocessors'] = [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'wav',
+            }]
+            ydl_opts['extract_audio'] = True
+            with timed("download"):
+                self._download(url, ydl_opts)
 
             # Add .wav extension as yt-dlp automatically adds it
             final_path = f"{temp_file}.wav"
@@ -73,9 +273,517 @@ class AudioProcessor:
         except Exception as e:
             error_msg = f"Error downloading audio: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            cleanup_temp_file(temp_file)
+            cleanup_temp_dir(temp_file)
+            raise AudioDownloadError(error_msg) from e
+
+    def download_pcm(self, url: str, progress_hook: Optional[Callable] = None) -> str:
+        """
+        Extract the best audio stream straight to 16 kHz mono s16le PCM.
+
+        When the selected format is a plain HTTP or HLS stream that can be
+        fetched in one request, ffmpeg reads it directly from the source URL.
+        Otherwise (e.g. DASH fragments, or YouTube, which throttles unchunked
+        requests to about playback speed) yt-dlp downloads it with its ranged
+        requests and pipes the compressed stream into ffmpeg. Either way no
+        intermediate file is written.
+
+        Args:
+            url: URL to download from
+            progress_hook: Optional yt-dlp style progress hook
+
+        Returns:
+            str: Path to the .pcm file
+
+        Raises:
+            AudioDownloadError: If download or extraction fails
+        """
+        import yt_dlp
+
+        temp_file = create_temp_audio_file()
+        output_path = temp_file + PCM_EXTENSION
+        info_file = temp_file + ".info.json"
+        logger.info(f"Starting PCM extraction from URL: {url}")
+
+        try:
+            with timed("metadata"):
+                with yt_dlp.YoutubeDL(self._ydl_opts(temp_file)) as ydl:
+                    info = ydl.extract_info(url, download=False)
+                    direct = self._is_directly_readable(info)
+                    if not direct:
+                        self._write_info_json(ydl, info, info_file)
+
+            with timed("download"):
+                if direct:
+                    # ffmpeg downloads and decodes in one pass
+                    self.extract_pcm(
+                        info['url'],
+                        output_path,
+                        headers=info.get('http_headers'),
+                        duration=info.get('duration'),
+                        progress_hook=progress_hook
+                    )
+                else:
+                    self._extract_pcm_with_ytdlp(info_file, output_path, info.get('duration'), progress_hook)
+                    # The .pcm file must be alone in its directory for cleanup_temp_file
+                    os.remove(info_file)
+
+            logger.info(f"Audio extracted successfully to: {output_path}")
+            return output_path
+
+        except Exception as e:
+            error_msg = f"Error downloading audio: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            cleanup_temp_dir(temp_file)
+            raise AudioDownloadError(error_msg) from e
+
+    def extract_pcm(self, source: str, output_path: str, headers: Optional[dict] = None,
+                    duration: Optional[float] = None, progress_hook: Optional[Callable] = None,
+                    stdin=None) -> str:
+        """
+        Run ffmpeg to convert a local file or remote stream to 16 kHz mono s16le PCM.
+
+        Args:
+            source: Local path or URL readable by ffmpeg, or 'pipe:0' to read stdin
+            output_path: Where to write the raw PCM samples
+            headers: Optional HTTP headers for remote sources
+            duration: Optional source duration in seconds, used for progress
+            progress_hook: Optional yt-dlp style progress hook; byte counts refer
+                to the PCM output
+            stdin: Optional pipe or file ffmpeg reads with source 'pipe:0'
+
+        Returns:
+            str: output_path
+
+        Raises:
+            AudioDownloadError: If ffmpeg fails
+        """
+        command = [self._ffmpeg_executable(), '-hide_banner', '-nostdin', '-y', '-loglevel', 'error']
+        if headers:
+            command += ['-headers', ''.join(f"{key}: {value}\r\n" for key, value in headers.items())]
+        command += [
+            '-i', source,
+            '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE),
+            '-acodec', 'pcm_s16le', '-f', 's16le',
+            '-progress', 'pipe:1',
+            output_path
+        ]
+
+        total_bytes = int(duration * PCM_BYTES_PER_SECOND) if duration else None
+        # stderr goes to a file: a pipe read only after stdout could fill up and block ffmpeg
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                command,
+                stdin=stdin,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True
+            )
+            for line in process.stdout:
+                key, _, value = line.strip().partition('=')
+                if progress_hook and key == 'out_time_us' and value.isdigit():
+                    progress_hook({
+                        'status': 'downloading',
+                        'downloaded_bytes': int(value) * PCM_BYTES_PER_SECOND // 1_000_000,
+                        'total_bytes': total_bytes,
+                    })
+            if process.wait() != 0:
+                raise AudioDownloadError(
+                    f"ffmpeg failed with code {process.returncode}: {self._read_stderr(stderr_file)}"
+                )
+
+        if progress_hook:
+            progress_hook({'status': 'finished', 'filename': output_path})
+        return output_path
+
+    def encode_flac(self, source: str, output_path: str) -> str:
+        """
+        Compress audio to 16 kHz mono FLAC, e.g. for the audio cache.
+
+        Args:
+            source: Local file; .pcm files are read as 16 kHz mono s16le
+            output_path: Where to write the FLAC stream
+
+        Returns:
+            str: output_path
+
+        Raises:
+            AudioProcessingError: If ffmpeg fails
+        """
+        command = [self._ffmpeg_executable(), '-hide_banner', '-nostdin', '-y', '-loglevel', 'error']
+        if source.endswith(PCM_EXTENSION):
+            command += ['-f', 's16le', '-ar', str(SAMPLE_RATE), '-ac', '1']
+        command += [
+            '-i', source,
+            '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE),
+            '-acodec', 'flac', '-f', 'flac',
+            output_path
+        ]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise AudioProcessingError(f"ffmpeg failed with code {result.returncode}: {result.stderr.strip()}")
+        return output_path
+
+    def open_pcm_stream(self, url: str, progress_hook: Optional[Callable] = None) -> PCMStream:
+        """
+        Start streaming 16 kHz mono PCM for a URL without waiting for the download.
+
+        yt-dlp writes the best audio stream to stdout and ffmpeg decodes it
+        on the fly into a growing .pcm file, so samples become available as
+        soon as the first bytes arrive. Metadata is extracted once in-process and handed to the
+        yt-dlp subprocess with --load-info-json.
+
+        Args:
+            url: URL to stream
+            progress_hook: Optional yt-dlp style progress hook; byte counts refer
+                to the PCM output
+
+        Returns:
+            PCMStream: The running pipeline; the caller must close() it
+
+        Raises:
+            AudioDownloadError: If metadata extraction or process start fails
+        """
+        import yt_dlp
+
+        temp_file = create_temp_audio_file()
+        info_file = temp_file + ".info.json"
+        logger.info(f"Starting streaming PCM extraction from URL: {url}")
+
+        try:
+            with yt_dlp.YoutubeDL(self._ydl_opts(temp_file)) as ydl:
+                info = ydl.extract_info(url, download=False)
+                self._write_info_json(ydl, info, info_file)
+
+            download_command = self._ytdlp_pipe_command(info_file)
+
+            decode_command = [
+                self._ffmpeg_executable(), '-hide_banner', '-nostdin', '-loglevel', 'error',
+                # Start decoding right away instead of buffering seconds of input for probing
+                '-probesize', '128k', '-analyzeduration', '0',
+                '-i', 'pipe:0',
+                '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE),
+                '-acodec', 'pcm_s16le', '-f', 's16le',
+                'pipe:1'
+            ]
+
+            stderr_files = [tempfile.TemporaryFile(), tempfile.TemporaryFile()]
+            downloader = subprocess.Popen(download_command, stdout=subprocess.PIPE, stderr=stderr_files[0])
+            decoder = subprocess.Popen(
+                decode_command,
+                stdin=downloader.stdout,
+                stdout=subprocess.PIPE,
+                stderr=stderr_files[1]
+            )
+            # Only ffmpeg reads from the downloader now
+            downloader.stdout.close()
+            downloader.stdout = None
+
+            return PCMStream(
+                [downloader, decoder],
+                stderr_files,
+                temp_file + PCM_EXTENSION,
+                duration=info.get('duration'),
+                progress_hook=progress_hook,
+                cleanup_paths=(temp_file,)
+            )
+
+        except Exception as e:
+            error_msg = f"Error starting audio stream: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            cleanup_temp_dir(temp_file)
+            raise AudioDownloadError(error_msg) from e
+
+    def expand_urls(self, urls: List[str], max_items: int = 1000) -> Tuple[List[dict], int]:
+        """
+        Expand playlist and channel URLs into their videos and drop duplicates.
+
+        Uses yt-dlp flat extraction, so only the playlist pages are fetched and
+        not the metadata of every video. Plain video URLs are passed through.
+
+        Args:
+            urls: Video, playlist or channel URLs
+            max_items: Maximum number of videos to return
+
+        Returns:
+            Tuple[List[dict], int]: Items with 'id' ('<extractor>:<video id>'),
+            'url' and 'title' in playlist order, and the number of duplicates skipped
+
+        Raises:
+            AudioDownloadError: If a URL cannot be expanded
+        """
+        items = []
+        seen = set()
+        duplicates = 0
+        for url in urls:
+            video_id = self._offline_video_id(url)
+            try:
+                # Single videos need no network round trip
+                entries = [{'id': video_id, 'url': url, 'title': None}] if video_id else self._expand_url(url, max_items)
+            except Exception as e:
+                error_msg = f"Error expanding URL {url}: {str(e)}"
+                logger.error(error_msg, exc_info=True)
+                raise AudioDownloadError(error_msg) from e
+
+            for entry in entries:
+                if entry['id'] in seen:
+                    duplicates += 1
+                    continue
+                if len(items) >= max_items:
+                    logger.warning("Batch truncated to %d items", max_items)
+                    return items, duplicates
+                seen.add(entry['id'])
+                items.append(entry)
+
+        logger.info("Expanded %d URLs into %d videos (%d duplicates skipped)", len(urls), len(items), duplicates)
+        return items, duplicates
+
+    def _expand_url(self, url: str, max_items: int, depth: int = 0) -> List[dict]:
+        import yt_dlp
+
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'socket_timeout': 30,
+            'extract_flat': 'in_playlist',
+            'playlistend': max_items,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+        return self._flatten_entries(info, url, max_items, depth)
+
+    def _flatten_entries(self, info: dict, url: str, max_items: int, depth: int) -> List[dict]:
+        if 'entries' not in info:
+            return [{
+                'id': f"{(info.get('extractor_key') or info.get('ie_key') or 'generic').lower()}:{info['id']}",
+                'url': info.get('webpage_url') or info.get('url') or url,
+                'title': info.get('title'),
+            }]
+
+        entries = []
+        for entry in info['entries']:
+            if not entry:
+                continue
+            if 'entries' in entry:
+                entries.extend(self._flatten_entries(entry, url, max_items, depth))
+            elif (entry.get('ie_key') or '').endswith(PLAYLIST_IE_SUFFIXES) and depth < MAX_EXPAND_DEPTH:
+                # Channels list their tabs (videos, shorts, live) as nested playlists
+                entries.extend(self._expand_url(entry['url'], max_items, depth + 1))
+            elif entry.get('id'):
+                entries.append(self._flatten_entries(entry, entry.get('url') or url, max_items, depth)[0])
+            if len(entries) >= max_items:
+                break
+        return entries
+
+    def get_video_id(self, url: str) -> str:
+        """
+        Resolve the canonical video ID for a URL, e.g. 'youtube:dQw4w9WgXcQ'.
+
+        The ID is taken from the matching yt-dlp extractor without any network
+        access when possible, and from yt-dlp metadata otherwise.
+
+        Args:
+            url: URL of the video
+
+        Returns:
+            str: '<extractor>:<video id>'
+
+        Raises:
+            AudioDownloadError: If the metadata lookup fails
+        """
+        if url.startswith(CONTENT_ID_PREFIX):
+            return url
+        video_id = self._offline_video_id(url)
+        if video_id:
+            return video_id
+
+        import yt_dlp
+
+        try:
+            ydl_opts = {
+                'quiet': True,
+                'no_warnings': True,
+                'socket_timeout': 30,
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False, process=False)
+            return f"{info.get('extractor_key', 'generic').lower()}:{info['id']}"
+        except Exception as e:
+            error_msg = f"Error reading video metadata: {str(e)}"
+            logger.error(error_msg, exc_info=True)
             raise AudioDownloadError(error_msg) from e
-            
+
+    @staticmethod
+    def _offline_video_id(url: str) -> Optional[str]:
+        """Return '<extractor>:<id>' when the URL alone identifies a single video"""
+        import yt_dlp
+
+        for ie in yt_dlp.extractor.gen_extractor_classes():
+            if ie.ie_key() == 'Generic' or not ie.suitable(url):
+                continue
+            if ie.ie_key().endswith(PLAYLIST_IE_SUFFIXES):
+                return None
+            temp_id = ie.get_temp_id(url)
+            if temp_id:
+                return f"{ie.ie_key().lower()}:{temp_id}"
+            break
+        return None
+
+    def stage_local_file(self, file_path: str) -> str:
+        """
+        Make a local audio or video file available to the pipeline.
+
+        The pipeline deletes its audio file once transcribed, so the file is
+        hard-linked (or copied, across file systems) into a temporary directory.
+
+        Returns:
+            str: Path of the temporary file
+
+        Raises:
+            AudioProcessingError: If the file cannot be read
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        staged = create_temp_audio_file() + extension
+        try:
+            try:
+                os.link(file_path, staged)
+            except OSError:
+                shutil.copyfile(file_path, staged)
+        except OSError as e:
+            cleanup_temp_dir(staged)
+            raise AudioProcessingError(f"Error reading {file_path}: {str(e)}") from e
+        logger.info(f"Staged local file {file_path} as {staged}")
+        return staged
+
+    def normalize_audio_file(self, file_path: str) -> str:
+        """
+        Prepare a local audio or video file for transcription.
+
+        Raw PCM and WAV files that are already 16 kHz mono 16-bit are used as
+        they are. In "pcm" mode everything else is transcoded once to a .pcm
+        file next to it (the original is removed); in "wav" mode the file is
+        left for Whisper to decode.
+
+        Args:
+            file_path: Temporary file owned by the pipeline
+
+        Returns:
+            str: Path of the file to transcribe
+
+        Raises:
+            AudioProcessingError: If ffmpeg cannot read the file
+        """
+        if file_path.endswith(PCM_EXTENSION) or wav_pcm_layout(file_path):
+            logger.info(f"Audio file is already 16 kHz mono, skipping transcoding: {file_path}")
+            return file_path
+        if self.extraction_mode != "pcm":
+            return file_path
+
+        output_path = os.path.splitext(file_path)[0] + PCM_EXTENSION
+        try:
+            with timed("extract"):
+                self.extract_pcm(file_path, output_path)
+        except Exception as e:
+            cleanup_temp_dir(file_path)
+            raise AudioProcessingError(f"Error converting audio file: {str(e)}") from e
+        os.remove(file_path)
+        return output_path
+
     def cleanup(self, file_path: str):
         """Clean up temporary files"""
         cleanup_temp_file(file_path)
+
+    def _extract_pcm_with_ytdlp(self, info_file: str, output_path: str, duration: Optional[float],
+                                progress_hook: Optional[Callable]) -> None:
+        """Let a yt-dlp process download the audio and pipe it into extract_pcm"""
+        with tempfile.TemporaryFile() as stderr_file:
+            downloader = subprocess.Popen(
+                self._ytdlp_pipe_command(info_file), stdout=subprocess.PIPE, stderr=stderr_file
+            )
+            try:
+                self.extract_pcm('pipe:0', output_path, duration=duration, progress_hook=progress_hook,
+                                 stdin=downloader.stdout)
+            except AudioDownloadError:
+                # A failed download usually makes ffmpeg fail too; its own error is more telling
+                if downloader.poll() is None:
+                    downloader.kill()
+                elif downloader.returncode != 0:
+                    raise AudioDownloadError(
+                        f"yt-dlp failed with code {downloader.returncode}: {self._read_stderr(stderr_file)}"
+                    )
+                raise
+            finally:
+                downloader.stdout.close()
+                downloader.wait()
+            if downloader.returncode != 0:
+                raise AudioDownloadError(
+                    f"yt-dlp failed with code {downloader.returncode}: {self._read_stderr(stderr_file)}"
+                )
+
+    def _ytdlp_pipe_command(self, info_file: str) -> List[str]:
+        """yt-dlp command writing the best audio stream described by info_file to stdout"""
+        command = [
+            sys.executable, '-m', 'yt_dlp',
+            '--load-info-json', info_file,
+            '--format', 'bestaudio/best',
+            '--output', '-',
+            '--quiet', '--no-warnings',
+            '--socket-timeout', '30',
+            '--retries', '3',
+        ]
+        if self.ffmpeg_path:
+            command += ['--ffmpeg-location', self.ffmpeg_path]
+        return command
+
+    @staticmethod
+    def _is_directly_readable(info: dict) -> bool:
+        """Whether ffmpeg can fetch the selected format itself at full speed"""
+        # Chunked sources (e.g. YouTube) are throttled to about playback speed when fetched in one request
+        chunked = (info.get('downloader_options') or {}).get('http_chunk_size')
+        return info.get('protocol') in STREAMABLE_PROTOCOLS and not info.get('fragments') and not chunked
+
+    @staticmethod
+    def _write_info_json(ydl, info: dict, info_file: str) -> None:
+        with open(info_file, 'w', encoding='utf-8') as f:
+            json.dump(ydl.sanitize_info(info), f)
+
+    @staticmethod
+    def _read_stderr(stderr_file) -> str:
+        stderr_file.seek(0)
+        return stderr_file.read().decode('utf-8', errors='replace').strip()
+
+    def _ydl_opts(self, outtmpl: str, progress_hook: Optional[Callable] = None) -> dict:
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'outtmpl': outtmpl,
+            'quiet': True,
+            'no_warnings': True,
+            'socket_timeout': 30,
+            'retries': 3,
+        }
+
+        if self.ffmpeg_path:
+            ydl_opts['ffmpeg_location'] = self.ffmpeg_path
+
+        if progress_hook:
+            ydl_opts['progress_hooks'] = [progress_hook]
+        return ydl_opts
+
+    @staticmethod
+    def _download(url: str, ydl_opts: dict) -> None:
+        import yt_dlp
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            try:
+                error_code = ydl.download([url])
+                if error_code != 0:
+                    raise AudioDownloadError(f"yt-dlp returned error code: {error_code}")
+            except yt_dlp.utils.DownloadError as e:
+                if "Empty reply from server" in str(e):
+                    raise AudioDownloadError("Otrzymano pustą odpowiedź z serwera. Spróbuj ponownie później.") from e
+                raise AudioDownloadError(f"Błąd podczas pobierania: {str(e)}") from e
+
+    def _ffmpeg_executable(self) -> str:
+        """Resolve the configured ffmpeg location (file or directory) to an executable"""
+        if self.ffmpeg_path and os.path.isdir(self.ffmpeg_path):
+            return os.path.join(self.ffmpeg_path, 'ffmpeg')
+        return self.ffmpeg_path or find_ffmpeg() or 'ffmpeg'
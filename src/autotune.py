@@ -0,0 +1,200 @@
+"""
+Hardware Autotuning Module
+
+This module benchmarks combinations of compute_type, cpu_threads and
+num_workers on the current machine and stores the fastest one in settings.json,
+where TranscriptionManager picks it up. It is run with `python main.py --autotune`.
+
+The reference clip is generated deterministically (a speech-like signal of
+voiced harmonics modulated at syllable rate), so no audio asset has to be
+shipped and every machine benchmarks exactly the same input. The clip has no
+words, so Whisper would end most windows after a few tokens; on it, every
+window is made to decode as many tokens as real speech of its length
+(SPEECH_TOKENS_PER_SECOND) without temperature fallback, so the decoder loop
+is weighted as in a real transcription. A real recording can be used instead
+with `--autotune-clip`; it is decoded as is. Both run with the VAD filter,
+like TranscriptionManager.
+
+Example:
+    >>> from autotune import autotune
+    >>> best = autotune(config.models_dir, config.settings)
+    >>> best["compute_type"], best["cpu_threads"], best["num_workers"]
+    ('int8', 8, 1)
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+from audio_processor import SAMPLE_RATE, PCM_EXTENSION, read_pcm
+from model_registry import supported_compute_types
+from logger import logger
+
+REFERENCE_CLIP_SECONDS = 30
+# Tokens Whisper emits per second of English speech: ~150 words per minute at
+# ~1.3 tokens per word, plus the timestamp tokens
+SPEECH_TOKENS_PER_SECOND = 4
+# Audio Whisper decodes at once
+WINDOW_SECONDS = 30
+
+def generate_reference_clip(seconds: float = REFERENCE_CLIP_SECONDS, seed: int = 0) -> np.ndarray:
+    """
+    Generate a deterministic speech-like 16 kHz mono clip.
+
+    Args:
+        seconds: Clip length
+        seed: Seed for the noise component
+
+    Returns:
+        np.ndarray: float32 samples
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    # Gliding fundamental with a few harmonics, like a voiced vowel
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    # ~4 syllables per second with short pauses between phrases
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.25 * t) > -0.7)
+    audio = 0.3 * voice * envelope + 0.01 * rng.standard_normal(len(t))
+    return (audio / np.max(np.abs(audio))).astype(np.float32) * 0.5
+
+def forced_decode_options(model: WhisperModel) -> dict:
+    """
+    Transcription options that make every window decode the tokens of real speech.
+
+    The end-of-text token is suppressed and the window stopped after the token
+    count of WINDOW_SECONDS of speech. The fallback thresholds are disabled,
+    since the forced text would trigger temperature fallback on every window.
+    """
+    return {
+        'suppress_tokens': [-1, model.hf_tokenizer.token_to_id("<|endoftext|>")],
+        'max_new_tokens': SPEECH_TOKENS_PER_SECOND * WINDOW_SECONDS,
+        'temperature': 0.0,
+        'compression_ratio_threshold': None,
+        'log_prob_threshold': None,
+        'no_speech_threshold': None,
+    }
+
+def load_reference_clip(clip_path: Optional[str] = None) -> np.ndarray:
+    """Load the clip to benchmark on, generating the reference clip if no path is given"""
+    if not clip_path:
+        return generate_reference_clip()
+    if clip_path.endswith(PCM_EXTENSION):
+        return read_pcm(clip_path)
+    return decode_audio(clip_path, sampling_rate=SAMPLE_RATE)
+
+def candidate_configs(device: str) -> List[dict]:
+    """
+    List the combinations to benchmark.
+
+    On CPU every combination keeps cpu_threads * num_workers within the
+    number of cores. On CUDA the thread count does not matter and is left
+    at the CTranslate2 default.
+    """
+    cores = os.cpu_count() or 1
+    if device == "cuda":
+        thread_counts = [0]
+    else:
+        thread_counts = sorted({cores, max(1, cores // 2), max(1, cores // 4)}, reverse=True)
+
+    configs = []
+    for compute_type in supported_compute_types(device):
+        for num_workers in (1, 2):
+            for cpu_threads in thread_counts:
+                if device != "cuda" and cpu_threads * num_workers > cores:
+                    continue
+                configs.append({
+                    'compute_type': compute_type,
+                    'cpu_threads': cpu_threads,
+                    'num_workers': num_workers,
+                })
+    return configs
+
+def benchmark_config(audio: np.ndarray, model_name: str, device: str, models_dir: str,
+                     candidate: dict, synthetic: bool = True) -> float:
+    """
+    Measure throughput of one configuration.
+
+    The model transcribes num_workers copies of the clip concurrently (after
+    one warm-up run), as the API worker pool would. With synthetic set (the
+    generated reference clip), decode lengths are forced to those of speech
+    (see forced_decode_options).
+
+    Returns:
+        float: Seconds of audio transcribed per wall-clock second
+    """
+    model = WhisperModel(
+        model_name,
+        device=device,
+        compute_type=candidate['compute_type'],
+        cpu_threads=candidate['cpu_threads'],
+        num_workers=candidate['num_workers'],
+        download_root=models_dir
+    )
+
+    options = forced_decode_options(model) if synthetic else {}
+
+    def run_once(_=None):
+        segments, _info = model.transcribe(
+            audio,
+            beam_size=5,
+            language="en",
+            condition_on_previous_text=True,
+            vad_filter=True,
+            **options
+        )
+        for _segment in segments:
+            pass
+
+    run_once()
+    workers = candidate['num_workers']
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run_once, range(workers)))
+    elapsed = time.perf_counter() - start
+    return workers * (len(audio) / SAMPLE_RATE) / elapsed
+
+def autotune(models_dir: str, settings: dict, clip_path: Optional[str] = None,
+             progress_callback: Optional[Callable] = None) -> dict:
+    """
+    Benchmark all candidate configurations and return the fastest.
+
+    Args:
+        models_dir: Directory the models are downloaded to
+        settings: Current settings; model and device are taken from here
+        clip_path: Optional audio file to benchmark on instead of the reference clip
+        progress_callback: Optional callback taking (message, progress)
+
+    Returns:
+        dict: Best 'compute_type', 'cpu_threads' and 'num_workers', plus
+        'throughput', the 'device' they were measured on and the full list
+        of 'results'
+    """
+    audio = load_reference_clip(clip_path)
+    model_name = settings["model"]
+    device = settings["device"]
+    configs = candidate_configs(device)
+    logger.info("Autotuning %s on %s with %d candidate configurations", model_name, device, len(configs))
+
+    results = []
+    for i, candidate in enumerate(configs):
+        if progress_callback:
+            progress_callback(f"Benchmarking {candidate}...", i / len(configs) * 100)
+        try:
+            throughput = benchmark_config(audio, model_name, device, models_dir, candidate, not clip_path)
+        except Exception as e:
+            logger.warning("Configuration %s failed: %s", candidate, str(e))
+            continue
+        logger.info("Configuration %s: %.2fx real time", candidate, throughput)
+        results.append({**candidate, 'throughput': throughput})
+
+    if not results:
+        raise RuntimeError("No configuration could be benchmarked")
+
+    best = max(results, key=lambda result: result['throughput'])
+    if progress_callback:
+        progress_callback(f"Best configuration: {best}", 100)
+    return {**best, 'device': device, 'results': results}
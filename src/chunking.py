@@ -0,0 +1,82 @@
+"""
+Audio Chunking Module
+
+This module splits decoded audio into chunks whose boundaries fall in silence,
+as detected by faster-whisper's Silero VAD. Chunks can then be transcribed
+independently (for example concurrently) and their segments stitched back
+together by offsetting timestamps with the chunk start. find_cut_point does the
+same for a growing stream, one window at a time.
+
+Example:
+    >>> from chunking import split_on_silence
+    >>> chunks = split_on_silence(audio, chunk_seconds=60)
+    >>> chunks[:2]
+    [(8000, 950400), (968000, 1920000)]
+"""
+
+from typing import List, Tuple
+import numpy as np
+from audio_processor import SAMPLE_RATE
+
+def split_on_silence(audio: np.ndarray, chunk_seconds: float = 60.0,
+                     sample_rate: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """
+    Group speech regions into chunks of at most chunk_seconds.
+
+    Consecutive speech regions are merged while the chunk stays within the
+    limit, so every cut is made in a pause between two regions. Regions
+    longer than the limit are split by the VAD itself. Leading and trailing
+    silence, and long pauses between chunks, are dropped.
+
+    Args:
+        audio: 16 kHz mono float32 samples
+        chunk_seconds: Maximum chunk length in seconds
+        sample_rate: Sample rate of audio
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) sample offsets of each chunk
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    max_samples = int(chunk_seconds * sample_rate)
+    speech = get_speech_timestamps(audio, VadOptions(max_speech_duration_s=chunk_seconds))
+
+    chunks = []
+    chunk_start = chunk_end = None
+    for region in speech:
+        if chunk_start is None:
+            chunk_start, chunk_end = region['start'], region['end']
+        elif region['end'] - chunk_start <= max_samples:
+            chunk_end = region['end']
+        else:
+            chunks.append((chunk_start, chunk_end))
+            chunk_start, chunk_end = region['start'], region['end']
+
+    if chunk_start is not None:
+        chunks.append((chunk_start, chunk_end))
+    return chunks
+
+def find_cut_point(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> int:
+    """
+    Find where to cut a window of a growing stream without splitting speech.
+
+    The cut is placed at the start of the last speech region, so the possibly
+    unfinished utterance at the end of the window is carried over to the next
+    one. If the window ends in silence, or is one speech region from its very
+    start (nothing could be cut off, and the stream must make progress), the
+    whole window is used.
+
+    Args:
+        audio: 16 kHz mono float32 samples
+        sample_rate: Sample rate of audio
+
+    Returns:
+        int: Sample offset to cut at
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    speech = get_speech_timestamps(audio, VadOptions())
+    # Speech that stops well before the end is complete
+    if not speech or len(audio) - speech[-1]['end'] > sample_rate // 2:
+        return len(audio)
+    return speech[-1]['start'] or len(audio)
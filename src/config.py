@@ -8,9 +8,12 @@ of truth for all configuration-related operations.
 The Config class is implemented as a singleton to ensure consistent settings across
 the application. It manages settings such as:
 - Whisper model selection
-- Processing device (CPU/CUDA)
+- Processing device (CPU/CUDA), detected once and stored in settings.json
 - FFmpeg path
 - Timestamp display preferences
+- Number of API transcription workers and of concurrent GUI jobs (0 = automatic)
+- Transcript cache size and the searchable transcript store
+- Maximum upload size
 
 Example:
     >>> from config import config
@@ -22,20 +25,72 @@ Example:
 
 import os
 import json
-import torch
+from functools import lru_cache
 
 class Config:
+    AVAILABLE_MODELS = ["tiny", "base", "small", "medium", "large", "large-v2"]
+
     DEFAULT_SETTINGS = {
         "model": "base",
-        "device": "cuda" if torch.cuda.is_available() else "cpu",
         "ffmpeg_path": "",
-        "show_timestamps": True
+        "show_timestamps": True,
+        "word_timestamps": False,
+        "api_workers": 2,
+        "gui_concurrent_jobs": 0,
+        "download_concurrency": 2,
+        "api_threads": 8,
+        "graceful_timeout": 600,
+        "batch_max_items": 1000,
+        "compute_type": "int8",
+        "cpu_threads": 0,
+        "num_workers": 1,
+        "tuned_device": "",
+        "audio_extraction": "pcm",
+        "pipelined_ingest": False,
+        "parallelism": 1,
+        "model_memory_budget_mb": 4096,
+        "summary_chunk_tokens": 3000,
+        "summary_concurrency": 2,
+        "ollama_host": "http://localhost:11434",
+        "ollama_model": "mistral:latest",
+        "ollama_timeout": 300,
+        "ollama_keep_alive": "30m",
+        "ollama_retries": 3,
+        "language": "",
+        "transcript_cache_enabled": True,
+        "transcript_cache_max_mb": 512,
+        "audio_cache_enabled": True,
+        "audio_cache_max_mb": 2048,
+        "audio_cache_format": "flac",
+        "transcript_store_enabled": True,
+        "resume_jobs": True,
+        "upload_max_mb": 4096
     }
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def detect_device() -> str:
+        """
+        Return "cuda" if CTranslate2 can see a CUDA device, "cpu" otherwise.
+
+        CTranslate2 is what runs the Whisper models; asking it is much cheaper
+        than importing torch just for torch.cuda.is_available().
+        """
+        try:
+            import ctranslate2
+            return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        except Exception as e:
+            print(f"Error detecting CUDA devices: {e}")
+            return "cpu"
+
     def __init__(self):
         """Initialize Config with default settings and paths."""
         self.settings_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
         self.models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+        self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+        self.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        # Job state and checkpoints of interrupted jobs
+        self.jobs_dir = os.path.join(self.cache_dir, "jobs")
         self.settings = self.load_settings()
 
     def load_settings(self):
@@ -46,15 +101,24 @@ class Config:
             dict: The loaded settings, with any missing values filled in from defaults
         """
         try:
+            stored = {}
             if os.path.exists(self.settings_file):
                 with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                    # Update with any missing default settings
-                    return {**self.DEFAULT_SETTINGS, **settings}
-            return self.DEFAULT_SETTINGS.copy()
+                    stored = json.load(f)
         except Exception as e:
             print(f"Error loading settings: {e}")
-            return self.DEFAULT_SETTINGS.copy()
+            return {**self.DEFAULT_SETTINGS, 'device': self.detect_device()}
+
+        # Update with any missing default settings
+        settings = {**self.DEFAULT_SETTINGS, **stored}
+        if not settings.get("device"):
+            # Detected on the first start only; later starts read it from the file
+            settings["device"] = self.detect_device()
+            try:
+                self.save_settings({**stored, 'device': settings["device"]})
+            except OSError as e:
+                print(f"Error saving detected device: {e}")
+        return settings
 
     def save_settings(self, settings):
         """
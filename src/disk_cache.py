@@ -0,0 +1,186 @@
+"""
+Disk Cache Module
+
+This module implements a small size-bounded, least-recently-used cache of files
+on disk. Entries are addressed by the SHA-256 of their key, written atomically
+(temporary file + os.replace) and evicted by last access time once the total
+size exceeds the configured byte quota. Because all state lives in the file
+system, the cache survives restarts and can be shared by several threads.
+
+Example:
+    >>> from disk_cache import DiskLRUCache
+    >>> cache = DiskLRUCache("/tmp/yapper-cache", max_bytes=10 * 1024 * 1024, suffix=".json")
+    >>> cache.put_bytes("some-key", b"{}")
+    >>> cache.get_path("some-key")
+    '/tmp/yapper-cache/3c5d....json'
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+from metrics import cache_lookups_total
+from logger import logger
+
+class DiskLRUCache:
+    def __init__(self, cache_dir: str, max_bytes: int, suffix: str = "", name: Optional[str] = None):
+        """
+        Args:
+            cache_dir: Directory holding the entries
+            max_bytes: Size quota of all entries
+            suffix: File extension of the entries
+            name: Label of the cache's lookups in yapper_cache_lookups_total; not counted if None
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max(0, int(max_bytes))
+        self.suffix = suffix
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        logger.info("Disk cache initialized at %s (max %d bytes)", cache_dir, self.max_bytes)
+
+    def path_for(self, key: str) -> str:
+        """Return the file path that stores the given key"""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + self.suffix)
+
+    def get_path(self, key: str) -> Optional[str]:
+        """
+        Look up a key and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[str]: Path to the cached file, or None on a miss
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self._record(hit=False)
+            return None
+        self._record(hit=True)
+        return path
+
+    def contains(self, key: str) -> bool:
+        """Check for a key without touching it or counting a hit/miss"""
+        return os.path.exists(self.path_for(key))
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        """Atomically store bytes under the given key"""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            self._discard(temp_path)
+            raise
+        return self._commit(key, temp_path)
+
+    def put_file(self, key: str, source_path: str, move: bool = False) -> str:
+        """
+        Atomically store an existing file under the given key.
+
+        Args:
+            key: Cache key
+            source_path: File to store
+            move: Move the file into the cache instead of copying it
+
+        Returns:
+            str: Path of the cached file
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            if move:
+                shutil.move(source_path, temp_path)
+            else:
+                shutil.copyfile(source_path, temp_path)
+        except Exception:
+            self._discard(temp_path)
+            raise
+        return self._commit(key, temp_path)
+
+    def delete(self, key: str) -> None:
+        self._discard(self.path_for(key))
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its quota"""
+        entries = []
+        total_bytes = 0
+        for entry in self._entries():
+            entries.append(entry)
+            total_bytes += entry[2]
+
+        if total_bytes <= self.max_bytes:
+            return
+
+        for _, path, size in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            self._discard(path)
+            total_bytes -= size
+            logger.debug("Evicted cache entry: %s", path)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current disk usage"""
+        entries = list(self._entries())
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, _, size in entries),
+            'max_bytes': self.max_bytes,
+        }
+
+    def _commit(self, key: str, temp_path: str) -> str:
+        path = self.path_for(key)
+        os.replace(temp_path, path)
+        self.evict()
+        return path
+
+    def _entries(self):
+        """Yield (mtime, path, size) for every committed entry"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name.endswith(".tmp") or not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Evicted concurrently by another worker
+                continue
+            yield stat.st_mtime, path, stat.st_size
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if self.name:
+            cache_lookups_total.inc(cache=self.name, result="hit" if hit else "miss")
+
+    @staticmethod
+    def _discard(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error("Error removing cache file %s: %s", path, str(e), exc_info=True)
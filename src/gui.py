@@ -5,10 +5,25 @@ import threading
 import time
 from settings import SettingsWindow
 from utils import find_ffmpeg
-from transcription import TranscriptionManager
-from audio_processor import AudioProcessor
+from audio_processor import AudioProcessor, content_id
+from transcription import TranscriptionManager, format_segment
+from jobs import JobManager, max_concurrent_jobs
+from job_store import JobStore
+from transcript_cache import TranscriptCache
+from audio_cache import AudioCache
+from transcript_store import TranscriptStore
+from model_registry import model_registry
+from summarizer import get_client
+from progress_bus import ProgressBus
+from job_panel import QueueEntry, SearchTab
 from config import config
 
+# Checkpoints of the GUI's jobs; separate from the API's, so both can run on one machine
+GUI_JOBS_DIR = "gui-jobs"
+
+# Formats saved from a job's segments instead of the text of its tab
+EXPORT_FORMATS = {".srt": "srt", ".vtt": "vtt", ".json": "json"}
+
 class URLProcessorApp:
     def __init__(self, root):
         self.root = root
@@ -29,17 +44,42 @@ class URLProcessorApp:
         # Initialize variables
         self.transcription_start_time = None
         self.timer_id = None
+        # Incremented for every warm-up, so only the latest one swaps its models in
+        self.warmup_generation = 0
+        self.entries = []
+        self.entry_count = 0
+        self.search_tabs = {}
         
         # Create models directory if it doesn't exist
         os.makedirs(config.models_dir, exist_ok=True)
         
         # Initialize managers
-        self.transcription_manager = TranscriptionManager(config.models_dir, config.settings)
-        self.audio_processor = AudioProcessor(config.settings.get("ffmpeg_path"))
+        self.transcript_cache = TranscriptCache.from_settings(config.cache_dir, config.settings)
+        # Downloaded audio is kept, so a video runs again with other settings without downloading
+        self.audio_cache = AudioCache.from_settings(config.cache_dir, config.settings)
+        # Every completed job is saved here and can be searched
+        self.transcript_store = TranscriptStore.from_settings(config.data_dir, config.settings)
+        # Running jobs are checkpointed here and resumed after the app was closed or crashed
+        self.job_store = None
+        if config.settings.get("resume_jobs", True):
+            self.job_store = JobStore(os.path.join(config.cache_dir, GUI_JOBS_DIR))
+            self.job_store.prune()
+        # Stages uploaded files and expands playlists; the jobs run on the job manager
+        self.audio_processor = self.create_audio_processor()
+        # Queued URLs, files and batches run here, several at once
+        self.concurrency = self.concurrent_jobs()
+        self.job_manager = self.create_job_manager(self.job_settings(config.settings))
 
         self.setup_gui()
+        self.show_concurrency()
+        # Worker threads report through the bus; only the main loop touches widgets
+        self.progress_bus = ProgressBus(self.root)
+        self.progress_bus.start()
         self.check_ffmpeg()
+        # Load the summarization model in Ollama while Whisper loads
+        get_client(config.settings).warm_up_async()
         self.load_model()
+        self.resume_jobs()
 
     def setup_gui(self):
         # Główny scrollowany kontener
@@ -59,7 +99,7 @@ class URLProcessorApp:
         # URL Entry
         self.url_entry = ctk.CTkEntry(
             url_frame, 
-            placeholder_text="Wprowadź URL z YouTube",
+            placeholder_text="Wprowadź URL z YouTube lub ścieżkę do pliku",
             height=40
         )
         self.url_entry.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="ew")
@@ -67,46 +107,65 @@ class URLProcessorApp:
         # Process Button
         self.process_button = ctk.CTkButton(
             url_frame,
-            text="Podsumuj",
+            text="Dodaj do kolejki",
             command=self.process_url,
             height=40,
             width=120
         )
         self.process_button.grid(row=0, column=1, padx=(5, 10), pady=10)
+
+        # Multi-URL mode: one URL per line, playlists and channels are expanded
+        self.batch_mode_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            url_frame,
+            text="Wiele URL / playlista",
+            variable=self.batch_mode_var,
+            command=self.toggle_batch_mode
+        ).grid(row=1, column=0, padx=10, pady=(0, 10), sticky="w")
+
+        # Local recordings are transcribed directly, without yt-dlp
+        ctk.CTkButton(
+            url_frame,
+            text="Plik lokalny...",
+            command=self.choose_file,
+            width=120
+        ).grid(row=1, column=1, padx=(5, 10), pady=(0, 10))
+
+        self.urls_text = ctk.CTkTextbox(url_frame, height=100, wrap="none")
+        self.urls_text.grid(row=2, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="ew")
+        self.urls_text.grid_remove()
+
+        # Full-text search over all stored transcripts
+        if self.transcript_store:
+            self.search_entry = ctk.CTkEntry(url_frame, placeholder_text="Szukaj w zapisanych transkrypcjach")
+            self.search_entry.grid(row=3, column=0, padx=(10, 5), pady=(0, 10), sticky="ew")
+            self.search_entry.bind("<Return>", lambda event: self.search_transcripts())
+            ctk.CTkButton(
+                url_frame,
+                text="Szukaj",
+                command=self.search_transcripts,
+                width=120
+            ).grid(row=3, column=1, padx=(5, 10), pady=(0, 10))
         
-        # Transcription Frame
-        transcription_frame = ctk.CTkFrame(self.main_frame)
-        transcription_frame.grid(row=1, column=0, padx=10, pady=(0, 20), sticky="nsew")
-        transcription_frame.grid_columnconfigure(0, weight=1)
-        transcription_frame.grid_rowconfigure(1, weight=1)
-        
-        ctk.CTkLabel(transcription_frame, text="Transkrypcja:", anchor="w").grid(
-            row=0, column=0, padx=10, pady=(10, 5), sticky="w"
-        )
-        
-        self.transcription_text = ctk.CTkTextbox(
-            transcription_frame,
-            height=200,
-            wrap="word"
-        )
-        self.transcription_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
-        
-        # Summary Frame
-        summary_frame = ctk.CTkFrame(self.main_frame)
-        summary_frame.grid(row=2, column=0, padx=10, pady=(0, 20), sticky="nsew")
-        summary_frame.grid_columnconfigure(0, weight=1)
-        summary_frame.grid_rowconfigure(1, weight=1)
-        
-        ctk.CTkLabel(summary_frame, text="Podsumowanie:", anchor="w").grid(
+        # Job Queue Frame
+        queue_frame = ctk.CTkFrame(self.main_frame)
+        queue_frame.grid(row=1, column=0, padx=10, pady=(0, 20), sticky="ew")
+        queue_frame.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(queue_frame, text="Kolejka zadań:", anchor="w").grid(
             row=0, column=0, padx=10, pady=(10, 5), sticky="w"
         )
-        
-        self.summary_text = ctk.CTkTextbox(
-            summary_frame,
-            height=200,
-            wrap="word"
-        )
-        self.summary_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
+        self.concurrency_label = ctk.CTkLabel(queue_frame, text="", anchor="e")
+        self.concurrency_label.grid(row=0, column=1, padx=10, pady=(10, 5), sticky="e")
+
+        # One progress row per queued URL, file or batch
+        self.queue_rows = ctk.CTkScrollableFrame(queue_frame, height=120)
+        self.queue_rows.grid(row=1, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="ew")
+        self.queue_rows.grid_columnconfigure(0, weight=1)
+
+        # Results Frame: one tab per queue entry
+        self.results_tabs = ctk.CTkTabview(self.main_frame, height=480)
+        self.results_tabs.grid(row=2, column=0, padx=10, pady=(0, 20), sticky="nsew")
         
         # Status Frame
         status_frame = ctk.CTkFrame(self.main_frame)
@@ -126,6 +185,10 @@ class URLProcessorApp:
         self.progress_bar.grid(row=2, column=0, padx=10, pady=(5, 10), sticky="ew")
         self.progress_bar.set(0)
         
+        # Model Status Label
+        self.model_status_label = ctk.CTkLabel(status_frame, text="", justify="left")
+        self.model_status_label.grid(row=3, column=0, padx=10, pady=(0, 5), sticky="w")
+        
         # Save Button
         self.save_button = ctk.CTkButton(
             self.main_frame,
@@ -148,24 +211,104 @@ class URLProcessorApp:
         if not config.settings.get("ffmpeg_path"):
             ffmpeg_path = find_ffmpeg()
             if ffmpeg_path:
-                config.settings["ffmpeg_path"] = ffmpeg_path
-                config.save_settings(config.settings)
-                self.audio_processor = AudioProcessor(ffmpeg_path)
+                self.set_ffmpeg_path(ffmpeg_path)
+
+    def set_ffmpeg_path(self, ffmpeg_path):
+        config.settings["ffmpeg_path"] = ffmpeg_path
+        config.save_settings(config.settings)
+        self.audio_processor = self.create_audio_processor()
+        # The job settings are a copy, pinned until the next model swap
+        self.job_manager.settings = {**self.job_manager.settings, 'ffmpeg_path': ffmpeg_path}
 
     def load_model(self):
+        """
+        Warm up the models for the current settings in a background thread.
+
+        The window stays responsive meanwhile. Jobs keep using the models of
+        the previous settings until the new ones are loaded; a job started
+        before any model is loaded waits for this warm-up in the model registry.
+        """
+        self.warmup_generation += 1
+        settings = self.job_settings(config.settings)
+        self.show_model_status(f"Rozgrzewanie modelu {settings['model']}...")
+        threading.Thread(
+            target=self.warm_up_thread,
+            args=(settings, self.warmup_generation),
+            name="model-warm-up",
+            daemon=True
+        ).start()
+
+    def warm_up_thread(self, settings, generation):
+        model = settings['model']
+
+        def report(message, progress=None):
+            self.progress_bus.call(self.show_model_status, f"Rozgrzewanie modelu {model}: {message}")
+
         try:
-            self.transcription_manager.load_models(self.update_progress)
+            TranscriptionManager(config.models_dir, settings).load_models(report)
         except Exception as e:
-            print(f"Error loading whisper model: {str(e)}")
-            self.update_progress(f"Error loading model: {str(e)}", 0)
+            self.progress_bus.call(self.show_model_status, f"Błąd ładowania modelu {model}: {str(e)}")
+            return
+        self.progress_bus.call(self.swap_models, settings, generation)
+
+    def swap_models(self, settings, generation):
+        """Switch jobs over to freshly warmed-up settings; running jobs finish with the old ones"""
+        if generation != self.warmup_generation:
+            # Settings changed again while this warm-up ran
+            return
+        # Workers read the settings when they start a job
+        self.job_manager.settings = settings
+        self.show_model_status(f"Model {settings['model']} gotowy ({settings['device'].upper()})")
+
+    def concurrent_jobs(self):
+        """Configured number of concurrent jobs, capped by what the machine can run"""
+        limit = max_concurrent_jobs(config.settings)
+        configured = int(config.settings.get("gui_concurrent_jobs", 0))
+        return min(configured, limit) if configured > 0 else limit
+
+    def job_settings(self, settings):
+        """Settings for the job workers: one model replica per concurrent job"""
+        num_workers = max(int(settings.get("num_workers", 1)), self.concurrency)
+        return {**settings, 'num_workers': num_workers}
+
+    def create_audio_processor(self):
+        return AudioProcessor(config.settings.get("ffmpeg_path"), config.settings.get("audio_extraction", "pcm"))
+
+    def create_job_manager(self, settings):
+        return JobManager(
+            config.models_dir, settings, num_workers=self.concurrency,
+            transcript_cache=self.transcript_cache, job_store=self.job_store,
+            transcript_store=self.transcript_store, audio_cache=self.audio_cache
+        )
+
+    def show_concurrency(self):
+        self.concurrency_label.configure(text=f"Równoległe zadania: {self.concurrency}")
+
+    def show_model_status(self, message):
+        self.model_status_label.configure(text=message)
 
     def open_settings(self):
         SettingsWindow(self.root, config.settings, self.change_settings)
 
     def change_settings(self, new_settings):
+        # Jobs keep the current settings until the new models are warm
+        current_settings = dict(self.job_manager.settings)
+        show_timestamps = config.settings.get("show_timestamps", True)
         config.update_settings(new_settings)
-        self.transcription_manager.settings = config.settings
-        self.audio_processor = AudioProcessor(config.settings.get("ffmpeg_path"))
+        if config.settings.get("show_timestamps", True) != show_timestamps:
+            # The segments are kept, so toggling timestamps only re-renders the transcripts
+            for entry in self.entries:
+                entry.rerender(self.render_segment, self.segment_separator())
+        self.audio_processor = self.create_audio_processor()
+        model_registry.memory_budget_mb = config.settings.get("model_memory_budget_mb", 4096)
+        concurrency = self.concurrent_jobs()
+        if concurrency != self.concurrency:
+            # Jobs already queued finish on the old workers; shutdown() waits for their downloads
+            threading.Thread(target=self.job_manager.shutdown, name="job-manager-shutdown", daemon=True).start()
+            self.concurrency = concurrency
+            self.job_manager = self.create_job_manager(current_settings)
+            self.show_concurrency()
+        get_client(config.settings).warm_up_async()
         self.load_model()
 
     def update_timer(self):
@@ -188,16 +331,40 @@ class URLProcessorApp:
             self.root.after_cancel(self.timer_id)
             self.timer_id = None
 
-    def update_progress(self, message, progress=None):
-        """Update progress bar and label"""
-        self.progress_label.configure(text=message)
-        if progress is not None:
-            self.progress_bar.set(progress / 100)
-        self.root.update()
+    def toggle_batch_mode(self):
+        """Switch between the single URL entry and the multi-URL box"""
+        if self.batch_mode_var.get():
+            self.url_entry.grid_remove()
+            self.urls_text.grid()
+        else:
+            self.urls_text.grid_remove()
+            self.url_entry.grid()
+
+    def choose_file(self):
+        """Pick a local audio or video file to transcribe instead of a URL"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[
+                ("Pliki audio i wideo", "*.wav *.mp3 *.m4a *.flac *.ogg *.opus *.aac *.mp4 *.mkv *.mov *.webm"),
+                ("Wszystkie pliki", "*.*")
+            ]
+        )
+        if not file_path:
+            return
+        if self.batch_mode_var.get():
+            self.batch_mode_var.set(False)
+            self.toggle_batch_mode()
+        self.url_entry.delete(0, ctk.END)
+        self.url_entry.insert(0, file_path)
 
     def process_url(self):
-        url = self.url_entry.get().strip()
-        if not url:
+        """Queue the URL, local file or list of URLs; jobs run while more are queued"""
+        if self.batch_mode_var.get():
+            urls = [line.strip() for line in self.urls_text.get(1.0, ctk.END).splitlines() if line.strip()]
+            url = None
+        else:
+            urls = None
+            url = self.url_entry.get().strip()
+        if not url and not urls:
             messagebox.showerror("Error", "Please enter a URL")
             return
 
@@ -207,100 +374,182 @@ class URLProcessorApp:
             if not ffmpeg_path:
                 messagebox.showerror("Error", "FFmpeg not found. Please set FFmpeg path in settings.")
                 return
-            config.settings["ffmpeg_path"] = ffmpeg_path
-            config.save_settings(config.settings)
-            self.audio_processor = AudioProcessor(ffmpeg_path)
-
-        self.process_button.configure(state='disabled')
-        self.save_button.configure(state='disabled')
-        self.transcription_text.delete(1.0, ctk.END)
-        self.summary_text.delete(1.0, ctk.END)
-        self.progress_bar.set(0)
-        
+            self.set_ffmpeg_path(ffmpeg_path)
+
+        if urls:
+            entry = self.add_entry(f"Lista URL ({len(urls)})")
+            entry.set_status("Rozwijanie listy URL...")
+            target, args = self.queue_batch_thread, (entry, urls)
+        elif os.path.isfile(url):
+            entry = self.add_entry(os.path.basename(url))
+            entry.set_status("Odczytywanie pliku...")
+            target, args = self.queue_file_thread, (entry, url)
+        else:
+            entry = self.add_entry(url)
+            # Downloads start right away, even while all workers are busy
+            self.attach_job(entry, self.job_manager.submit(url, prefetch=True))
+            target = None
+
+        if target:
+            threading.Thread(target=target, args=args, daemon=True).start()
+        self.url_entry.delete(0, ctk.END)
+        self.urls_text.delete(1.0, ctk.END)
+        self.refresh_jobs()
+
+    def add_entry(self, title):
+        """Add a progress row and a result tab for a new queue entry"""
+        self.entry_count += 1
+        name = f"#{self.entry_count} {title if len(title) <= 40 else title[:39] + '…'}"
+        entry = QueueEntry(
+            self.queue_rows, self.results_tabs, name,
+            self.render_segment, self.segment_separator(), self.close_entry
+        )
+        self.entries.append(entry)
+        self.results_tabs.set(name)
+        return entry
+
+    def resume_jobs(self):
+        """Queue again the jobs that were unfinished when the app was last closed"""
+        jobs = self.job_manager.resume_unfinished()
+        for job in jobs:
+            self.attach_job(self.add_entry(job.title or job.url), job)
+
+    def render_segment(self, segment):
+        return format_segment(segment, config.settings.get("show_timestamps", True))
+
+    def segment_separator(self):
+        return "\n" if config.settings.get("show_timestamps", True) else " "
+
+    def queue_file_thread(self, entry, file_path):
+        # Hashing a long recording takes a while, so it is not done on the main loop
         try:
-            threading.Thread(
-                target=self.process_url_thread,
-                args=(url,),
-                daemon=True
-            ).start()
-            
+            file_id = content_id(file_path)
+            audio_file = self.audio_processor.stage_local_file(file_path)
+            job = self.job_manager.submit(file_id, title=os.path.basename(file_path), audio_file=audio_file)
         except Exception as e:
-            self.show_transcription_error(str(e))
-            self.process_button.configure(state='normal')
-            self.save_button.configure(state='normal')
+            self.progress_bus.call(self.fail_entry, entry, str(e))
+            return
+        self.progress_bus.call(self.attach_job, entry, job)
 
-    def process_url_thread(self, url):
+    def queue_batch_thread(self, entry, urls):
         try:
-            # Download audio
-            self.update_progress("Downloading audio...", 10)
-            audio_file = self.audio_processor.download_audio(url, self.download_progress_hook)
-            
-            # Set the audio file in transcription manager
-            self.transcription_manager.temp_audio_file = audio_file
-            
-            # Start transcription
-            self.start_timer()
-            transcription, summary = self.transcription_manager.transcribe(self.update_progress)
-            
-            # Update UI with results
-            self.root.after(0, self.update_results, transcription, summary)
-            
+            items, duplicates = self.audio_processor.expand_urls(
+                urls, int(config.settings.get("batch_max_items", 1000))
+            )
+            if not items:
+                raise ValueError("Nie znaleziono filmów pod podanymi adresami")
+            batch = self.job_manager.submit_batch(items, duplicates=duplicates)
         except Exception as e:
-            self.root.after(0, self.show_transcription_error, str(e))
-        finally:
-            self.root.after(0, self.cleanup)
-            if hasattr(self, 'audio_file') and self.audio_file:
-                self.audio_processor.cleanup(self.audio_file)
-
-    def download_progress_hook(self, d):
-        """Progress hook for yt-dlp"""
-        if d['status'] == 'downloading':
-            total_bytes = d.get('total_bytes')
-            downloaded_bytes = d.get('downloaded_bytes', 0)
-            if total_bytes:
-                progress = (downloaded_bytes / total_bytes) * 50  # Use first 50% for download
-                self.update_progress(f"Downloading audio... {progress:.1f}%", progress)
-        elif d['status'] == 'finished':
-            self.update_progress("Download completed. Starting transcription...", 50)
-
-    def update_results(self, transcription, summary):
-        """Update UI with transcription and summary results"""
-        self.transcription_text.delete(1.0, ctk.END)
-        self.transcription_text.insert(ctk.END, transcription)
-        self.summary_text.delete(1.0, ctk.END)
-        self.summary_text.insert(ctk.END, summary)
-        self.cleanup()
-
-    def show_transcription_error(self, error_message):
-        """Show error message in UI"""
-        messagebox.showerror("Error", error_message)
-        self.cleanup()
-
-    def cleanup(self):
-        """Reset UI state after processing"""
-        self.process_button.configure(state='normal')
-        self.save_button.configure(state='normal')
-        self.stop_timer()
-        self.progress_bar.set(0)
-        self.progress_label.configure(text="Status")
+            self.progress_bus.call(self.fail_entry, entry, str(e))
+            return
+        self.progress_bus.call(self.attach_batch, entry, batch)
+
+    def attach_job(self, entry, job):
+        """Show a job in its queue entry, which is refreshed whenever the job changes"""
+        entry.attach_job(job)
+        self.watch([job])
+
+    def attach_batch(self, entry, batch):
+        entry.attach_batch(batch)
+        self.watch(batch.jobs)
+
+    def fail_entry(self, entry, error):
+        entry.fail(error)
+        self.refresh_jobs()
+
+    def watch(self, jobs):
+        for job in jobs:
+            job.add_listener(self.jobs_changed)
+        # Changes made before the listeners were added
+        self.refresh_jobs()
+
+    def jobs_changed(self):
+        # Runs on the worker threads for every progress update and segment; the bus
+        # coalesces them into one refresh per frame
+        self.progress_bus.notify(self.refresh_jobs)
+
+    def refresh_jobs(self):
+        """Refresh the queue rows, result tabs and overall status; runs on the main loop"""
+        for entry in self.entries:
+            entry.update()
+
+        pending = [entry for entry in self.entries if not entry.finished]
+        active = [entry for entry in pending if entry.active]
+        if pending:
+            if not self.transcription_start_time:
+                self.start_timer()
+            self.progress_label.configure(
+                text=f"Aktywne zadania: {len(active)}, w kolejce: {len(pending) - len(active)}"
+            )
+            self.progress_bar.set(sum(entry.progress for entry in active) / len(active) / 100 if active else 0)
+        else:
+            self.stop_timer()
+            self.transcription_start_time = None
+            self.progress_label.configure(text="Status")
+            self.progress_bar.set(0)
+
+    def search_transcripts(self):
+        query = self.search_entry.get().strip()
+        if not query:
+            return
+        threading.Thread(target=self.search_thread, args=(query,), daemon=True).start()
+
+    def search_thread(self, query):
+        try:
+            results = self.transcript_store.search(query, limit=200)
+        except Exception as e:
+            self.progress_bus.call(messagebox.showerror, "Error", str(e))
+            return
+        self.progress_bus.call(self.show_search_results, query, results)
+
+    def show_search_results(self, query, results):
+        """Open the segments matching a search in a new result tab"""
+        self.entry_count += 1
+        name = f"#{self.entry_count} Szukaj: {query if len(query) <= 30 else query[:29] + '…'}"
+        self.search_tabs[name] = SearchTab(
+            self.results_tabs, name, results, lambda: self.search_tabs.pop(name).destroy()
+        )
+        self.results_tabs.set(name)
+
+    def close_entry(self, entry):
+        """Close the result tab of a finished entry and remove its row"""
+        if not entry.finished:
+            messagebox.showinfo("Info", "Zadanie jest jeszcze w toku")
+            return
+        self.entries.remove(entry)
+        entry.destroy()
 
     def save_to_file(self):
-        """Save transcription and summary to a file"""
-        if not self.transcription_text.get(1.0, ctk.END).strip() and not self.summary_text.get(1.0, ctk.END).strip():
+        """
+        Save the selected result tab to a file.
+
+        .srt, .vtt and .json files get the segments of a completed job in that
+        format; any other file gets the transcription and summary as text.
+        """
+        name = self.results_tabs.get() if self.entries or self.search_tabs else None
+        entry = next((entry for entry in self.entries if entry.name == name), None)
+        tab = self.search_tabs.get(name) or (entry.tab if entry else None)
+        if not tab or not tab.get_text().strip():
             messagebox.showerror("Error", "No text to save")
             return
             
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[
+                ("Text files", "*.txt"), ("SubRip subtitles", "*.srt"), ("WebVTT subtitles", "*.vtt"),
+                ("JSON", "*.json"), ("All files", "*.*")
+            ]
         )
         
         if file_path:
+            fmt = EXPORT_FORMATS.get(os.path.splitext(file_path)[1].lower())
+            text = entry.export(fmt) if fmt and entry else tab.get_text()
+            if text is None or (fmt and not entry):
+                messagebox.showerror("Error", "Napisy i JSON można zapisać tylko dla ukończonego pojedynczego zadania")
+                return
             try:
                 with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(self.transcription_text.get(1.0, ctk.END))
-                    file.write("\n\n")
-                    file.write(self.summary_text.get(1.0, ctk.END))
+                    file.write(text)
                 messagebox.showinfo("Success", "File saved successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Error saving file: {str(e)}")
@@ -0,0 +1,260 @@
+"""
+Job Panel Module
+
+This module provides the widgets of the GUI job queue: a progress row per
+queued URL, file or batch, and a result tab with the transcript and summary of
+each. The jobs themselves run on the GUI's JobManager; QueueEntry ties a job
+(or batch) to its row and tab, and update() copies the job's progress and new
+segments into them. The GUI calls it from the Tk main loop when the ProgressBus
+reports a change of the job, so the widgets are never touched from a worker
+thread. Transcript searches get a result tab of
+their own (SearchTab). Finished single jobs can be exported as SRT, VTT or
+JSON and re-rendered with or without timestamps from their segments.
+
+Example:
+    >>> from job_panel import QueueEntry
+    >>> entry = QueueEntry(queue_frame, tabview, "#1 https://youtu.be/...", format_segment)
+    >>> entry.attach_job(job_manager.submit(url, prefetch=True))
+    >>> entry.update()  # on the main loop, after the job changed
+    >>> entry.finished
+    True
+"""
+
+import time
+from typing import Callable, List, Optional
+import customtkinter as ctk
+from jobs import Job, Batch, JobStatus
+from transcript_view import TranscriptView
+
+class ResultTab:
+    """Transcript, summary and stage timings of one queue entry"""
+
+    def __init__(self, tabview: ctk.CTkTabview, name: str, on_close: Callable[[], None]):
+        self.tabview = tabview
+        self.name = name
+        frame = tabview.add(name)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(0, weight=1)
+
+        self.transcript_view = TranscriptView(frame, height=200)
+        self.transcript_view.frame.grid(row=0, column=0, columnspan=2, padx=5, pady=(5, 10), sticky="nsew")
+
+        ctk.CTkLabel(frame, text="Podsumowanie:", anchor="w").grid(row=1, column=0, padx=5, sticky="w")
+        self.summary_text = ctk.CTkTextbox(frame, height=150, wrap="word")
+        self.summary_text.grid(row=2, column=0, columnspan=2, padx=5, pady=(5, 5), sticky="nsew")
+
+        self.timings_label = ctk.CTkLabel(frame, text="", justify="left", anchor="w")
+        self.timings_label.grid(row=3, column=0, padx=5, sticky="w")
+        ctk.CTkButton(frame, text="Zamknij", width=80, command=on_close).grid(row=3, column=1, padx=5, pady=5)
+
+    def show_result(self, job: Job) -> None:
+        """Show the outcome of a finished single job"""
+        if job.status == JobStatus.FAILED:
+            self.transcript_view.set_text(job.error)
+            return
+        # Segments were streamed into the view already (with their start times for
+        # jumping); the text is only needed if none arrived
+        if self.transcript_view.is_empty():
+            self.transcript_view.set_text(job.result['transcription'])
+        self.summary_text.delete(1.0, ctk.END)
+        self.summary_text.insert(ctk.END, job.result['summary'] or "")
+        self.show_timings(job.result.get('timings', {}))
+
+    def append_batch_result(self, job: Job) -> None:
+        """Append the transcription and summary of one finished batch item"""
+        header = f"=== {job.title or job.url} ===\n"
+        if self.summary_text.index("end-1c") != "1.0":
+            self.summary_text.insert(ctk.END, "\n\n")
+        self.summary_text.insert(ctk.END, header)
+        if not self.transcript_view.is_empty():
+            # The view separates appended text with one newline
+            header = "\n" + header
+        if job.status == JobStatus.FAILED:
+            self.transcript_view.append_text(header + job.error)
+        else:
+            self.transcript_view.append_text(header + job.result['transcription'])
+            self.summary_text.insert(ctk.END, job.result['summary'] or "")
+
+    def show_timings(self, timings: dict) -> None:
+        """Show how long each processing stage took"""
+        stages = [
+            ("download", "Pobieranie"), ("metadata", "Metadane"), ("extract", "Ekstrakcja"),
+            ("decode", "Dekodowanie"), ("model_load", "Ładowanie modelu"),
+            ("language_detection", "Wykrywanie języka"), ("transcription", "Transkrypcja"),
+            ("summarization", "Podsumowanie")
+        ]
+        parts = [f"{label}: {timings[stage]:.1f}s" for stage, label in stages if stage in timings]
+        if 'real_time_factor' in timings:
+            parts.append(f"RTF: {timings['real_time_factor']:.2f}")
+        self.timings_label.configure(text=" | ".join(parts))
+
+    def get_text(self) -> str:
+        return self.transcript_view.get_text() + "\n\n" + self.summary_text.get(1.0, ctk.END)
+
+    def destroy(self) -> None:
+        self.tabview.delete(self.name)
+
+def format_ms(milliseconds: int) -> str:
+    """Format a timestamp in milliseconds as h:mm:ss.mmm"""
+    seconds, milliseconds = divmod(int(milliseconds), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+class SearchTab:
+    """Segments of stored transcripts matching a search query"""
+
+    def __init__(self, tabview: ctk.CTkTabview, name: str, results: List[dict], on_close: Callable[[], None]):
+        self.tabview = tabview
+        self.name = name
+        frame = tabview.add(name)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(0, weight=1)
+
+        self.transcript_view = TranscriptView(frame, height=360)
+        self.transcript_view.frame.grid(row=0, column=0, padx=5, pady=(5, 10), sticky="nsew")
+        ctk.CTkButton(frame, text="Zamknij", width=80, command=on_close).grid(
+            row=1, column=0, padx=5, pady=5, sticky="e"
+        )
+
+        if results:
+            self.transcript_view.set_text("\n".join(
+                f"[{format_ms(result['start_ms'])}] {result['title'] or result['url']}: {result['text']}"
+                for result in results
+            ))
+        else:
+            self.transcript_view.set_text("Brak wyników")
+
+    def get_text(self) -> str:
+        return self.transcript_view.get_text()
+
+    def destroy(self) -> None:
+        self.tabview.delete(self.name)
+
+class QueueEntry:
+    """One queued URL, local file or batch with its progress row and result tab"""
+
+    def __init__(self, queue_frame, tabview: ctk.CTkTabview, name: str,
+                 format_segment: Callable[[dict], str], separator: str = "\n",
+                 on_close: Optional[Callable[["QueueEntry"], None]] = None):
+        self.name = name
+        self.format_segment = format_segment
+        self.separator = separator
+        self.job: Optional[Job] = None
+        self.batch: Optional[Batch] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._segments_shown = 0
+        self._jobs_shown = set()
+
+        self.row = ctk.CTkFrame(queue_frame)
+        self.row.grid_columnconfigure(0, weight=1)
+        self.row.grid(column=0, padx=5, pady=(0, 5), sticky="ew")
+        self.title_label = ctk.CTkLabel(self.row, text=name, anchor="w")
+        self.title_label.grid(row=0, column=0, padx=5, sticky="w")
+        self.status_label = ctk.CTkLabel(self.row, text="W kolejce", anchor="e")
+        self.status_label.grid(row=0, column=1, padx=5, sticky="e")
+        self.progress_bar = ctk.CTkProgressBar(self.row)
+        self.progress_bar.grid(row=1, column=0, columnspan=2, padx=5, pady=(0, 5), sticky="ew")
+        self.progress_bar.set(0)
+
+        self.tab = ResultTab(tabview, name, lambda: on_close(self) if on_close else None)
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def active(self) -> bool:
+        """Whether the entry is downloading or transcribing right now"""
+        if self.finished:
+            return False
+        if self.job:
+            return self.job.status in (JobStatus.DOWNLOADING, JobStatus.RUNNING)
+        if self.batch:
+            return any(job.status in (JobStatus.DOWNLOADING, JobStatus.RUNNING) for job in self.batch.jobs)
+        return True
+
+    @property
+    def progress(self) -> float:
+        return self.progress_bar.get() * 100
+
+    def set_status(self, message: str) -> None:
+        self.status_label.configure(text=message)
+
+    def attach_job(self, job: Job) -> None:
+        self.job = job
+
+    def attach_batch(self, batch: Batch) -> None:
+        self.batch = batch
+
+    def fail(self, error: str) -> None:
+        """Mark an entry that could not be queued, e.g. because a playlist was not found"""
+        self.error = error
+        self.finished_at = time.time()
+        self.set_status("Błąd")
+        self.tab.transcript_view.set_text(error)
+
+    def update(self) -> None:
+        """Copy progress and new segments into the row and tab; call from the main loop"""
+        if self.finished:
+            return
+        if self.job:
+            self._update_job()
+        elif self.batch:
+            self._update_batch()
+
+    def export(self, fmt: str) -> Optional[str]:
+        """Render the segments of a completed single job in one of segments.FORMATS"""
+        if not self.job or self.job.status != JobStatus.COMPLETED:
+            return None
+        return self.job.segments.render(fmt)
+
+    def rerender(self, format_segment: Callable[[dict], str], separator: str) -> None:
+        """Show the segments received so far in a new format, e.g. after timestamps were toggled"""
+        self.format_segment = format_segment
+        self.separator = separator
+        if not self.job or not self._segments_shown:
+            return
+        view = self.tab.transcript_view
+        view.clear()
+        view.append_segments(self.job.segments[:self._segments_shown], format_segment, separator)
+
+    def _update_job(self) -> None:
+        job = self.job
+        # Segments are only ever appended, so the slice is consistent without the job lock
+        new_segments = job.segments[self._segments_shown:]
+        if new_segments:
+            self._segments_shown += len(new_segments)
+            self.tab.transcript_view.append_segments(new_segments, self.format_segment, self.separator)
+        self.progress_bar.set(job.progress / 100)
+        self.set_status(f"{job.message} ({self._elapsed()})" if job.started_at else job.message)
+        if job.status in JobStatus.FINISHED:
+            self.finished_at = time.time()
+            self.tab.show_result(job)
+            self.set_status("Ukończono" if job.status == JobStatus.COMPLETED else "Błąd")
+
+    def _update_batch(self) -> None:
+        finished = self.batch.finished
+        state = self.batch.to_dict()
+        for job in self.batch.jobs:
+            if job.id not in self._jobs_shown and job.status in JobStatus.FINISHED:
+                self._jobs_shown.add(job.id)
+                self.tab.append_batch_result(job)
+        self.progress_bar.set(state['progress'] / 100)
+        failed = state['counts'].get(JobStatus.FAILED, 0)
+        self.set_status(
+            f"Ukończono {len(self._jobs_shown)} z {state['total']} "
+            f"(błędy: {failed}, pominięte duplikaty: {self.batch.duplicates})"
+        )
+        if finished:
+            self.finished_at = time.time()
+
+    def _elapsed(self) -> str:
+        elapsed = time.time() - self.job.started_at
+        return f"{int(elapsed // 60):02d}:{int(elapsed % 60):02d}"
+
+    def destroy(self) -> None:
+        self.row.destroy()
+        self.tab.destroy()
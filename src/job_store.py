@@ -0,0 +1,304 @@
+"""
+Shared Job State Module
+
+This module mirrors job state to a directory so that several server processes
+can answer for each other's jobs. In multi-process server mode the HTTP
+workers put job requests into the store's queue, a single inference process
+claims and runs them, and the status, progress, result and segments it writes
+back are read by whichever HTTP worker receives the status or stream request.
+Snapshots and queue entries are written atomically (temporary file +
+os.replace); segments are appended to a JSON-lines file as they are produced.
+A queue entry stays claimed until its job finishes, so jobs interrupted by a
+restart are run again.
+
+The segments file doubles as the job's checkpoint: every segment is appended
+as soon as it is transcribed, and the job's audio is moved into the store
+(keep_audio) until the job finishes. A job that is run again after a crash or
+restart continues after its last checkpointed segment instead of starting
+over. A JobManager that runs its own jobs (the single-process API and the GUI)
+records them with track(), so it can resume them from claimed_requests().
+
+Example:
+    >>> from job_store import JobStore
+    >>> store = JobStore("/tmp/yapper-jobs")
+    >>> store.save_job({"id": "abc", "status": "queued"})
+    >>> store.load_job("abc")["status"]
+    'queued'
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import Iterator, List, Optional, Tuple
+from logger import logger
+
+QUEUE_DIR = "queue"
+CLAIMED_DIR = "claimed"
+AUDIO_DIR = "audio"
+METRICS_FILE = "metrics.prom"
+STATUS_FILE = "inference.json"
+
+# Job and batch IDs are uuid4 hex strings; anything else is never a valid file name
+ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+class JobStore:
+    def __init__(self, directory: str, ttl_seconds: float = 24 * 3600):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.queue_dir = os.path.join(directory, QUEUE_DIR)
+        self.claimed_dir = os.path.join(directory, CLAIMED_DIR)
+        self.audio_dir = os.path.join(directory, AUDIO_DIR)
+        os.makedirs(self.queue_dir, exist_ok=True)
+        os.makedirs(self.claimed_dir, exist_ok=True)
+        os.makedirs(self.audio_dir, exist_ok=True)
+
+    def enqueue(self, request: dict) -> None:
+        """Queue a job request ('id', 'url', 'options', 'title', 'batch_id') for the inference process"""
+        self._write_json(os.path.join(self.queue_dir, self._request_name(request)), request)
+
+    def track(self, request: dict) -> None:
+        """Record a job request as claimed by the calling process, which runs it itself"""
+        self._write_json(os.path.join(self.claimed_dir, self._request_name(request)), request)
+
+    def update_claim(self, request: dict) -> None:
+        """Replace the stored request of a claimed job, keeping its place in the queue order"""
+        for name in os.listdir(self.claimed_dir):
+            if name.endswith(f"-{request['id']}.json"):
+                self._write_json(os.path.join(self.claimed_dir, name), request)
+                return
+        self.track(request)
+
+    def claimed_requests(self) -> List[dict]:
+        """Requests claimed but never finished, oldest first; e.g. jobs interrupted by a restart"""
+        requests = []
+        for name in sorted(os.listdir(self.claimed_dir)):
+            if name.endswith(".tmp"):
+                continue
+            request = self._read_json(os.path.join(self.claimed_dir, name))
+            if request:
+                requests.append(request)
+        return requests
+
+    def claim_next(self) -> Optional[dict]:
+        """Take the oldest queued request, or return None if the queue is empty"""
+        for name in sorted(os.listdir(self.queue_dir)):
+            if name.endswith(".tmp"):
+                continue
+            claimed_path = os.path.join(self.claimed_dir, name)
+            try:
+                os.replace(os.path.join(self.queue_dir, name), claimed_path)
+            except FileNotFoundError:
+                continue
+            return self._read_json(claimed_path)
+        return None
+
+    def queue_depth(self) -> int:
+        """Number of requests not yet claimed by the inference process"""
+        return sum(1 for name in os.listdir(self.queue_dir) if not name.endswith(".tmp"))
+
+    def release(self, job_id: str) -> None:
+        """Forget the claim and the kept audio of a finished job"""
+        for name in os.listdir(self.claimed_dir):
+            if name.endswith(f"-{job_id}.json"):
+                try:
+                    os.remove(os.path.join(self.claimed_dir, name))
+                except FileNotFoundError:
+                    pass
+        self.discard_audio(job_id)
+
+    def requeue_claimed(self) -> int:
+        """Queue again every request that was claimed but never finished; their checkpoints are kept"""
+        names = [name for name in os.listdir(self.claimed_dir) if not name.endswith(".tmp")]
+        for name in names:
+            os.replace(os.path.join(self.claimed_dir, name), os.path.join(self.queue_dir, name))
+        if names:
+            logger.info("Requeued %d interrupted jobs", len(names))
+        return len(names)
+
+    def save_job(self, job_dict: dict) -> None:
+        """Atomically replace the snapshot of a job"""
+        self._write_json(self._path(job_dict['id'], ".json"), job_dict)
+
+    def load_job(self, job_id: str) -> Optional[dict]:
+        return self._read_json(self._path(job_id, ".json"))
+
+    def append_segment(self, job_id: str, segment: dict) -> None:
+        with open(self._path(job_id, ".segments.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(segment, ensure_ascii=False) + "\n")
+
+    def load_checkpoint(self, job_id: str) -> List[dict]:
+        """
+        Return the segments an interrupted run of a job committed.
+
+        A segment the run was writing when it died is cut off the file, so the
+        next run appends after the last complete one.
+        """
+        try:
+            with open(self._path(job_id, ".segments.jsonl"), "r+b") as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    f.truncate(end)
+        except FileNotFoundError:
+            return []
+        return [json.loads(line) for line in data[:end].decode("utf-8").splitlines() if line]
+
+    def keep_audio(self, job_id: str, audio_file: str) -> str:
+        """
+        Move a job's prepared audio into the store, where it stays until release().
+
+        Returns:
+            str: The new path of the audio file
+        """
+        self._check_id(job_id)
+        kept = os.path.join(self.audio_dir, job_id + os.path.splitext(audio_file)[1])
+        if os.path.abspath(audio_file) == os.path.abspath(kept):
+            return audio_file
+        shutil.move(audio_file, kept)
+        # The audio was the only file of its temporary directory
+        try:
+            os.rmdir(os.path.dirname(audio_file))
+        except OSError:
+            pass
+        return kept
+
+    def find_audio(self, job_id: str) -> Optional[str]:
+        """Path of the audio kept for a job, or None"""
+        self._check_id(job_id)
+        for name in os.listdir(self.audio_dir):
+            if os.path.splitext(name)[0] == job_id:
+                return os.path.join(self.audio_dir, name)
+        return None
+
+    def discard_audio(self, job_id: str) -> None:
+        audio_file = self.find_audio(job_id)
+        if audio_file:
+            try:
+                os.remove(audio_file)
+            except FileNotFoundError:
+                pass
+
+    def read_segments(self, job_id: str, offset: int = 0) -> Tuple[List[dict], int]:
+        """
+        Read the segments appended since a byte offset.
+
+        Only complete lines are returned, so a segment that is being written
+        concurrently is picked up by the next call.
+
+        Returns:
+            Tuple[List[dict], int]: New segments and the offset to continue from
+        """
+        try:
+            with open(self._path(job_id, ".segments.jsonl"), "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        end = data.rfind(b"\n") + 1
+        lines = data[:end].decode("utf-8").splitlines()
+        return [json.loads(line) for line in lines if line], offset + end
+
+    def save_batch(self, batch_dict: dict) -> None:
+        self._write_json(self._path(batch_dict['id'], ".batch.json"), batch_dict)
+
+    def load_batch(self, batch_id: str) -> Optional[dict]:
+        return self._read_json(self._path(batch_id, ".batch.json"))
+
+    def save_metrics(self, text: str) -> None:
+        self._write_atomic(os.path.join(self.directory, METRICS_FILE), text)
+
+    def load_metrics(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, METRICS_FILE), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save_status(self, status: dict) -> None:
+        """Store what the inference process reports about itself (loaded models, cache statistics)"""
+        self._write_json(os.path.join(self.directory, STATUS_FILE), status)
+
+    def load_status(self) -> Optional[dict]:
+        return self._read_json(os.path.join(self.directory, STATUS_FILE))
+
+    def prune(self) -> None:
+        """Remove the state of jobs and batches not updated within ttl_seconds, except unfinished jobs"""
+        cutoff = time.time() - self.ttl_seconds
+        unfinished = {
+            name[:-len(".json")].split("-", 1)[1]
+            for directory in (self.queue_dir, self.claimed_dir)
+            for name in os.listdir(directory) if name.endswith(".json")
+        }
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path) or name.split(".", 1)[0] in unfinished:
+                continue
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error("Error removing job state file %s: %s", path, str(e), exc_info=True)
+
+    def follow(self, job_id: str, heartbeat: float = 15.0,
+               poll_interval: float = 0.5) -> Iterator[Tuple[str, Optional[dict]]]:
+        """Same events as Job.follow, produced by polling the stored state"""
+        offset = 0
+        last_event = time.time()
+        while True:
+            job_dict = self.load_job(job_id)
+            segments, offset = self.read_segments(job_id, offset)
+            for segment in segments:
+                yield 'segment', segment
+            if segments:
+                last_event = time.time()
+
+            if job_dict is None or job_dict['status'] in ("completed", "failed"):
+                if job_dict is not None:
+                    yield 'done', job_dict
+                return
+            if time.time() - last_event >= heartbeat:
+                last_event = time.time()
+                yield 'heartbeat', None
+            time.sleep(poll_interval)
+
+    @staticmethod
+    def _request_name(request: dict) -> str:
+        return f"{time.time_ns():020d}-{request['id']}.json"
+
+    def _path(self, item_id: str, suffix: str) -> str:
+        self._check_id(item_id)
+        return os.path.join(self.directory, item_id + suffix)
+
+    @staticmethod
+    def _check_id(item_id: str) -> None:
+        if not ID_PATTERN.match(item_id):
+            raise ValueError(f"Invalid ID: {item_id}")
+
+    def _write_json(self, path: str, data: dict) -> None:
+        self._write_atomic(path, json.dumps(data, ensure_ascii=False))
+
+    def _write_atomic(self, path: str, text: str) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,886 @@
+"""
+Background Job Module
+
+This module runs transcription jobs on a bounded pool of worker threads so that
+HTTP requests no longer block for the full download + Whisper + Ollama run.
+Every worker owns its own TranscriptionPipeline, so concurrent jobs never share
+audio files or transcription state.
+
+Batches (lists of URLs or expanded playlists) additionally go through a
+separate pool of download workers: up to `download_concurrency` items are
+downloaded at once while the transcription workers process the items that
+are already on disk. The number of downloaded-but-untranscribed items is
+bounded so a long playlist cannot fill the disk.
+
+Single jobs can take the same route with submit(..., prefetch=True), so a
+queue of jobs (e.g. in the GUI) downloads ahead of the busy workers.
+max_concurrent_jobs() tells how many jobs the machine can transcribe at once.
+
+When a JobStore is attached (multi-process server mode), every job also
+mirrors its state there so other processes can report on it. With a
+TranscriptStore, every completed job is saved there for full-text search.
+A job's segments are kept in a SegmentCollection, so finished jobs can be
+exported as text, SRT, VTT or JSON (find_job_segments()).
+
+With a JobStore, jobs are also checkpointed: every segment is appended to the
+store as it is transcribed and the audio is kept there until the job
+finishes. A job interrupted by a crash or restart is run again by the next
+consume_store() or resume_unfinished() and continues after its last
+checkpointed segment. A job whose runs were cut off MAX_RUN_ATTEMPTS times
+(e.g. because it crashes the process) is failed instead of being run again.
+
+Example:
+    >>> from jobs import JobManager
+    >>> manager = JobManager(config.models_dir, config.settings, num_workers=2)
+    >>> job = manager.submit("https://youtube.com/watch?v=...")
+    >>> manager.get(job.id).to_dict()["status"]
+    'queued'
+    >>> batch = manager.submit_batch([{'url': url, 'title': None} for url in urls])
+"""
+
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional, Tuple
+from pipeline import TranscriptionPipeline
+from model_registry import ModelRegistry, model_registry, effective_compute_type
+from job_store import JobStore
+from segments import SegmentCollection
+from metrics import jobs_total, registry, track_job, collect_cache, queue_depth as queue_depth_gauge
+from utils import cleanup_temp_file, available_memory_mb
+from transcript_cache import TranscriptCache
+from audio_cache import AudioCache
+from transcript_store import TranscriptStore
+from logger import logger
+
+# CPU threads a transcription job needs to be worth running next to others
+MIN_THREADS_PER_JOB = 2
+# Memory of one running job besides the shared model weights (decoded audio,
+# decoder state, segments), in MB
+JOB_MEMORY_MB = 512
+# Runs of a job that a crash or restart may cut off before the job is failed
+MAX_RUN_ATTEMPTS = 3
+
+def max_concurrent_jobs(settings: dict) -> int:
+    """
+    Return how many jobs can transcribe at once on this machine.
+
+    Every job needs MIN_THREADS_PER_JOB cores and JOB_MEMORY_MB of memory on
+    top of one copy of the model weights, which the jobs share.
+
+    Args:
+        settings: Settings with the model and compute type the jobs will use
+
+    Returns:
+        int: At least 1
+    """
+    limit = max(1, (os.cpu_count() or 1) // MIN_THREADS_PER_JOB)
+    available_mb = available_memory_mb()
+    if available_mb is not None:
+        model_mb = ModelRegistry.estimate_mb(settings["model"], effective_compute_type(settings))
+        limit = min(limit, max(1, (available_mb - model_mb) // JOB_MEMORY_MB))
+    return limit
+
+class JobStatus:
+    QUEUED = "queued"
+    DOWNLOADING = "downloading"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    FINISHED = (COMPLETED, FAILED)
+
+class Job:
+    def __init__(self, url: str, options: Optional[dict] = None, title: Optional[str] = None,
+                 batch_id: Optional[str] = None, store: Optional[JobStore] = None,
+                 job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.url = url
+        self.options = options or {}
+        self.title = title
+        self.batch_id = batch_id
+        # Set by the download workers for batch items
+        self.audio_file = None
+        self.prefetched = False
+        self.download_timings = {}
+        # Runs started so far, including those cut off by a crash or restart
+        self.attempts = 0
+        self.status = JobStatus.QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.segments = SegmentCollection()
+        self.store = store
+        self._persisted_at = 0.0
+        self._listeners = []
+        self._lock = threading.Condition()
+        self._done = threading.Event()
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Call listener() after every change of status, progress or segments.
+
+        It is called on the thread making the change, so it must be cheap and
+        must not block, e.g. post to a ProgressBus.
+        """
+        self._listeners.append(listener)
+
+    def update_progress(self, message: str, progress: Optional[float] = None) -> None:
+        """Progress callback passed to the pipeline"""
+        with self._lock:
+            self.message = message
+            if progress is not None:
+                self.progress = float(progress)
+        self._changed()
+        # Progress is frequent; mirror it at most once per second
+        if self.store and time.time() - self._persisted_at >= 1.0:
+            self.persist()
+
+    def add_segment(self, segment: dict) -> None:
+        """Segment callback passed to the pipeline; wakes up any followers"""
+        with self._lock:
+            self.segments.add(segment)
+            self._lock.notify_all()
+        self._changed()
+        if self.store:
+            try:
+                self.store.append_segment(self.id, segment)
+            except Exception as e:
+                logger.error("Error storing segment of job %s: %s", self.id, str(e))
+
+    def follow(self, heartbeat: float = 15.0) -> Iterator[Tuple[str, Optional[dict]]]:
+        """
+        Yield ('segment', segment) events as they are produced, then ('done', job dict).
+
+        Segments produced before the call are replayed first. When nothing
+        happens for `heartbeat` seconds a ('heartbeat', None) event is yielded
+        so that streaming responses can keep the connection alive.
+        """
+        index = 0
+        while True:
+            with self._lock:
+                if index >= len(self.segments) and self.status not in JobStatus.FINISHED:
+                    self._lock.wait(heartbeat)
+                new_segments = self.segments[index:]
+                finished = self.status in JobStatus.FINISHED
+
+            index += len(new_segments)
+            for segment in new_segments:
+                yield 'segment', segment
+
+            if finished:
+                yield 'done', self.to_dict()
+                return
+            if not new_segments:
+                yield 'heartbeat', None
+
+    def mark_downloading(self) -> None:
+        with self._lock:
+            self.status = JobStatus.DOWNLOADING
+            self.message = "Downloading audio..."
+        self._changed()
+        self.persist()
+
+    def mark_downloaded(self, audio_file: Optional[str]) -> None:
+        with self._lock:
+            self.status = JobStatus.QUEUED
+            self.audio_file = audio_file
+            self.prefetched = True
+            self.progress = 50.0 if audio_file else self.progress
+            self.message = "Downloaded, waiting for a worker" if audio_file else "Cached, waiting for a worker"
+        self._changed()
+        self.persist()
+
+    def mark_running(self) -> None:
+        with self._lock:
+            self.status = JobStatus.RUNNING
+            self.started_at = time.time()
+        self._changed()
+        self.persist()
+
+    def mark_completed(self, result: dict) -> None:
+        with self._lock:
+            self.status = JobStatus.COMPLETED
+            self.result = result
+            self.progress = 100.0
+            self.message = "Completed"
+            self.finished_at = time.time()
+            self._lock.notify_all()
+        jobs_total.inc(status=JobStatus.COMPLETED)
+        self.persist()
+        self._done.set()
+        self._changed()
+
+    def mark_failed(self, error: str) -> None:
+        with self._lock:
+            self.status = JobStatus.FAILED
+            self.error = error
+            self.message = "Failed"
+            self.finished_at = time.time()
+            self._lock.notify_all()
+        jobs_total.inc(status=JobStatus.FAILED)
+        self.persist()
+        self._done.set()
+        self._changed()
+
+    def _changed(self) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener()
+            except Exception as e:
+                logger.error("Error notifying listener of job %s: %s", self.id, str(e))
+
+    def to_request(self) -> dict:
+        """What a process needs to run the job, e.g. again after a restart"""
+        return {
+            'id': self.id,
+            'url': self.url,
+            'options': self.options,
+            'title': self.title,
+            'batch_id': self.batch_id,
+            'audio_file': self.audio_file,
+            'created_at': self.created_at,
+            'attempts': self.attempts,
+        }
+
+    def persist(self) -> None:
+        """Mirror the current state to the job store, if any"""
+        if not self.store:
+            return
+        self._persisted_at = time.time()
+        try:
+            self.store.save_job(self.to_dict())
+        except Exception as e:
+            logger.error("Error storing state of job %s: %s", self.id, str(e))
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            data = {
+                'id': self.id,
+                'url': self.url,
+                'title': self.title,
+                'batch_id': self.batch_id,
+                'status': self.status,
+                'progress': round(self.progress, 1),
+                'message': self.message,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'segments': len(self.segments),
+            }
+            if self.status == JobStatus.COMPLETED:
+                data['result'] = self.result
+            elif self.status == JobStatus.FAILED:
+                data['error'] = self.error
+            return data
+
+class Batch:
+    def __init__(self, jobs: List[Job], duplicates: int = 0):
+        self.id = uuid.uuid4().hex
+        self.jobs = jobs
+        self.duplicates = duplicates
+        self.created_at = time.time()
+
+    @property
+    def finished(self) -> bool:
+        return all(job.status in JobStatus.FINISHED for job in self.jobs)
+
+    def to_dict(self) -> dict:
+        return self.summarize(self.id, [job.to_dict() for job in self.jobs], self.duplicates, self.created_at)
+
+    def to_record(self) -> dict:
+        """Minimal state for the job store; the rest comes from the job snapshots"""
+        return {
+            'id': self.id,
+            'job_ids': [job.id for job in self.jobs],
+            'duplicates': self.duplicates,
+            'created_at': self.created_at,
+        }
+
+    @staticmethod
+    def summarize(batch_id: str, items: List[dict], duplicates: int, created_at: float) -> dict:
+        """Aggregate status plus a short per-item summary (without results)"""
+        counts = {}
+        for item in items:
+            counts[item['status']] = counts.get(item['status'], 0) + 1
+        if all(item['status'] in JobStatus.FINISHED for item in items):
+            status = JobStatus.COMPLETED
+        elif all(item['status'] == JobStatus.QUEUED for item in items):
+            status = JobStatus.QUEUED
+        else:
+            status = JobStatus.RUNNING
+        return {
+            'id': batch_id,
+            'status': status,
+            'total': len(items),
+            'counts': counts,
+            'duplicates': duplicates,
+            'progress': round(sum(item['progress'] for item in items) / max(len(items), 1), 1),
+            'created_at': created_at,
+            'items': [
+                {key: item.get(key) for key in ('id', 'url', 'title', 'status', 'progress', 'message', 'error')}
+                for item in items
+            ],
+        }
+
+class JobManager:
+    def __init__(self, models_dir: str, settings: dict, num_workers: Optional[int] = None,
+                 transcript_cache: Optional[TranscriptCache] = None, max_finished_jobs: int = 1000,
+                 job_store: Optional[JobStore] = None, transcript_store: Optional[TranscriptStore] = None,
+                 audio_cache: Optional[AudioCache] = None):
+        self.models_dir = models_dir
+        self.settings = settings
+        self.transcript_cache = transcript_cache
+        self.audio_cache = audio_cache
+        self.job_store = job_store
+        self.transcript_store = transcript_store
+        self.num_workers = max(1, int(num_workers or settings.get("api_workers", 2)))
+        self.download_concurrency = max(1, int(settings.get("download_concurrency", 2)))
+        self.max_finished_jobs = max_finished_jobs
+        self._queue = queue.Queue()
+        self._download_queue = queue.Queue()
+        # Downloaded audio waiting for transcription, plus downloads in flight
+        self._prefetch_slots = threading.Semaphore(self.download_concurrency + self.num_workers)
+        self._jobs = OrderedDict()
+        self._batches = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._workers = []
+        self._download_workers = []
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._consuming = threading.Event()
+        self._consumer = None
+        # Set by shutdown(drain=False): download workers stop handing jobs to the workers.
+        # The lock makes checking it and queueing a downloaded job atomic with the drain.
+        self._stopping = threading.Event()
+        self._stopping_lock = threading.Lock()
+        logger.info("JobManager initialized with %d workers and %d download workers",
+                    self.num_workers, self.download_concurrency)
+
+    @classmethod
+    def from_settings(cls, models_dir: str, cache_dir: str, data_dir: str, settings: dict,
+                      job_store: Optional[JobStore] = None) -> "JobManager":
+        """Create a manager with the transcript cache, audio cache and transcript store the settings enable"""
+        return cls(
+            models_dir,
+            settings,
+            settings.get("api_workers"),
+            transcript_cache=TranscriptCache.from_settings(cache_dir, settings),
+            job_store=job_store,
+            transcript_store=TranscriptStore.from_settings(data_dir, settings),
+            audio_cache=AudioCache.from_settings(cache_dir, settings)
+        )
+
+    def submit(self, url: str, options: Optional[dict] = None, title: Optional[str] = None,
+               audio_file: Optional[str] = None, prefetch: bool = False) -> Job:
+        """
+        Queue a URL for processing and return immediately.
+
+        Args:
+            url: URL to process, or the content ID of an uploaded file
+            options: Optional per-job options
+            title: Optional display name, e.g. the name of an uploaded file
+            audio_file: Uploaded audio to transcribe instead of downloading the URL;
+                the job takes ownership of it
+            prefetch: Download the audio on a download worker while the job waits
+                for a transcription worker, like batch items
+
+        Returns:
+            Job: The queued job
+        """
+        self._ensure_started()
+        job = Job(url, options, title, store=self.job_store)
+        job.audio_file = audio_file
+        if self.job_store:
+            self.job_store.track(job.to_request())
+        job.persist()
+        self._enqueue(job, prefetch)
+        logger.info("Queued job %s for URL: %s", job.id, url)
+        return job
+
+    def submit_batch(self, items: List[dict], options: Optional[dict] = None, duplicates: int = 0) -> Batch:
+        """
+        Queue several videos; their audio is downloaded ahead of transcription.
+
+        Args:
+            items: Videos as returned by AudioProcessor.expand_urls ('url' and 'title')
+            options: Optional per-job options shared by all items
+            duplicates: Number of duplicate URLs dropped during expansion, for reporting
+
+        Returns:
+            Batch: The batch with one queued job per item
+        """
+        self._ensure_started()
+        batch = Batch([], duplicates)
+        batch.jobs = [Job(item['url'], options, item.get('title'), batch.id, self.job_store) for item in items]
+        for job in batch.jobs:
+            if self.job_store:
+                self.job_store.track(job.to_request())
+            job.persist()
+        if self.job_store:
+            self.job_store.save_batch(batch.to_record())
+        with self._jobs_lock:
+            for job in batch.jobs:
+                self._jobs[job.id] = job
+            self._batches[batch.id] = batch
+            self._prune_finished()
+        for job in batch.jobs:
+            self._download_queue.put(job)
+        logger.info("Queued batch %s with %d items", batch.id, len(batch.jobs))
+        return batch
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def get_batch(self, batch_id: str) -> Optional[Batch]:
+        with self._jobs_lock:
+            return self._batches.get(batch_id)
+
+    def find_job_state(self, job_id: str) -> Optional[dict]:
+        job = self.get(job_id)
+        return job.to_dict() if job else None
+
+    def find_job_segments(self, job_id: str) -> Optional[SegmentCollection]:
+        """Segments transcribed so far, or None if the job does not exist"""
+        job = self.get(job_id)
+        return job.segments if job else None
+
+    def find_batch_state(self, batch_id: str) -> Optional[dict]:
+        batch = self.get_batch(batch_id)
+        return batch.to_dict() if batch else None
+
+    def follow(self, job_id: str, heartbeat: float = 15.0) -> Optional[Iterator[Tuple[str, Optional[dict]]]]:
+        job = self.get(job_id)
+        return job.follow(heartbeat) if job else None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free worker or download worker"""
+        return self._queue.qsize() + self._download_queue.qsize()
+
+    def render_metrics(self) -> str:
+        return registry.render()
+
+    def collect_metrics(self) -> None:
+        """Metrics collector for the queue and caches of this manager"""
+        queue_depth_gauge.set(self.queue_depth + (self.job_store.queue_depth() if self.job_store else 0))
+        collect_cache("transcripts", self.transcript_cache)
+        collect_cache("audio", self.audio_cache)
+
+    def models_state(self) -> dict:
+        """The Whisper models loaded in this process and the memory budget they share"""
+        return {
+            'loaded': model_registry.loaded(),
+            'memory_budget_mb': model_registry.memory_budget_mb,
+            'evicted_in_use_mb': model_registry.retained_mb()
+        }
+
+    def cache_stats(self) -> dict:
+        stats = {'enabled': True, **self.transcript_cache.stats()} if self.transcript_cache else {'enabled': False}
+        stats['audio'] = {'enabled': True, **self.audio_cache.stats()} if self.audio_cache else {'enabled': False}
+        return stats
+
+    def consume_store(self, poll_interval: float = 0.5) -> None:
+        """
+        Run the jobs that RemoteJobManager clients put into the job store.
+
+        Jobs claimed by a previous run that never finished (e.g. because the
+        process was killed) are queued again first and resume from their
+        checkpoints.
+        """
+        self._consuming.set()
+        self.job_store.requeue_claimed()
+        self._ensure_started()
+
+        def consume():
+            while self._consuming.is_set():
+                request = self.job_store.claim_next()
+                if request is None:
+                    time.sleep(poll_interval)
+                    continue
+                job = self._restore_job(request)
+                if job:
+                    self._enqueue(job, prefetch=bool(job.batch_id))
+                    logger.info("Claimed job %s for URL: %s", job.id, job.url)
+
+        self._consumer = threading.Thread(target=consume, name="job-store-consumer", daemon=True)
+        self._consumer.start()
+
+    def resume_unfinished(self) -> List[Job]:
+        """
+        Queue again the jobs an earlier run of this manager left unfinished.
+
+        Each job keeps its ID and continues after its last checkpointed
+        segment, from the audio kept in the job store when there is any.
+
+        Returns:
+            List[Job]: The resumed jobs, oldest first
+        """
+        if not self.job_store:
+            return []
+        jobs = [job for job in map(self._restore_job, self.job_store.claimed_requests()) if job]
+        if jobs:
+            self._ensure_started()
+            logger.info("Resuming %d unfinished jobs", len(jobs))
+        for job in jobs:
+            self._enqueue(job, prefetch=True)
+        return jobs
+
+    def shutdown(self, wait: bool = True, drain: bool = True) -> None:
+        """
+        Stop all workers.
+
+        With drain=True the jobs already queued are processed first. With
+        drain=False only the running jobs are finished; jobs still waiting are
+        left claimed in the job store and picked up again by the next
+        consume_store().
+        """
+        if self._consuming.is_set():
+            self._consuming.clear()
+            self._consumer.join()
+        if not drain:
+            with self._stopping_lock:
+                self._stopping.set()
+                for pending_queue in (self._download_queue, self._queue):
+                    while True:
+                        try:
+                            job = pending_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if job.prefetched:
+                            # Uploaded audio is kept; the job runs again after a restart
+                            if job.audio_file:
+                                cleanup_temp_file(job.audio_file)
+                            self._prefetch_slots.release()
+                        pending_queue.task_done()
+        for _ in self._download_workers:
+            self._download_queue.put(None)
+        if wait:
+            for worker in self._download_workers:
+                worker.join()
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self._workers = []
+        self._download_workers = []
+        self._started = False
+
+    def _restore_job(self, request: dict) -> Optional[Job]:
+        """
+        Recreate a job from its stored request, with the segments and audio of an interrupted run.
+
+        Returns None, after failing the job, if MAX_RUN_ATTEMPTS runs of it were cut off already.
+        """
+        job = Job(request['url'], request.get('options'), request.get('title'),
+                  request.get('batch_id'), self.job_store, request['id'])
+        job.created_at = request.get('created_at', job.created_at)
+        job.attempts = request.get('attempts', 0)
+        if job.attempts >= MAX_RUN_ATTEMPTS:
+            logger.error("Job %s was interrupted %d times, not running it again", job.id, job.attempts)
+            job.mark_failed(f"The job was interrupted {job.attempts} times, e.g. by a crash of the server")
+            self._release(job)
+            return None
+        job.audio_file = self.job_store.find_audio(job.id) or request.get('audio_file')
+        for segment in self.job_store.load_checkpoint(job.id):
+            job.segments.add(segment)
+        if len(job.segments):
+            job.message = f"Resuming from {job.segments.duration:.0f}s"
+            logger.info("Job %s has %d checkpointed segments (up to %.1fs)",
+                        job.id, len(job.segments), job.segments.duration)
+        job.persist()
+        return job
+
+    def _enqueue(self, job: Job, prefetch: bool) -> None:
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+            self._prune_finished()
+        if prefetch and not job.audio_file:
+            self._download_queue.put(job)
+        else:
+            self._queue.put(job)
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._started:
+                return
+            self._stopping.clear()
+            for i in range(self.num_workers):
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"transcription-worker-{i}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+            for i in range(self.download_concurrency):
+                worker = threading.Thread(
+                    target=self._download_loop,
+                    name=f"download-worker-{i}",
+                    daemon=True
+                )
+                worker.start()
+                self._download_workers.append(worker)
+            self._started = True
+
+    def _worker_loop(self) -> None:
+        # Each worker owns its pipeline so jobs never share audio state
+        pipeline = TranscriptionPipeline(self.models_dir, self.settings, self.transcript_cache, self.audio_cache)
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                self._run_job(pipeline, job)
+            finally:
+                if job.prefetched:
+                    self._prefetch_slots.release()
+                self._queue.task_done()
+
+    def _download_loop(self) -> None:
+        pipeline = TranscriptionPipeline(self.models_dir, self.settings, self.transcript_cache, self.audio_cache)
+        while True:
+            job = self._download_queue.get()
+            if job is None:
+                break
+            # Wait until the transcription workers have caught up
+            self._prefetch_slots.acquire()
+            try:
+                if self._stopping.is_set():
+                    # Freed by shutdown(drain=False); the job stays claimed for the next run
+                    self._prefetch_slots.release()
+                    continue
+                self._download_job(pipeline, job)
+            finally:
+                self._download_queue.task_done()
+
+    def _download_job(self, pipeline: TranscriptionPipeline, job: Job) -> None:
+        job.mark_downloading()
+        try:
+            pipeline.configure({**self.settings, **job.options})
+            with track_job() as job.download_timings:
+                audio_file = pipeline.prefetch(job.url, TranscriptionPipeline._make_download_hook(job.update_progress))
+        except Exception as e:
+            self._prefetch_slots.release()
+            error_msg = f"Error during download: {str(e)}"
+            logger.error("Job %s failed: %s", job.id, error_msg, exc_info=True)
+            job.mark_failed(error_msg)
+            self._release(job)
+            return
+        job.mark_downloaded(audio_file)
+        with self._stopping_lock:
+            if not self._stopping.is_set():
+                self._queue.put(job)
+                return
+        # Queued behind the stop sentinels, the job would never run; it stays claimed for the next run
+        if job.audio_file:
+            cleanup_temp_file(job.audio_file)
+        self._prefetch_slots.release()
+
+    def _run_job(self, pipeline: TranscriptionPipeline, job: Job) -> None:
+        logger.info("Worker %s starting job %s", threading.current_thread().name, job.id)
+        job.attempts += 1
+        if self.job_store:
+            self.job_store.update_claim(job.to_request())
+        job.mark_running()
+        try:
+            # Per-job options (e.g. a different model) override the shared settings
+            settings = {**self.settings, **job.options}
+            pipeline.configure(settings)
+            # With a job store the audio is kept there until the job finishes, so a
+            # restarted job continues after its checkpointed segments
+            result = pipeline.run(
+                job.url, job.update_progress, segment_callback=job.add_segment, audio_file=job.audio_file,
+                audio_callback=self._keep_audio(job) if self.job_store else None,
+                resume_segments=job.segments.to_dicts()
+            )
+            # Batch items were downloaded by a download worker
+            result['timings'] = {**job.download_timings, **result['timings']}
+            job.segments.language = result.get('language')
+            self._store_transcript(pipeline, job, result, settings)
+            job.mark_completed(result)
+            logger.info("Job %s completed", job.id)
+        except Exception as e:
+            error_msg = f"Error during transcription: {str(e)}"
+            logger.error("Job %s failed: %s", job.id, error_msg, exc_info=True)
+            job.mark_failed(error_msg)
+        finally:
+            self._release(job)
+
+    def _store_transcript(self, pipeline: TranscriptionPipeline, job: Job, result: dict, settings: dict) -> None:
+        """Save a completed job for search; a failure here never fails the job"""
+        if not self.transcript_store:
+            return
+        model = settings["model"]
+        compute_type = effective_compute_type(settings)
+        try:
+            # Keyed like the transcript cache, so other spellings of the URL replace the same row
+            video_id = result.get('video_id') or self._video_id(pipeline, job.url)
+            # Cached results are usually stored already
+            key = TranscriptStore.make_key(video_id, model, compute_type, settings.get("language"))
+            if result.get('cached') and self.transcript_store.contains(key):
+                return
+            result['transcript_id'] = self.transcript_store.save(
+                job.url, job.segments, result['summary'], result.get('language'),
+                model, compute_type, job.title, settings.get("language"), video_id
+            )
+        except Exception as e:
+            logger.error("Error storing transcript of job %s: %s", job.id, str(e), exc_info=True)
+
+    @staticmethod
+    def _video_id(pipeline: TranscriptionPipeline, url: str) -> str:
+        # Without caches the pipeline does not resolve the ID; the URL is the fallback
+        try:
+            return pipeline.audio_processor.get_video_id(url)
+        except Exception as e:
+            logger.warning("Storing %s under its URL: %s", url, str(e))
+            return url
+
+    def _keep_audio(self, job: Job) -> Callable[[str], str]:
+        def keep(audio_file: str) -> str:
+            job.audio_file = self.job_store.keep_audio(job.id, audio_file)
+            return job.audio_file
+        return keep
+
+    def _release(self, job: Job) -> None:
+        # The job is finished; it must not be requeued after a restart
+        if self.job_store:
+            self.job_store.release(job.id)
+
+    def _prune_finished(self) -> None:
+        # Called with _jobs_lock held; drops the oldest finished jobs
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in JobStatus.FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+        finished_batches = [batch_id for batch_id, batch in self._batches.items() if batch.finished]
+        for batch_id in finished_batches[:max(0, len(finished_batches) - self.max_finished_jobs)]:
+            del self._batches[batch_id]
+
+class RemoteJob:
+    """Handle for a job submitted through RemoteJobManager; all state is read from the store"""
+
+    def __init__(self, store: JobStore, job_id: str, url: str, title: Optional[str] = None):
+        self.store = store
+        self.id = job_id
+        self.url = url
+        self.title = title
+
+    @property
+    def status(self) -> str:
+        return self.to_dict()['status']
+
+    @property
+    def result(self) -> Optional[dict]:
+        return self.to_dict().get('result')
+
+    @property
+    def error(self) -> Optional[str]:
+        return self.to_dict().get('error')
+
+    def to_dict(self) -> dict:
+        return self.store.load_job(self.id) or {'id': self.id, 'url': self.url, 'status': JobStatus.QUEUED}
+
+    def follow(self, heartbeat: float = 15.0) -> Iterator[Tuple[str, Optional[dict]]]:
+        return self.store.follow(self.id, heartbeat)
+
+    def wait(self, timeout: Optional[float] = None, poll_interval: float = 0.5) -> bool:
+        deadline = None if timeout is None else time.time() + timeout
+        while self.status not in JobStatus.FINISHED:
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(poll_interval)
+        return True
+
+class RemoteJobManager:
+    """
+    JobManager stand-in for the HTTP workers of the multi-process server.
+
+    Jobs are put into the job store and run by the inference process (a
+    JobManager calling consume_store), so the Whisper models are loaded only
+    once no matter how many HTTP workers there are.
+    """
+
+    def __init__(self, job_store: JobStore):
+        self.job_store = job_store
+
+    def submit(self, url: str, options: Optional[dict] = None, title: Optional[str] = None,
+               audio_file: Optional[str] = None) -> RemoteJob:
+        # Uploads are written to a temporary directory the inference process can read too
+        return self._submit(url, options, title, audio_file=audio_file)
+
+    def submit_batch(self, items: List[dict], options: Optional[dict] = None, duplicates: int = 0) -> Batch:
+        batch = Batch([], duplicates)
+        batch.jobs = [self._submit(item['url'], options, item.get('title'), batch.id) for item in items]
+        self.job_store.save_batch(batch.to_record())
+        return batch
+
+    def get(self, job_id: str) -> Optional[RemoteJob]:
+        state = self.find_job_state(job_id)
+        return RemoteJob(self.job_store, job_id, state['url'], state.get('title')) if state else None
+
+    def find_job_state(self, job_id: str) -> Optional[dict]:
+        try:
+            return self.job_store.load_job(job_id)
+        except ValueError:
+            return None
+
+    def find_job_segments(self, job_id: str) -> Optional[SegmentCollection]:
+        state = self.find_job_state(job_id)
+        if not state:
+            return None
+        segments, _ = self.job_store.read_segments(job_id)
+        return SegmentCollection.from_dicts(segments, (state.get('result') or {}).get('language'))
+
+    def find_batch_state(self, batch_id: str) -> Optional[dict]:
+        try:
+            record = self.job_store.load_batch(batch_id)
+        except ValueError:
+            return None
+        if not record:
+            return None
+        items = [self.find_job_state(job_id) for job_id in record['job_ids']]
+        return Batch.summarize(record['id'], [item for item in items if item], record['duplicates'], record['created_at'])
+
+    def follow(self, job_id: str, heartbeat: float = 15.0) -> Optional[Iterator[Tuple[str, Optional[dict]]]]:
+        if not self.find_job_state(job_id):
+            return None
+        return self.job_store.follow(job_id, heartbeat)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.job_store.queue_depth()
+
+    def render_metrics(self) -> str:
+        """The metrics are recorded by the inference process, which stores them periodically"""
+        return self.job_store.load_metrics() or ""
+
+    def models_state(self) -> Optional[dict]:
+        """The models of the inference process, or None until it has reported them"""
+        return (self.job_store.load_status() or {}).get('models')
+
+    def cache_stats(self) -> Optional[dict]:
+        """The cache statistics of the inference process, which does all lookups"""
+        return (self.job_store.load_status() or {}).get('cache')
+
+    def _submit(self, url: str, options: Optional[dict] = None, title: Optional[str] = None,
+                batch_id: Optional[str] = None, audio_file: Optional[str] = None) -> RemoteJob:
+        job = Job(url, options, title, batch_id, self.job_store)
+        job.audio_file = audio_file
+        # The snapshot is written before the request so the job is visible at once
+        job.persist()
+        self.job_store.enqueue(job.to_request())
+        logger.info("Queued job %s for URL: %s", job.id, url)
+        return RemoteJob(self.job_store, job.id, url, title)
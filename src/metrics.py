@@ -0,0 +1,224 @@
+"""
+Metrics Module
+
+This module collects per-stage timings and throughput metrics and renders them
+in the Prometheus text exposition format for the /metrics endpoint. Stages
+(download, extract, decode, model_load, language_detection, transcription,
+summarization) are timed with `timed()`. The durations are recorded in
+process-wide histograms and, when a job is being tracked on the current thread
+(`track_job()`), also in that job's own breakdown, which is returned with the
+result and shown in the GUI.
+
+Example:
+    >>> from metrics import registry, track_job, timed
+    >>> with track_job() as timings:
+    ...     with timed("download"):
+    ...         download()
+    >>> timings["download"]
+    12.3
+    >>> print(registry.render())
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from logger import logger
+
+STAGE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: Tuple[str, ...], value) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {value}"]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            counts = [c + 1 if value <= bound else c for c, bound in zip(counts, self.buckets)]
+            self._values[key] = (counts, total + value, count + 1)
+
+    def _render_value(self, key: Tuple[str, ...], value) -> List[str]:
+        counts, total, count = value
+        lines = [
+            f"{self.name}_bucket{self._format_labels(key, ('le', repr(float(bound))))} {c}"
+            for c, bound in zip(counts, self.buckets)
+        ]
+        lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', '+Inf'))} {count}")
+        lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+        lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges (e.g. queue depth) right before rendering"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error("Metrics collector failed: %s", str(e), exc_info=True)
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.register(Histogram(
+    "yapper_stage_duration_seconds", "Time spent in each processing stage", ("stage",)
+))
+audio_seconds = registry.register(Counter(
+    "yapper_audio_seconds_total", "Seconds of audio transcribed", ("model",)
+))
+real_time_factor = registry.register(Histogram(
+    "yapper_real_time_factor", "Transcription time divided by audio duration", ("model",), RTF_BUCKETS
+))
+jobs_total = registry.register(Counter(
+    "yapper_jobs_total", "Finished jobs by outcome", ("status",)
+))
+queue_depth = registry.register(Gauge(
+    "yapper_queue_depth", "Jobs waiting for a worker"
+))
+cache_hit_ratio = registry.register(Gauge(
+    "yapper_cache_hit_ratio", "Hit ratio of the on-disk caches", ("cache",)
+))
+cache_lookups_total = registry.register(Counter(
+    "yapper_cache_lookups_total", "Lookups of the on-disk caches by result", ("cache", "result")
+))
+
+_current = threading.local()
+
+@contextmanager
+def track_job() -> Iterator[Dict[str, float]]:
+    """Collect the stage timings of the job running on this thread into a dict"""
+    previous = getattr(_current, "timings", None)
+    timings = {}
+    _current.timings = timings
+    try:
+        yield timings
+    finally:
+        _current.timings = previous
+
+def record(stage: str, seconds: float) -> None:
+    """Record a stage duration in the histograms and the tracked job, if any"""
+    stage_seconds.observe(seconds, stage=stage)
+    timings = getattr(_current, "timings", None)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+def timed_iter(stage: str, iterator: Iterator, elapsed: float = 0.0) -> Iterator:
+    """
+    Yield from an iterator, recording only the time spent producing items.
+
+    Args:
+        stage: Stage name
+        iterator: Lazy iterator, e.g. Whisper's segment generator
+        elapsed: Time already spent on the stage before iterating (e.g. VAD)
+    """
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                return
+            elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        record(stage, elapsed)
+
+def record_audio(seconds: float) -> None:
+    """Remember the audio duration of the tracked job"""
+    timings = getattr(_current, "timings", None)
+    if timings is not None:
+        timings['audio_seconds'] = seconds
+
+def record_job(model: str, timings: Dict[str, float]) -> None:
+    """Update the throughput metrics once a job's transcription is done"""
+    duration = timings.get('audio_seconds')
+    if not duration:
+        return
+    audio_seconds.inc(duration, model=model)
+    if 'transcription' in timings:
+        rtf = timings['transcription'] / duration
+        timings['real_time_factor'] = rtf
+        real_time_factor.observe(rtf, model=model)
+
+def collect_cache(name: str, cache) -> None:
+    """Copy a DiskLRUCache's hit ratio into the cache gauge; its lookups are counted as they happen"""
+    if not cache:
+        return
+    cache_hit_ratio.set(cache.stats()['hit_ratio'], cache=name)
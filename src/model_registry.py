@@ -0,0 +1,240 @@
+"""
+Model Registry Module
+
+This module keeps loaded Whisper models in a process-wide registry so that
+every TranscriptionManager (GUI, API workers, per-request model choices) reuses
+warm models instead of loading them from disk again. Models are keyed by size,
+device and compute type, so their weights are loaded once whatever worker and
+thread configuration is asked for; a model is only reloaded when more replicas
+(num_workers) are needed. The least recently used models are evicted once the
+estimated memory of all loaded models would exceed the configured budget. An
+evicted model that a job still uses stays resident, so it keeps counting
+against the budget until it is released.
+
+Example:
+    >>> from model_registry import model_registry
+    >>> model = model_registry.get("base", "cpu", "int8", config.models_dir)
+    >>> model_registry.get("base", "cpu", "int8", config.models_dir) is model
+    True
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from config import config
+from metrics import timed
+from logger import logger
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+# Approximate resident size of each model with int8 weights, in MB
+MODEL_SIZES_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 480,
+    "medium": 1500,
+    "large": 3000,
+    "large-v2": 3000,
+    "large-v3": 3000,
+}
+
+# Weight size relative to int8
+COMPUTE_TYPE_FACTORS = {
+    "int8": 1,
+    "int8_float16": 1,
+    "int8_bfloat16": 1,
+    "int8_float32": 1,
+    "int16": 2,
+    "float16": 2,
+    "bfloat16": 2,
+    "float32": 4,
+}
+
+# Compute types autotune benchmarks, best default first
+CPU_COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+CUDA_COMPUTE_TYPES = ["float16", "int8_float16", "int8"]
+
+# Weights are shared by every worker/thread configuration: (model, device, compute_type)
+ModelKey = Tuple[str, str, str]
+
+def supported_compute_types(device: str) -> List[str]:
+    candidates = CUDA_COMPUTE_TYPES if device == "cuda" else CPU_COMPUTE_TYPES
+    try:
+        import ctranslate2
+        supported = ctranslate2.get_supported_compute_types(device)
+        return [compute_type for compute_type in candidates if compute_type in supported]
+    except Exception as e:
+        logger.warning("Could not query supported compute types: %s", str(e))
+        return candidates[:1]
+
+def tuned_for_device(settings: dict) -> bool:
+    """True unless the tuned settings were measured on another device than settings['device']"""
+    tuned_device = settings.get("tuned_device")
+    return not tuned_device or tuned_device == settings["device"]
+
+def effective_compute_type(settings: dict) -> str:
+    """The configured compute_type, or the device's default if it was tuned on another device"""
+    if tuned_for_device(settings):
+        return settings.get("compute_type", "int8")
+    return supported_compute_types(settings["device"])[0]
+
+class _Entry:
+    def __init__(self, model: "WhisperModel", size_mb: int, num_workers: int, cpu_threads: int):
+        self.model = model
+        self.size_mb = size_mb
+        self.num_workers = num_workers
+        self.cpu_threads = cpu_threads
+
+class ModelRegistry:
+    def __init__(self, memory_budget_mb: int):
+        self.memory_budget_mb = memory_budget_mb
+        self._models = OrderedDict()
+        # Evicted models that are still referenced (e.g. by a running job), as
+        # (weak reference, size_mb); they stay resident until released
+        self._retained = []
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        logger.info("ModelRegistry initialized with a %d MB budget", memory_budget_mb)
+
+    @staticmethod
+    def estimate_mb(model_name: str, compute_type: str) -> int:
+        """Estimate the memory used by a model loaded with the given compute type"""
+        base = MODEL_SIZES_MB.get(model_name, MODEL_SIZES_MB["large"])
+        return base * COMPUTE_TYPE_FACTORS.get(compute_type, 4)
+
+    def get(self, model_name: str, device: str, compute_type: str, download_root: str,
+            num_workers: int = 1, cpu_threads: int = 0) -> "WhisperModel":
+        """
+        Return a loaded model, loading it (and evicting others) if necessary.
+
+        The weights of a model are loaded once, whatever the worker and thread
+        configuration. A loaded model with at least num_workers replicas is
+        returned as it is; otherwise it is replaced by one loaded with the
+        requested replicas and threads. Concurrent requests for the same
+        model wait for a single load.
+
+        Args:
+            model_name: Whisper model size, e.g. "base"
+            device: "cpu" or "cuda"
+            compute_type: CTranslate2 compute type, e.g. "int8"
+            download_root: Directory the model files are downloaded to
+            num_workers: Number of model replicas for concurrent transcribe calls
+            cpu_threads: Threads per replica (0 for the CTranslate2 default)
+
+        Returns:
+            WhisperModel: The loaded model
+        """
+        key = (model_name, device, compute_type)
+        with self._lock:
+            model = self._lookup(key, num_workers)
+            if model:
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self._lookup(key, num_workers)
+                if model:
+                    return model
+                replaced = self._models.pop(key, None)
+                if replaced:
+                    logger.info("Replacing model %s (num_workers=%d) to run %d workers",
+                                model_name, replaced.num_workers, num_workers)
+                    self._retain(replaced)
+
+            size_mb = self.estimate_mb(model_name, compute_type)
+            with self._lock:
+                self._evict_for(size_mb)
+
+            logger.info("Loading model %s (device=%s, compute_type=%s)", model_name, device, compute_type)
+            # Imported on first load; faster_whisper pulls in CTranslate2 and PyAV
+            from faster_whisper import WhisperModel
+            with timed("model_load"):
+                model = WhisperModel(
+                    model_name,
+                    device=device,
+                    compute_type=compute_type,
+                    download_root=download_root,
+                    num_workers=num_workers,
+                    cpu_threads=cpu_threads
+                )
+
+            with self._lock:
+                self._models[key] = _Entry(model, size_mb, num_workers, cpu_threads)
+                self._load_locks.pop(key, None)
+            return model
+
+    def holds(self, *models: "WhisperModel") -> bool:
+        """Whether the models are all still registered, i.e. neither evicted nor replaced"""
+        with self._lock:
+            registered = [entry.model for entry in self._models.values()]
+        return all(any(model is entry for entry in registered) for model in models)
+
+    def loaded(self) -> List[dict]:
+        """Describe the loaded models, least recently used first"""
+        with self._lock:
+            return [
+                {
+                    'model': key[0],
+                    'device': key[1],
+                    'compute_type': key[2],
+                    'num_workers': entry.num_workers,
+                    'cpu_threads': entry.cpu_threads,
+                    'estimated_mb': entry.size_mb,
+                }
+                for key, entry in self._models.items()
+            ]
+
+    def retained_mb(self) -> int:
+        """Estimated memory of evicted models that are still in use"""
+        with self._lock:
+            return self._retained_mb()
+
+    def clear(self) -> None:
+        with self._lock:
+            while self._models:
+                self._retain(self._models.popitem()[1])
+
+    def _lookup(self, key: ModelKey, num_workers: int) -> Optional["WhisperModel"]:
+        # Called with _lock held
+        entry = self._models.get(key)
+        if not entry or entry.num_workers < num_workers:
+            return None
+        self._models.move_to_end(key)
+        return entry.model
+
+    def _retain(self, entry: _Entry) -> bool:
+        """
+        Drop the registry's reference to an evicted model.
+
+        Called with _lock held. Returns True if the model was freed; otherwise it
+        is still used elsewhere and counts against the budget until released.
+        """
+        ref = weakref.ref(entry.model)
+        entry.model = None
+        if ref() is None:
+            return True
+        self._retained.append((ref, entry.size_mb))
+        return False
+
+    def _retained_mb(self) -> int:
+        # Called with _lock held; forgets the models released since the last call
+        self._retained = [(ref, size_mb) for ref, size_mb in self._retained if ref() is not None]
+        return sum(size_mb for _, size_mb in self._retained)
+
+    def _evict_for(self, size_mb: int) -> None:
+        # Called with _lock held. Models still referenced by a running job stay
+        # alive until that job finishes, so they keep counting against the budget.
+        used_mb = sum(entry.size_mb for entry in self._models.values()) + self._retained_mb()
+        while self._models and used_mb + size_mb > self.memory_budget_mb:
+            key, entry = self._models.popitem(last=False)
+            logger.info("Evicted model %s (device=%s, compute_type=%s)", key[0], key[1], key[2])
+            if self._retain(entry):
+                used_mb -= entry.size_mb
+        if used_mb + size_mb > self.memory_budget_mb:
+            logger.warning("Loading a %d MB model exceeds the %d MB budget; %d MB are held by evicted "
+                           "models still in use", size_mb, self.memory_budget_mb, self._retained_mb())
+
+model_registry = ModelRegistry(config.settings.get("model_memory_budget_mb", 4096))
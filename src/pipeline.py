@@ -0,0 +1,339 @@
+"""
+Transcription Pipeline Module
+
+This module ties the audio download and transcription steps together so that a
+single object owns all of the mutable state needed to turn a URL into a
+transcript and summary. Each API worker owns its own pipeline, which keeps
+concurrent jobs from sharing a TranscriptionManager (and its temp_audio_file).
+When a TranscriptCache is supplied, previously transcribed videos are served
+from disk without downloading or transcribing anything. With the
+pipelined_ingest setting, transcription starts on the first minute of audio
+while the rest is still being downloaded. Local files and uploads skip the
+download and are cached by the SHA-256 of their content. With an AudioCache,
+downloaded audio is kept (compressed) as well, so running a video again with
+other settings skips the download. A run can resume an interrupted
+transcription from its checkpointed segments.
+
+Example:
+    >>> from pipeline import TranscriptionPipeline
+    >>> pipeline = TranscriptionPipeline(config.models_dir, config.settings)
+    >>> result = pipeline.run("https://youtube.com/watch?v=...")
+    >>> print(result["summary"])
+    >>> result = pipeline.run_file("/recordings/standup.m4a")
+"""
+
+from typing import Callable, Iterator, List, Optional, Tuple
+from transcription import TranscriptionManager
+from segments import SegmentCollection
+from audio_processor import AudioProcessor, content_id
+from transcript_cache import TranscriptCache
+from audio_cache import AudioCache
+from model_registry import effective_compute_type
+from metrics import track_job, record_job
+from logger import logger
+
+class TranscriptionPipeline:
+    def __init__(self, models_dir: str, settings: dict,
+                 transcript_cache: Optional[TranscriptCache] = None,
+                 audio_cache: Optional[AudioCache] = None):
+        self.models_dir = models_dir
+        self.settings = settings
+        self.transcript_cache = transcript_cache
+        self.audio_cache = audio_cache
+        self.transcription_manager = TranscriptionManager(models_dir, settings)
+        self.audio_processor = AudioProcessor(settings.get("ffmpeg_path"), settings.get("audio_extraction", "pcm"))
+
+    def configure(self, settings: dict) -> None:
+        """Use new settings for subsequent runs; models are fetched from the shared registry"""
+        self.settings = settings
+        self.transcription_manager.settings = settings
+        self.audio_processor = AudioProcessor(settings.get("ffmpeg_path"), settings.get("audio_extraction", "pcm"))
+
+    def run(self, url: str, progress_callback: Optional[Callable] = None,
+            download_hook: Optional[Callable] = None,
+            segment_callback: Optional[Callable] = None,
+            audio_file: Optional[str] = None,
+            audio_callback: Optional[Callable[[str], str]] = None,
+            resume_segments: Optional[List[dict]] = None) -> dict:
+        """
+        Download, transcribe and summarize a single URL.
+
+        Args:
+            url: URL to process
+            progress_callback: Optional callback taking (message, progress)
+            download_hook: Optional yt-dlp progress hook; derived from
+                progress_callback when omitted
+            segment_callback: Optional callback receiving each segment dict as
+                soon as it is transcribed
+            audio_file: Audio already downloaded by prefetch(), or an uploaded
+                file (url is then its content ID); it is removed once transcribed
+            audio_callback: Optional callback receiving the path of the audio
+                once it is prepared for transcription and returning the path to
+                use; the caller then owns the file, which is not removed
+            resume_segments: Segments committed by an interrupted run; only the
+                audio after the last of them is transcribed, and they are part
+                of the result but not passed to segment_callback again
+
+        Returns:
+            dict: The transcription, summary, language, whether it was cached,
+            the canonical video ID ('video_id', None if it was not resolved)
+            and the seconds spent in each stage ('timings')
+
+        Raises:
+            AudioDownloadError: If the audio could not be downloaded
+            TranscriptionError: If transcription fails
+        """
+        with track_job() as timings:
+            result = self._run(url, progress_callback, download_hook, segment_callback, audio_file,
+                               audio_callback, resume_segments or [])
+        record_job(self.settings["model"], timings)
+        result['timings'] = timings
+        return result
+
+    def _run(self, url: str, progress_callback: Optional[Callable], download_hook: Optional[Callable],
+             segment_callback: Optional[Callable], audio_file: Optional[str],
+             audio_callback: Optional[Callable[[str], str]], resume_segments: List[dict]) -> dict:
+        video_id = self._video_id(url)
+        cache_key = self._cache_key(video_id)
+        if cache_key:
+            cached = self.transcript_cache.get(cache_key)
+            if cached:
+                logger.info("Transcript cache hit for URL: %s", url)
+                if audio_file and audio_callback:
+                    # The caller owns the audio and removes it with the rest of the job
+                    audio_callback(audio_file)
+                elif audio_file:
+                    self.audio_processor.cleanup(audio_file)
+                result = self._from_cache(cache_key, cached, progress_callback, segment_callback, resume_segments)
+                result['video_id'] = video_id
+                return result
+
+        if progress_callback and not audio_file:
+            progress_callback("Downloading audio...", 0)
+
+        if resume_segments:
+            logger.info("Resuming %s after %d checkpointed segments", url, len(resume_segments))
+        # A resumed run needs the audio from the checkpoint on, which the stream cannot seek to;
+        # cached audio is read faster than streaming it again
+        if (self.settings.get("pipelined_ingest", False) and not audio_file and not resume_segments
+                and not (video_id and self.audio_cache and self.audio_cache.contains(video_id))):
+            segments, language = self._transcribe_pipelined(url, progress_callback, segment_callback, video_id)
+        else:
+            segments, language = self._transcribe_downloaded(
+                url, progress_callback, download_hook, segment_callback, audio_file,
+                audio_callback, resume_segments, video_id
+            )
+
+        if progress_callback:
+            progress_callback("Finalizing transcription...", 90)
+        transcription = self.transcription_manager.format_transcription(segments)
+
+        if progress_callback:
+            progress_callback("Sending to Ollama for summarization...", 95)
+        summary = self.transcription_manager.send_to_ollama(transcription)
+
+        if cache_key:
+            self.transcript_cache.put(cache_key, {
+                'url': url,
+                'language': language,
+                'segments': segments.to_dicts(),
+                'summary': summary
+            })
+
+        return {
+            'transcription': transcription,
+            'summary': summary,
+            'language': language,
+            'cached': False,
+            'video_id': video_id
+        }
+
+    def run_file(self, file_path: str, progress_callback: Optional[Callable] = None,
+                 segment_callback: Optional[Callable] = None) -> dict:
+        """
+        Transcribe and summarize a local audio or video file, which is left in place.
+
+        Args:
+            file_path: Path to the file
+            progress_callback: Optional callback taking (message, progress)
+            segment_callback: Optional callback receiving each segment dict
+
+        Returns:
+            dict: Same as run()
+        """
+        if progress_callback:
+            progress_callback("Reading file...", 0)
+        file_id = content_id(file_path)
+        audio_file = self.audio_processor.stage_local_file(file_path)
+        return self.run(file_id, progress_callback, segment_callback=segment_callback, audio_file=audio_file)
+
+    def prefetch(self, url: str, download_hook: Optional[Callable] = None) -> Optional[str]:
+        """
+        Download the audio for a later run(), unless the transcript is cached.
+
+        Returns:
+            Optional[str]: Path of the downloaded audio, or None on a cache hit
+
+        Raises:
+            AudioDownloadError: If the audio could not be downloaded
+        """
+        video_id = self._video_id(url)
+        cache_key = self._cache_key(video_id)
+        if cache_key and self.transcript_cache.contains(cache_key):
+            return None
+        audio_file, uncached = self._download_audio(url, video_id, download_hook)
+        if uncached:
+            # Download workers run ahead of the transcription workers, so no job waits for this
+            self.audio_cache.store(video_id, audio_file, self.audio_processor)
+        logger.info(f"Audio prefetched to: {audio_file}")
+        return audio_file
+
+    def _transcribe_downloaded(self, url: str, progress_callback: Optional[Callable],
+                               download_hook: Optional[Callable],
+                               segment_callback: Optional[Callable],
+                               audio_file: Optional[str] = None,
+                               audio_callback: Optional[Callable[[str], str]] = None,
+                               resume_segments: Optional[List[dict]] = None,
+                               video_id: Optional[str] = None) -> Tuple[SegmentCollection, str]:
+        """Download the whole audio file first (unless prefetched or uploaded), then transcribe it"""
+        uncached = False
+        if not audio_file:
+            audio_file, uncached = self._download_audio(
+                url, video_id, download_hook or self._make_download_hook(progress_callback)
+            )
+            logger.info(f"Audio downloaded to: {audio_file}")
+
+        try:
+            if progress_callback:
+                progress_callback("Preparing audio...")
+            audio_file = self.audio_processor.normalize_audio_file(audio_file)
+            if audio_callback:
+                audio_file = audio_callback(audio_file)
+            self.transcription_manager.temp_audio_file = audio_file
+            language, segment_stream = self.transcription_manager.stream_segments(
+                progress_callback,
+                resume_segments[-1]['end'] if resume_segments else 0.0,
+                keep_audio=audio_callback is not None or uncached
+            )
+            segments = self._collect(segment_stream, segment_callback, language, resume_segments)
+            if uncached:
+                # Compressed after transcription, like the pipelined path, so it never delays the first segment
+                self.audio_cache.store(video_id, audio_file, self.audio_processor)
+        finally:
+            if not audio_callback:
+                self.audio_processor.cleanup(audio_file)
+        return segments, language
+
+    def _transcribe_pipelined(self, url: str, progress_callback: Optional[Callable],
+                              segment_callback: Optional[Callable],
+                              video_id: Optional[str] = None) -> Tuple[SegmentCollection, str]:
+        """Transcribe the audio window by window while it is still downloading"""
+        # Download and transcription progress overlap, so only transcription reports progress
+        pcm_stream = self.audio_processor.open_pcm_stream(url)
+        try:
+            language, segment_stream = self.transcription_manager.stream_segments_from(
+                pcm_stream, progress_callback
+            )
+            segments = self._collect(segment_stream, segment_callback, language)
+            if video_id and self.audio_cache and pcm_stream.eof and not pcm_stream.error:
+                # The stream's file now holds the whole audio
+                self.audio_cache.store(video_id, pcm_stream.path, self.audio_processor)
+            return segments, language
+        finally:
+            pcm_stream.close()
+
+    @staticmethod
+    def _collect(segment_stream: Iterator[dict], segment_callback: Optional[Callable],
+                 language: Optional[str], resume_segments: Optional[List[dict]] = None) -> SegmentCollection:
+        segments = SegmentCollection.from_dicts(resume_segments or [], language)
+        for segment in segment_stream:
+            segments.add(segment)
+            if segment_callback:
+                segment_callback(segment)
+        return segments
+
+    def _download_audio(self, url: str, video_id: Optional[str],
+                        download_hook: Optional[Callable] = None) -> Tuple[str, bool]:
+        """
+        Take the audio from the audio cache, or download it.
+
+        Returns:
+            Tuple[str, bool]: The audio file and whether the caller should add it to the audio cache
+        """
+        if video_id and self.audio_cache:
+            audio_file = self.audio_cache.fetch(video_id)
+            if audio_file:
+                logger.info("Audio cache hit for URL: %s", url)
+                if download_hook:
+                    download_hook({'status': 'finished', 'filename': audio_file})
+                return audio_file, False
+        audio_file = self.audio_processor.download_audio(url, download_hook)
+        return audio_file, bool(video_id and self.audio_cache)
+
+    def _video_id(self, url: str) -> Optional[str]:
+        """Return the canonical video ID the caches use, or None if caching is unavailable"""
+        if not self.transcript_cache and not self.audio_cache:
+            return None
+        try:
+            return self.audio_processor.get_video_id(url)
+        except Exception as e:
+            logger.warning("Caches disabled for %s: %s", url, str(e))
+            return None
+
+    def _cache_key(self, video_id: Optional[str]) -> Optional[str]:
+        """Return the transcript cache key for a video, or None if caching is unavailable"""
+        if not self.transcript_cache or not video_id:
+            return None
+        return TranscriptCache.make_key(
+            video_id,
+            self.settings["model"],
+            effective_compute_type(self.settings),
+            self.settings.get("language"),
+            bool(self.settings.get("word_timestamps", False))
+        )
+
+    def _from_cache(self, cache_key: str, cached: dict, progress_callback: Optional[Callable],
+                    segment_callback: Optional[Callable], resume_segments: List[dict]) -> dict:
+        segments = SegmentCollection.from_dicts(cached['segments'], cached.get('language'))
+        if segment_callback:
+            # A resumed job already holds its checkpointed segments; only what follows them is new
+            resume_end = resume_segments[-1]['end'] if resume_segments else None
+            for segment in cached['segments']:
+                if resume_end is None or segment['end'] > resume_end:
+                    segment_callback(segment)
+        transcription = self.transcription_manager.format_transcription(segments)
+        summary = cached.get('summary')
+        if summary is None:
+            # Ollama was unavailable when the entry was stored; only the summary is redone
+            if progress_callback:
+                progress_callback("Sending to Ollama for summarization...", 95)
+            summary = self.transcription_manager.send_to_ollama(transcription)
+            if summary is not None:
+                self.transcript_cache.put(cache_key, {**cached, 'summary': summary})
+
+        if progress_callback:
+            progress_callback("Loaded transcription from cache", 100)
+        return {
+            'transcription': transcription,
+            'summary': summary,
+            'language': cached.get('language'),
+            'cached': True
+        }
+
+    @staticmethod
+    def _make_download_hook(progress_callback: Optional[Callable]) -> Optional[Callable]:
+        """Translate yt-dlp progress dictionaries into (message, progress) callbacks"""
+        if not progress_callback:
+            return None
+
+        def hook(d):
+            if d['status'] == 'downloading':
+                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
+                downloaded_bytes = d.get('downloaded_bytes', 0)
+                if total_bytes:
+                    progress = (downloaded_bytes / total_bytes) * 50  # Use first 50% for download
+                    progress_callback(f"Downloading audio... {progress * 2:.1f}%", progress)
+            elif d['status'] == 'finished':
+                progress_callback("Download completed. Starting transcription...", 50)
+
+        return hook
@@ -0,0 +1,97 @@
+"""
+Progress Bus Module
+
+This module moves job progress, transcribed segments and other UI work from
+worker threads to the Tk main loop. Tk widgets may only be touched from the
+thread running mainloop(), so workers post events here instead of calling the
+widgets (or root.update()) themselves.
+
+Posting never blocks on rendering: events go into a queue that the main loop
+drains with after() at most FRAME_RATE times per second. A notification asks
+for a handler to run on the next frame. However often it is posted in between
+(e.g. once per segment and per download chunk of every running job), the
+handler runs once, plus once after each call posted in between. A frame thus
+renders only the latest progress and inserts all new segments at once. Calls
+run in the order they were posted.
+
+Example:
+    >>> from progress_bus import ProgressBus
+    >>> bus = ProgressBus(root)
+    >>> bus.start()
+    >>> # from any thread:
+    >>> job.add_listener(lambda: bus.notify(refresh_jobs))
+    >>> bus.call(messagebox.showinfo, "Success", "Done")
+"""
+
+import threading
+from collections import deque
+from typing import Callable
+from logger import logger
+
+FRAME_RATE = 20
+
+_NOTIFY = "notify"
+_CALL = "call"
+
+class ProgressBus:
+    def __init__(self, root, frame_rate: int = FRAME_RATE):
+        """
+        Args:
+            root: Tk root whose main loop renders the events
+            frame_rate: Maximum number of drains per second
+        """
+        self.root = root
+        self.interval_ms = max(1, 1000 // frame_rate)
+        self._events = deque()
+        # Handlers notified since the last drain; later notifications are coalesced into them
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._after_id = None
+
+    def notify(self, handler: Callable[[], None]) -> None:
+        """Run handler() on the next frame; usable from any thread"""
+        with self._lock:
+            if handler in self._pending:
+                return
+            self._pending.add(handler)
+            self._events.append((_NOTIFY, handler))
+
+    def call(self, function: Callable, *args) -> None:
+        """Run function(*args) on the main loop, after everything posted before it"""
+        with self._lock:
+            self._events.append((_CALL, (function, args)))
+            # The call may change what a handler renders, so later notifications run after it again
+            self._pending = set()
+
+    def start(self) -> None:
+        """Start draining; must be called from the main thread"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self) -> None:
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _drain(self) -> None:
+        with self._lock:
+            events, self._events = self._events, deque()
+            # Notifications posted while this frame renders go to the next one
+            self._pending = set()
+
+        for kind, payload in events:
+            if kind == _NOTIFY:
+                self._run(payload)
+            else:
+                function, args = payload
+                self._run(function, *args)
+
+        self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    @staticmethod
+    def _run(function: Callable, *args) -> None:
+        # One failing handler must not stop the drain loop
+        try:
+            function(*args)
+        except Exception as e:
+            logger.error("Error handling UI event: %s", str(e), exc_info=True)
@@ -0,0 +1,210 @@
+"""
+Segments Module
+
+This module holds transcribed segments in a compact, array-backed collection
+and renders them to every supported output format on demand. A transcription
+is therefore stored once (start and end times, the text and, optionally, word
+timings) and serves plain text, timestamped text, SRT, VTT and JSON without
+running the model again; toggling timestamps only re-renders.
+
+Times are kept in array('d') columns and the texts of all segments in a few
+large strings addressed by offsets, instead of one dict per segment. Iterating or
+indexing the collection still yields the {'start', 'end', 'text'} dicts used
+throughout the code base, with 'words' when word timings were requested.
+
+Example:
+    >>> from segments import SegmentCollection
+    >>> segments = SegmentCollection()
+    >>> segments.add({'start': 0.0, 'end': 2.5, 'text': ' Hello there.'})
+    >>> segments.render("srt")
+    '1\\n00:00:00,000 --> 00:00:02,500\\nHello there.\\n'
+    >>> segments[0]
+    {'start': 0.0, 'end': 2.5, 'text': ' Hello there.'}
+"""
+
+import json
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Optional, Union
+
+FORMATS = ("text", "timestamped", "srt", "vtt", "json")
+
+# File extension of every format, e.g. for save dialogs and downloads
+FORMAT_EXTENSIONS = {
+    "text": ".txt",
+    "timestamped": ".txt",
+    "srt": ".srt",
+    "vtt": ".vtt",
+    "json": ".json",
+}
+
+def format_timestamp(seconds: float, decimal_marker: str = ".") -> str:
+    """Format seconds as hh:mm:ss.mmm (SRT uses "," as decimal marker)"""
+    milliseconds = max(0, round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{decimal_marker}{milliseconds:03d}"
+
+class _TextColumn:
+    """
+    Strings appended one by one and read back by index, stored as a few joined chunks.
+
+    New strings are joined into a chunk on the next read, and a chunk is merged
+    into the one before it while that one is not longer. Chunks thus hold whole
+    strings, there are O(log n) of them, and a read never copies the text read
+    before, however reads and appends alternate.
+    """
+
+    def __init__(self):
+        # String i is at offsets[i]:offsets[i + 1] of the concatenated text
+        self.offsets = array('q', [0])
+        self._pending: List[str] = []
+        self._chunks: List[str] = []
+        self._chunk_starts = array('q')
+
+    def append(self, text: str) -> None:
+        self._pending.append(text)
+        self.offsets.append(self.offsets[-1] + len(text))
+
+    def get(self, index: int) -> str:
+        if self._pending:
+            self._flush()
+        start, end = self.offsets[index], self.offsets[index + 1]
+        if start == end:
+            return ""
+        chunk = bisect_right(self._chunk_starts, start) - 1
+        chunk_start = self._chunk_starts[chunk]
+        return self._chunks[chunk][start - chunk_start:end - chunk_start]
+
+    def _flush(self) -> None:
+        text = "".join(self._pending)
+        self._pending = []
+        start = self.offsets[-1] - len(text)
+        while self._chunks and len(self._chunks[-1]) <= len(text):
+            text = self._chunks.pop() + text
+            start = self._chunk_starts.pop()
+        self._chunks.append(text)
+        self._chunk_starts.append(start)
+
+class SegmentCollection:
+    def __init__(self, language: Optional[str] = None):
+        self.language = language
+        self._starts = array('d')
+        self._ends = array('d')
+        self._texts = _TextColumn()
+        # Words of segment i are _word_*[_word_offsets[i]:_word_offsets[i + 1]]
+        self._word_offsets = array('q', [0])
+        self._word_starts = array('d')
+        self._word_ends = array('d')
+        self._word_texts = _TextColumn()
+        self._has_words = False
+        # Guards the lazy joining of the texts against concurrent appends
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dicts(cls, segments: Iterable[dict], language: Optional[str] = None) -> "SegmentCollection":
+        collection = cls(language)
+        for segment in segments:
+            collection.add(segment)
+        return collection
+
+    def add(self, segment: dict) -> None:
+        """Append a {'start', 'end', 'text'} segment, with optional 'words' ({'start', 'end', 'word'})"""
+        self.append(segment['start'], segment['end'], segment['text'], segment.get('words'))
+
+    def append(self, start: float, end: float, text: str, words: Optional[List[dict]] = None) -> None:
+        with self._lock:
+            for word in words or ():
+                self._word_starts.append(word['start'])
+                self._word_ends.append(word['end'])
+                self._word_texts.append(word['word'])
+            self._word_offsets.append(len(self._word_starts))
+            self._has_words = self._has_words or bool(words)
+            self._texts.append(text)
+            self._ends.append(end)
+            # The start time is appended last: readers size the collection by
+            # it, so they never see a half-written segment
+            self._starts.append(start)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[dict, List[dict]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        segment = {'start': self._starts[index], 'end': self._ends[index], 'text': self.text(index)}
+        if self._has_words:
+            segment['words'] = self.words(index)
+        return segment
+
+    def text(self, index: int) -> str:
+        with self._lock:
+            return self._texts.get(index)
+
+    def words(self, index: int) -> List[dict]:
+        """Word timings of a segment; empty unless they were transcribed"""
+        with self._lock:
+            return [
+                {'start': self._word_starts[i], 'end': self._word_ends[i], 'word': self._word_texts.get(i)}
+                for i in range(self._word_offsets[index], self._word_offsets[index + 1])
+            ]
+
+    @property
+    def duration(self) -> float:
+        return self._ends[-1] if len(self) else 0.0
+
+    def to_dicts(self) -> List[dict]:
+        return list(self)
+
+    def render(self, fmt: str) -> str:
+        """
+        Render the segments in one of FORMATS.
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        renderers = {
+            "text": self.render_text,
+            "timestamped": self.render_timestamped,
+            "srt": self.render_srt,
+            "vtt": self.render_vtt,
+            "json": self.render_json,
+        }
+        if fmt not in renderers:
+            raise ValueError(f"Unsupported format '{fmt}'. Available formats: {', '.join(FORMATS)}")
+        return renderers[fmt]()
+
+    def render_text(self) -> str:
+        return " ".join(self.text(i) for i in range(len(self)))
+
+    def render_timestamped(self) -> str:
+        return "\n".join(
+            f"[{self._starts[i]:.1f}s -> {self._ends[i]:.1f}s] {self.text(i)}" for i in range(len(self))
+        )
+
+    def render_srt(self) -> str:
+        return "\n".join(
+            f"{i + 1}\n{format_timestamp(self._starts[i], ',')} --> {format_timestamp(self._ends[i], ',')}\n"
+            f"{self.text(i).strip()}\n"
+            for i in range(len(self))
+        )
+
+    def render_vtt(self) -> str:
+        cues = [
+            f"{format_timestamp(self._starts[i])} --> {format_timestamp(self._ends[i])}\n{self.text(i).strip()}\n"
+            for i in range(len(self))
+        ]
+        return "\n".join(["WEBVTT\n"] + cues)
+
+    def render_json(self) -> str:
+        return json.dumps({'language': self.language, 'segments': self.to_dicts()}, ensure_ascii=False, indent=2)
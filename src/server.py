@@ -0,0 +1,207 @@
+"""
+Production Server Module
+
+This module runs the API on gunicorn with several worker processes
+(`python main.py --api --workers N`). The Flask app is imported once in the
+gunicorn master before forking (preload_app), so the HTTP workers share the
+imported code copy-on-write.
+
+The Whisper models are not loaded in the HTTP workers. CTranslate2 starts its
+replica threads when a model is loaded, and threads do not survive fork(), so a
+model loaded before fork is unusable in the children. Instead the master starts
+one inference process that loads the models once and runs every job; the HTTP
+workers hand jobs to it through a JobStore and read status, progress and
+segments back from it. This uses all cores (through the tuned num_workers and
+cpu_threads of the single model) without a copy of the model per HTTP worker.
+
+The HTTP workers never build a JobManager of their own. The models they
+report (/models), the cache statistics (/cache/stats) and the metrics
+(/metrics) are those of the inference process, which stores them in the
+JobStore every METRICS_INTERVAL seconds.
+
+Restarts are graceful: SIGHUP replaces only the HTTP workers and the
+inference process keeps running. On shutdown, the inference process finishes
+the jobs it is running. Jobs still queued stay in the store and run on the
+next start; jobs cut off by a crash or a timed-out shutdown resume from their
+last checkpointed segment. The master supervises the inference process: if
+it dies, it is started again (waiting up to MAX_RESTART_DELAY seconds when
+it keeps dying) and the queued and interrupted jobs continue.
+
+Example:
+    >>> from server import run_server
+    >>> run_server("0.0.0.0", 5000, workers=4)
+"""
+
+import os
+import signal
+import threading
+import time
+from job_store import JobStore
+from config import config
+from logger import logger
+
+# Seconds between metrics snapshots written by the inference process
+METRICS_INTERVAL = 5
+# Seconds between checks that the inference process is alive
+SUPERVISE_INTERVAL = 1
+# Longest wait before restarting an inference process that keeps dying; one that
+# ran for longer than this is restarted at once
+MAX_RESTART_DELAY = 60
+
+def job_store_dir() -> str:
+    return config.jobs_dir
+
+def run_inference() -> None:
+    """Entry point of the inference process: preload the models and run queued jobs"""
+    from jobs import JobManager
+    from transcription import TranscriptionManager
+    from summarizer import get_client
+    import metrics
+
+    # Forked from the gunicorn master: drop its signal handlers (its SIGCHLD handler
+    # would otherwise reap our ffmpeg and yt-dlp subprocesses)
+    for signum in (signal.SIGCHLD, signal.SIGQUIT, signal.SIGUSR1, signal.SIGUSR2,
+                   signal.SIGTTIN, signal.SIGTTOU, signal.SIGWINCH):
+        signal.signal(signum, signal.SIG_DFL)
+
+    stop = threading.Event()
+    # Treat an interrupt like SIGTERM so running jobs finish
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    logger.info("Inference process %d preloading models", os.getpid())
+    TranscriptionManager(config.models_dir, config.settings).load_models()
+    get_client(config.settings).warm_up_async()
+
+    job_store = JobStore(job_store_dir())
+    job_manager = JobManager.from_settings(
+        config.models_dir, config.cache_dir, config.data_dir, config.settings, job_store
+    )
+    metrics.registry.add_collector(job_manager.collect_metrics)
+    job_manager.consume_store()
+    logger.info("Inference process %d ready", os.getpid())
+
+    # The HTTP workers serve /metrics, /models and /cache/stats from the latest snapshot
+    while True:
+        job_store.save_metrics(metrics.registry.render())
+        job_store.save_status({'models': job_manager.models_state(), 'cache': job_manager.cache_stats()})
+        if stop.wait(METRICS_INTERVAL):
+            break
+    logger.info("Inference process %d finishing running jobs", os.getpid())
+    job_manager.shutdown(wait=True, drain=False)
+    logger.info("Inference process %d stopped", os.getpid())
+
+def _is_running(pid: int) -> bool:
+    # The gunicorn master reaps every exited child, so the status may be gone already
+    try:
+        return os.waitpid(pid, os.WNOHANG) == (0, 0)
+    except ChildProcessError:
+        return False
+
+def run_server(host: str = "0.0.0.0", port: int = 5000, workers: int = 2) -> None:
+    """
+    Serve the API with gunicorn.
+
+    Args:
+        host: Interface to bind to
+        port: Port to bind to
+        workers: Number of HTTP worker processes
+
+    Raises:
+        SystemExit: If gunicorn is not installed (it is not available on Windows)
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("Multi-process mode requires gunicorn (pip install gunicorn); "
+                         "it is not available on Windows. Run without --workers instead.")
+
+    graceful_timeout = int(config.settings.get("graceful_timeout", 600))
+    inference = {}
+    # Held while the inference process is started, so on_exit never misses a restarted one
+    inference_lock = threading.Lock()
+    stopping = threading.Event()
+
+    def start_inference(server):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                for listener in server.LISTENERS:
+                    listener.close()
+                # Only the master stops the inference process (Ctrl+C reaches the whole
+                # process group), so the supervisor can treat every exit as a crash
+                os.setsid()
+                run_inference()
+            except BaseException:
+                logger.error("Inference process failed", exc_info=True)
+                exit_code = 1
+            finally:
+                # Never return into the copy of the gunicorn master
+                os._exit(exit_code)
+        inference['pid'] = pid
+        inference['started_at'] = time.time()
+        logger.info("Started inference process %d", pid)
+
+    def supervise(server):
+        delay = 0
+        while not stopping.wait(SUPERVISE_INTERVAL):
+            if _is_running(inference['pid']):
+                continue
+            # Restart at once after a long run, with a growing delay while it keeps dying
+            ran = time.time() - inference['started_at']
+            delay = 0 if ran > MAX_RESTART_DELAY else min(MAX_RESTART_DELAY, max(1, delay * 2))
+            logger.error("Inference process %d exited after %.0fs, restarting it in %ds",
+                         inference['pid'], ran, delay)
+            if stopping.wait(delay):
+                return
+            with inference_lock:
+                if stopping.is_set():
+                    return
+                start_inference(server)
+
+    def when_ready(server):
+        JobStore(job_store_dir()).prune()
+        start_inference(server)
+        threading.Thread(target=supervise, args=(server,), name="inference-supervisor", daemon=True).start()
+
+    def on_exit(server):
+        with inference_lock:
+            stopping.set()
+        pid = inference.get('pid')
+        if not pid or not _is_running(pid):
+            return
+        logger.info("Waiting up to %ds for running jobs to finish", graceful_timeout)
+        os.kill(pid, signal.SIGTERM)
+        deadline = time.time() + graceful_timeout
+        while _is_running(pid) and time.time() < deadline:
+            time.sleep(0.2)
+        if _is_running(pid):
+            logger.warning("Inference process did not stop in time, killing it")
+            os.kill(pid, signal.SIGKILL)
+
+    class YapperServer(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f"{host}:{port}",
+                'workers': workers,
+                # Streaming responses hold a thread for the whole job
+                'worker_class': 'gthread',
+                'threads': int(config.settings.get("api_threads", 8)),
+                'preload_app': True,
+                'graceful_timeout': graceful_timeout,
+                'when_ready': when_ready,
+                'on_exit': on_exit,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            import api
+            from jobs import RemoteJobManager
+            api.job_manager = RemoteJobManager(JobStore(job_store_dir()))
+            return api.app
+
+    logger.info("Starting API server on %s:%d with %d workers", host, port, workers)
+    YapperServer().run()
@@ -1,18 +1,19 @@
+import os
 import tkinter as tk
 from tkinter import ttk, filedialog
-import torch
 from utils import find_ffmpeg
+from jobs import max_concurrent_jobs
 from config import config
 
 class SettingsWindow:
     def __init__(self, parent, settings, on_settings_change):
         self.window = tk.Toplevel(parent)
         self.window.title("Settings")
-        self.window.geometry("400x500")
+        self.window.geometry("400x540")
         self.window.transient(parent)
         self.window.grab_set()
         
-        self.models = ["tiny", "base", "small", "medium", "large", "large-v2"]
+        self.models = config.AVAILABLE_MODELS
         self.settings = settings.copy()
         self.on_settings_change = on_settings_change
         
@@ -49,12 +50,43 @@ class SettingsWindow:
         ttk.Label(main_frame, text="Select Device:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
         self.device_var = tk.StringVar(value=settings["device"])
         devices = ["cpu"]
-        if torch.cuda.is_available():
+        if config.detect_device() == "cuda":
             devices.append("cuda")
         device_combo = ttk.Combobox(main_frame, textvariable=self.device_var, values=devices, state="readonly")
         device_combo.grid(row=current_row, column=1, sticky=(tk.W, tk.E), pady=5)
         current_row += 1
 
+        # Parallel transcription
+        ttk.Label(main_frame, text="Parallel Chunks:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
+        self.parallelism_var = tk.IntVar(value=settings.get("parallelism", 1))
+        parallelism_spin = ttk.Spinbox(
+            main_frame,
+            from_=1,
+            to=os.cpu_count() or 1,
+            textvariable=self.parallelism_var,
+            state="readonly",
+            width=5
+        )
+        parallelism_spin.grid(row=current_row, column=1, sticky=tk.W, pady=5)
+        current_row += 1
+
+        # Concurrent GUI jobs, up to what the CPU and memory allow
+        ttk.Label(main_frame, text="Concurrent Jobs:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
+        limit = max_concurrent_jobs(settings)
+        concurrent_jobs = int(settings.get("gui_concurrent_jobs", 0))
+        self.concurrent_jobs_var = tk.StringVar(
+            value=str(min(concurrent_jobs, limit)) if concurrent_jobs > 0 else "auto"
+        )
+        concurrent_jobs_spin = ttk.Spinbox(
+            main_frame,
+            values=["auto"] + [str(i) for i in range(1, limit + 1)],
+            textvariable=self.concurrent_jobs_var,
+            state="readonly",
+            width=5
+        )
+        concurrent_jobs_spin.grid(row=current_row, column=1, sticky=tk.W, pady=5)
+        current_row += 1
+
         # Timestamp option
         ttk.Label(main_frame, text="Show Timestamps:").grid(row=current_row, column=0, sticky=tk.W, pady=5)
         self.show_timestamps_var = tk.BooleanVar(value=settings.get("show_timestamps", True))
@@ -94,4 +126,7 @@ class SettingsWindow:
         self.settings["device"] = self.device_var.get()
         self.settings["ffmpeg_path"] = self.ffmpeg_path_var.get()
         self.settings["show_timestamps"] = self.show_timestamps_var.get()
+        self.settings["parallelism"] = self.parallelism_var.get()
+        concurrent_jobs = self.concurrent_jobs_var.get()
+        self.settings["gui_concurrent_jobs"] = 0 if concurrent_jobs == "auto" else int(concurrent_jobs)
         self.on_settings_change(self.settings)
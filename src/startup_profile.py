@@ -0,0 +1,105 @@
+"""
+Startup Profiling Module
+
+This module measures the cold-start import time of the GUI or the API
+(`python main.py --startup-profile [--api]`) and checks it against a budget.
+The entry module is imported in a fresh interpreter with `-X importtime`, so
+nothing imported by the profiler itself skews the result, and the slowest
+packages are reported.
+
+Heavy libraries (torch, faster_whisper/CTranslate2, PyAV, yt-dlp and, for the
+GUI, Flask) must be imported on first use, not at startup; importing any of
+them during startup fails the check regardless of the time budget.
+
+Example:
+    >>> from startup_profile import profile_startup
+    >>> report = profile_startup("gui")
+    >>> report["import_seconds"], report["within_budget"]
+    (0.41, True)
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Optional
+
+# Import time budget in seconds for each entry point
+STARTUP_BUDGET_SECONDS = {
+    "gui": 1.0,
+    "api": 1.0,
+}
+
+ENTRY_MODULES = {
+    "gui": "gui",
+    "api": "api",
+}
+
+# Packages that must not be imported during startup, per entry point
+HEAVY_MODULES = {
+    "gui": ("torch", "faster_whisper", "ctranslate2", "av", "onnxruntime", "yt_dlp", "flask"),
+    "api": ("torch", "faster_whisper", "ctranslate2", "av", "onnxruntime", "yt_dlp"),
+}
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def profile_startup(mode: str = "gui", budget: Optional[float] = None, top: int = 15) -> dict:
+    """
+    Import the entry module of a mode in a fresh interpreter and time it.
+
+    Args:
+        mode: "gui" or "api"
+        budget: Import time budget in seconds; defaults to STARTUP_BUDGET_SECONDS
+        top: Number of slowest packages to report
+
+    Returns:
+        dict: 'mode', 'wall_seconds' (including interpreter start),
+        'import_seconds', 'budget_seconds', 'slowest' [(package, seconds)],
+        'heavy_modules' imported during startup and 'within_budget'
+
+    Raises:
+        RuntimeError: If the entry module fails to import
+    """
+    budget = STARTUP_BUDGET_SECONDS[mode] if budget is None else budget
+    code = f"import sys; sys.path.insert(0, {SRC_DIR!r}); import {ENTRY_MODULES[mode]}"
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(SRC_DIR)
+    )
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        error = "\n".join(line for line in process.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"Importing {ENTRY_MODULES[mode]} failed: {error.strip()}")
+
+    total_us = 0
+    packages = {}
+    for line in process.stderr.splitlines():
+        # import time:      self [us] |   cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        self_us, cumulative_us = int(fields[0]), int(fields[1])
+        name = fields[2].rstrip()
+        total_us += self_us
+        # The first import of a package includes everything it imports itself
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0), cumulative_us)
+
+    import_seconds = total_us / 1e6
+    heavy = [module for module in HEAVY_MODULES[mode] if module in packages]
+    packages.pop(ENTRY_MODULES[mode], None)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'mode': mode,
+        'wall_seconds': wall,
+        'import_seconds': import_seconds,
+        'budget_seconds': budget,
+        'slowest': [(package, cumulative_us / 1e6) for package, cumulative_us in slowest],
+        'heavy_modules': heavy,
+        'within_budget': import_seconds <= budget and not heavy,
+    }
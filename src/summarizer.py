@@ -0,0 +1,331 @@
+"""
+Summarization Module
+
+This module produces the structured video summary with Ollama. Transcripts that
+fit into one prompt are summarized directly. Longer transcripts are summarized
+hierarchically (map-reduce): the transcript is split into token-budgeted chunks
+at line or sentence boundaries, the chunks are summarized concurrently, and the
+partial summaries are reduced into the final template. If the partial summaries
+are still too long they are reduced again, level by level; a level whose
+summaries do not get shorter is retried once with a stricter prompt, and
+summarization fails if that does not help either.
+
+Requests go through a shared, pooled OllamaClient per Ollama configuration
+(host, model, timeout, keep_alive, retries). Every request sets num_ctx large
+enough for a chunk, the prompt around it and the answer, because Ollama
+silently truncates prompts longer than its (often 2048 token) default context.
+
+Example:
+    >>> from summarizer import Summarizer
+    >>> summarizer = Summarizer(config.settings)
+    >>> summary = summarizer.summarize(transcription)
+"""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from logger import logger
+
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"
+DEFAULT_OLLAMA_MODEL = "mistral:latest"
+
+# Seconds to wait for a connection; the read timeout is configurable
+CONNECT_TIMEOUT = 5
+
+SUMMARY_PROMPT = """
+                    Your output should use the following template:
+                    ### Summary
+                    ### Analogy
+                    ### Notes
+                    - [Emoji] Bulletpoint
+                    ### Keywords
+                    - Explanation
+                    You have been tasked with creating a concise summary of a YouTube video using its transcription.
+                    Make a summary of the transcript.
+                    Additionally make a short complex analogy to give context and/or analogy from day-to-day life from the transcript.
+                    Create 10 bullet points (each with an appropriate emoji) that summarize the key points or important moments from the video's transcription.
+                    In addition to the bullet points, extract the most important keywords and any complex words not known to the average reader as
+                    well as any acronyms mentioned. For each keyword and complex word, provide an explanation and definition based on its occurrence in the transcription.
+                    Please ensure that the summary, bullet points, and explanations fit within the 330-word limit, while still offering a comprehensive and clear understanding of the video's content.
+                    Use the text above: {text}.
+                    """
+
+CHUNK_PROMPT = """
+                    You are given one part of a longer YouTube video transcription.
+                    Write a dense summary of this part only, in the language of the transcription.
+                    Keep every key point, important moment, name, number, keyword, complex word and acronym,
+                    because your summary will later be combined with the summaries of the other parts.
+                    Part {index} of {total}: {text}
+                    """
+
+TERSE_CHUNK_PROMPT = """
+                    You are given one part of a longer YouTube video transcription.
+                    Summarize this part in at most 5 short sentences, in the language of the transcription.
+                    Keep only the key points, names and numbers; leave out examples and repetitions.
+                    Part {index} of {total}: {text}
+                    """
+
+REDUCE_HEADER = "The following are summaries of consecutive parts of the video transcription:\n\n"
+
+# Sentences end with ., ! or ? followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# Context reserved for the answer; the template asks for at most 330 words
+RESPONSE_TOKENS = 1024
+
+# estimate_tokens is low for text that tokenizes into short pieces (e.g. Polish)
+TOKEN_ESTIMATE_MARGIN = 1.5
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for LLM context budgeting (about 4 characters per token)"""
+    return max(len(text) // 4, len(text.split()))
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens estimated tokens.
+
+    Lines (timestamped segments) are kept whole; text without line breaks is
+    split into sentences, and anything still too long is split into words.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List[str]: Chunks in their original order
+    """
+    units = [line for line in text.splitlines() if line.strip()]
+    if len(units) <= 1:
+        units = SENTENCE_BOUNDARY.split(text.strip())
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for unit in units:
+        for piece in _split_unit(unit, max_tokens):
+            # +1 for the line break joining the pieces of a chunk
+            piece_tokens = estimate_tokens(piece) + 1
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def _split_unit(unit: str, max_tokens: int) -> List[str]:
+    if estimate_tokens(unit) <= max_tokens:
+        return [unit]
+    words = unit.split()
+    # estimate_tokens never counts a word as less than one token
+    words_per_piece = max(1, min(max_tokens, max_tokens * 4 * len(words) // max(len(unit), 1)))
+    return [" ".join(words[i:i + words_per_piece]) for i in range(0, len(words), words_per_piece)]
+
+def chunk_tokens(settings: dict) -> int:
+    """Estimated tokens of transcript sent in one prompt"""
+    return max(256, int(settings.get("summary_chunk_tokens", 3000)))
+
+def context_tokens(settings: dict) -> int:
+    """Ollama context (num_ctx) that holds a full chunk, the longest prompt around it and the answer"""
+    prompt_tokens = max(estimate_tokens(SUMMARY_PROMPT + REDUCE_HEADER), estimate_tokens(CHUNK_PROMPT))
+    needed = int((chunk_tokens(settings) + prompt_tokens) * TOKEN_ESTIMATE_MARGIN) + RESPONSE_TOKENS
+    # Round up to whole kilotokens, so close chunk sizes share one loaded model
+    return -(-needed // 1024) * 1024
+
+class Summarizer:
+    def __init__(self, settings: dict):
+        self.settings = settings
+        self.chunk_tokens = chunk_tokens(settings)
+        self.concurrency = max(1, int(settings.get("summary_concurrency", 2)))
+
+    def summarize(self, text: str) -> Optional[str]:
+        """
+        Summarize a transcription into the summary template.
+
+        Returns:
+            Optional[str]: The summary, or None if Ollama failed
+        """
+        if estimate_tokens(text) <= self.chunk_tokens:
+            return self.generate(SUMMARY_PROMPT.format(text=text))
+
+        partials = self.reduce_to_budget(text)
+        if partials is None:
+            return None
+        logger.info("Reducing partial summaries into the final summary")
+        return self.generate(SUMMARY_PROMPT.format(text=REDUCE_HEADER + partials))
+
+    def reduce_to_budget(self, text: str) -> Optional[str]:
+        """
+        Summarize text chunk by chunk until the combined summaries fit in one chunk.
+
+        If the partial summaries do not get shorter, the level is retried once
+        with a stricter prompt that asks for a few sentences per chunk.
+
+        Returns:
+            Optional[str]: The combined summaries, or None if Ollama failed or
+            the summaries could not be shortened to fit
+        """
+        level = 0
+        prompt = CHUNK_PROMPT
+        while estimate_tokens(text) > self.chunk_tokens:
+            level += 1
+            chunks = split_into_chunks(text, self.chunk_tokens)
+            logger.info("Summarization level %d: %d chunks, concurrency %d", level, len(chunks), self.concurrency)
+            reduced = self._summarize_chunks(chunks, prompt)
+            if reduced is None:
+                return None
+
+            if estimate_tokens(reduced) >= estimate_tokens(text) and prompt is CHUNK_PROMPT:
+                logger.warning("Partial summaries did not get shorter at level %d; retrying with a stricter prompt", level)
+                prompt = TERSE_CHUNK_PROMPT
+                reduced = self._summarize_chunks(chunks, prompt)
+                if reduced is None:
+                    return None
+            if estimate_tokens(reduced) >= estimate_tokens(text):
+                # The model is not shortening the text; stop instead of looping forever
+                logger.error(
+                    "Partial summaries did not get shorter at level %d (%d tokens from %d); summarization failed",
+                    level, estimate_tokens(reduced), estimate_tokens(text)
+                )
+                return None
+            text = reduced
+        return text
+
+    def _summarize_chunks(self, chunks: List[str], prompt: str) -> Optional[str]:
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            partials = list(executor.map(
+                lambda item: self.generate(prompt.format(index=item[0] + 1, total=len(chunks), text=item[1])),
+                enumerate(chunks)
+            ))
+        if any(partial is None for partial in partials):
+            logger.error("Failed to summarize %d of %d chunks", partials.count(None), len(chunks))
+            return None
+        return "\n\n".join(partial.strip() for partial in partials)
+
+    def generate(self, prompt: str) -> Optional[str]:
+        """Send a prompt to Ollama and return the full response"""
+        return get_client(self.settings).generate(prompt)
+
+class OllamaClient:
+    """
+    Pooled HTTP client for the Ollama generate API.
+
+    Connections are kept alive and reused across requests, every request has
+    connect/read timeouts, failed requests are retried with exponential
+    backoff, and keep_alive tells Ollama how long to keep the model loaded
+    between jobs.
+    """
+
+    def __init__(self, host: str, model: str, timeout: float = 300, keep_alive: str = "30m",
+                 retries: int = 3, backoff: float = 1.0, pool_size: int = 16,
+                 num_ctx: Optional[int] = None):
+        self.url = host.rstrip("/") + "/api/generate"
+        self.model = model
+        # Sent with the warm-up too; Ollama reloads the model when the context size changes
+        self.options = {"num_ctx": num_ctx} if num_ctx else {}
+        self.timeout = (CONNECT_TIMEOUT, timeout)
+        self.keep_alive = keep_alive
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        logger.info("OllamaClient initialized for %s (model: %s)", self.url, model)
+
+    def generate(self, prompt: str) -> Optional[str]:
+        """
+        Send a prompt and return the full streamed response.
+
+        Returns:
+            Optional[str]: The response text, or None once all retries failed
+        """
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning("Retrying Ollama request in %.1fs (attempt %d/%d)", delay, attempt + 1, self.retries + 1)
+                time.sleep(delay)
+            try:
+                logger.info("Sending text to Ollama for summarization")
+                response = self.session.post(
+                    self.url,
+                    json={
+                        "model": self.model,
+                        "prompt": prompt,
+                        "keep_alive": self.keep_alive,
+                        "options": self.options,
+                    },
+                    stream=True,
+                    timeout=self.timeout
+                )
+
+                with response:
+                    if response.status_code == 200:
+                        full_response = ""
+                        for line in response.iter_lines():
+                            if line:
+                                json_response = json.loads(line)
+                                if 'response' in json_response:
+                                    full_response += json_response['response']
+                        logger.info("Successfully received summary from Ollama")
+                        return full_response
+
+                    logger.error("Failed to get response from Ollama: %s", response.status_code)
+                    if response.status_code < 500:
+                        # Client errors (e.g. unknown model) will not go away on retry
+                        return None
+
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                logger.error("Error sending to Ollama: %s", str(e))
+            except Exception as e:
+                logger.error("Error sending to Ollama: %s", str(e), exc_info=True)
+                return None
+        return None
+
+    def warm_up(self) -> bool:
+        """Ask Ollama to load the model now, so the first summary does not pay for it"""
+        try:
+            response = self.session.post(
+                self.url,
+                json={"model": self.model, "keep_alive": self.keep_alive, "options": self.options},
+                timeout=self.timeout
+            )
+            response.close()
+            if response.status_code == 200:
+                logger.info("Ollama model %s is loaded", self.model)
+                return True
+            logger.warning("Ollama warm-up failed: %s", response.status_code)
+        except Exception as e:
+            logger.warning("Ollama warm-up failed: %s", str(e))
+        return False
+
+    def warm_up_async(self) -> threading.Thread:
+        """Run warm_up in a background thread"""
+        thread = threading.Thread(target=self.warm_up, name="ollama-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(settings: dict) -> OllamaClient:
+    """Return the shared OllamaClient for the Ollama settings, creating it on first use"""
+    key = (
+        settings.get("ollama_host", DEFAULT_OLLAMA_HOST),
+        settings.get("ollama_model", DEFAULT_OLLAMA_MODEL),
+        float(settings.get("ollama_timeout", 300)),
+        str(settings.get("ollama_keep_alive", "30m")),
+        int(settings.get("ollama_retries", 3)),
+        context_tokens(settings),
+    )
+    with _clients_lock:
+        if key not in _clients:
+            host, model, timeout, keep_alive, retries, num_ctx = key
+            _clients[key] = OllamaClient(host, model, timeout, keep_alive, retries, num_ctx=num_ctx)
+        return _clients[key]
@@ -0,0 +1,70 @@
+"""
+Transcript Cache Module
+
+This module stores finished transcriptions on disk so that a URL which has
+already been processed with the same model, compute type, language and word
+timing setting is served without downloading audio or running Whisper again. Entries are keyed by the
+canonical video ID reported by yt-dlp rather than by the raw URL, so different
+URL spellings of the same video share one entry.
+
+Example:
+    >>> from transcript_cache import TranscriptCache
+    >>> cache = TranscriptCache.from_settings(config.cache_dir, config.settings)
+    >>> key = TranscriptCache.make_key("youtube:dQw4w9WgXcQ", "base", "int8", "auto")
+    >>> cache.get(key) is None
+    True
+"""
+
+import json
+import os
+from typing import Optional
+from disk_cache import DiskLRUCache
+from logger import logger
+
+class TranscriptCache(DiskLRUCache):
+    def __init__(self, cache_dir: str, max_bytes: int):
+        super().__init__(cache_dir, max_bytes, suffix=".json", name="transcripts")
+
+    @classmethod
+    def from_settings(cls, cache_dir: str, settings: dict) -> Optional["TranscriptCache"]:
+        """Create the cache described by settings, or None if caching is disabled"""
+        if not settings.get("transcript_cache_enabled", True):
+            return None
+        max_bytes = int(settings.get("transcript_cache_max_mb", 512)) * 1024 * 1024
+        return cls(os.path.join(cache_dir, "transcripts"), max_bytes)
+
+    @staticmethod
+    def make_key(video_id: str, model: str, compute_type: str, language: Optional[str],
+                 word_timestamps: bool = False) -> str:
+        """Build the cache key for a video transcribed with the given settings"""
+        parts = [video_id, model, compute_type, language or "auto"]
+        # Entries without word timings keep the keys they had before word timings existed
+        if word_timestamps:
+            parts.append("words")
+        return "|".join(parts)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Return the cached entry for a key.
+
+        Returns:
+            Optional[dict]: Entry with 'segments', 'language' and 'summary', or None
+        """
+        path = self.get_path(key)
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error("Error reading cached transcript %s: %s", path, str(e), exc_info=True)
+            self.delete(key)
+            return None
+
+    def put(self, key: str, entry: dict) -> None:
+        """Store an entry with 'segments', 'language' and 'summary'"""
+        try:
+            self.put_bytes(key, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+            logger.info("Cached transcript for key: %s", key)
+        except Exception as e:
+            logger.error("Error caching transcript: %s", str(e), exc_info=True)
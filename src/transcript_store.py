@@ -0,0 +1,241 @@
+"""
+Transcript Store Module
+
+This module keeps every completed transcription in a local SQLite database
+(segments with millisecond timestamps, language, model and summary), so
+earlier results can be found instead of transcribing the video again. The
+segment texts are indexed with FTS5; search() returns the matching segments
+of all stored transcripts, best matches first, and stays fast with tens of
+thousands of transcripts.
+
+A transcript is identified by the canonical video ID the transcript cache uses
+(or the content ID of an uploaded file) and the model, compute type and
+language it was transcribed with, so different spellings of one video's URL
+share a row; storing it again replaces the previous version. The URL is kept
+for display. The database runs in WAL mode, so the
+HTTP workers of the multi-process server can search while the inference
+process writes. Connections are opened per thread and per process on first
+use, so a store created before fork() is safe to use in the children.
+
+Example:
+    >>> from transcript_store import TranscriptStore
+    >>> store = TranscriptStore.from_settings(config.data_dir, config.settings)
+    >>> store.save("https://youtube.com/watch?v=...", segments, summary="...",
+    ...            language="en", model="base", compute_type="int8", video_id="youtube:...")
+    >>> store.search("neural network")[0]["start_ms"]
+    73200
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+from logger import logger
+
+DB_FILE = "transcripts.db"
+
+# Most results a single search returns
+MAX_SEARCH_LIMIT = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    video_id TEXT,
+    url TEXT NOT NULL,
+    title TEXT,
+    language TEXT,
+    model TEXT,
+    compute_type TEXT,
+    summary TEXT,
+    duration_ms INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_transcript ON segments(transcript_id, start_ms);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segments_fts_insert AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_fts_delete AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+class TranscriptStoreError(Exception):
+    """Raised for invalid search queries"""
+    pass
+
+def to_match_query(query: str) -> str:
+    """
+    Turn user input into an FTS5 query matching segments that contain every word.
+
+    Words are quoted, so characters with a meaning in the FTS5 syntax (quotes,
+    hyphens, colons) are searched for literally; a trailing * keeps a prefix search.
+
+    Raises:
+        TranscriptStoreError: If the query contains no words
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if not terms:
+        raise TranscriptStoreError("Empty search query")
+    return " ".join(terms)
+
+class TranscriptStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, data_dir: str, settings: dict) -> Optional["TranscriptStore"]:
+        """Create the store described by settings, or None if it is disabled"""
+        if not settings.get("transcript_store_enabled", True):
+            return None
+        return cls(os.path.join(data_dir, DB_FILE))
+
+    @staticmethod
+    def make_key(video_id: str, model: str, compute_type: str, language: Optional[str]) -> str:
+        return "|".join([video_id, model, compute_type, language or "auto"])
+
+    def contains(self, key: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM transcripts WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def save(self, url: str, segments: List[dict], summary: Optional[str] = None,
+             language: Optional[str] = None, model: Optional[str] = None,
+             compute_type: Optional[str] = None, title: Optional[str] = None,
+             requested_language: Optional[str] = None, video_id: Optional[str] = None) -> int:
+        """
+        Store a transcript, replacing an earlier one of the same video and settings.
+
+        Args:
+            url: URL or content ID of the transcribed file, shown with the results
+            segments: Segments with 'start' and 'end' in seconds and 'text'
+            summary: Summary, if one was generated
+            language: Language of the transcript
+            model: Whisper model size
+            compute_type: CTranslate2 compute type
+            title: Display name, e.g. a video title or file name
+            requested_language: The language setting ("" or None for detection)
+            video_id: Canonical video ID (see AudioProcessor.get_video_id); the
+                URL identifies the transcript when it is None
+
+        Returns:
+            int: ID of the stored transcript
+        """
+        video_id = video_id or url
+        key = self.make_key(video_id, model or "", compute_type or "", requested_language)
+        rows = [
+            (round(segment['start'] * 1000), round(segment['end'] * 1000), segment['text'].strip())
+            for segment in segments
+        ]
+        connection = self._connection()
+        with connection:
+            # Deleting the old version removes its segments from the index through the triggers
+            connection.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+            cursor = connection.execute(
+                "INSERT INTO transcripts (key, video_id, url, title, language, model, compute_type, summary, "
+                "duration_ms, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, video_id, url, title, language, model, compute_type, summary,
+                 rows[-1][1] if rows else 0, time.time())
+            )
+            transcript_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO segments (transcript_id, start_ms, end_ms, text) VALUES (?, ?, ?, ?)",
+                [(transcript_id, *row) for row in rows]
+            )
+        logger.info("Stored transcript %d (%d segments) for %s", transcript_id, len(rows), url)
+        return transcript_id
+
+    def search(self, query: str, limit: int = 50, offset: int = 0) -> List[dict]:
+        """
+        Find segments containing every word of query, best matches first.
+
+        Args:
+            query: Words to search for; "word*" matches a prefix
+            limit: Maximum number of results (capped at MAX_SEARCH_LIMIT)
+            offset: Number of results to skip, for paging
+
+        Returns:
+            List[dict]: 'transcript_id', 'url', 'title', 'language', 'model',
+            'start_ms', 'end_ms', 'text' and 'created_at' of each matching segment
+
+        Raises:
+            TranscriptStoreError: If the query is empty or invalid
+        """
+        limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+        try:
+            rows = self._connection().execute(
+                """
+                SELECT t.id, t.url, t.title, t.language, t.model, s.start_ms, s.end_ms, s.text, t.created_at
+                FROM segments_fts
+                JOIN segments s ON s.id = segments_fts.rowid
+                JOIN transcripts t ON t.id = s.transcript_id
+                WHERE segments_fts MATCH ?
+                ORDER BY segments_fts.rank
+                LIMIT ? OFFSET ?
+                """,
+                (to_match_query(query), limit, max(0, int(offset)))
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise TranscriptStoreError(f"Invalid search query: {str(e)}")
+        columns = ('transcript_id', 'url', 'title', 'language', 'model', 'start_ms', 'end_ms', 'text', 'created_at')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get(self, transcript_id: int) -> Optional[dict]:
+        """Return a stored transcript with its segments (timestamps in ms), or None"""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT id, video_id, url, title, language, model, compute_type, summary, duration_ms, created_at "
+            "FROM transcripts WHERE id = ?", (transcript_id,)
+        ).fetchone()
+        if not row:
+            return None
+        columns = ('id', 'video_id', 'url', 'title', 'language', 'model', 'compute_type', 'summary', 'duration_ms', 'created_at')
+        transcript = dict(zip(columns, row))
+        transcript['segments'] = [
+            {'start_ms': start_ms, 'end_ms': end_ms, 'text': text}
+            for start_ms, end_ms, text in connection.execute(
+                "SELECT start_ms, end_ms, text FROM segments WHERE transcript_id = ? ORDER BY start_ms",
+                (transcript_id,)
+            )
+        ]
+        return transcript
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and a new one after fork()
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.executescript(SCHEMA)
+        self._migrate(connection)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _migrate(connection: sqlite3.Connection) -> None:
+        # Databases created before transcripts were keyed by video ID; their rows keep the URL keys
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(transcripts)")]
+        if 'video_id' not in columns:
+            with connection:
+                connection.execute("ALTER TABLE transcripts ADD COLUMN video_id TEXT")
@@ -0,0 +1,254 @@
+"""
+Transcript View Module
+
+This module provides the GUI widget that shows a transcript. Multi-hour videos
+produce thousands of segments, and inserting all of them into one text widget
+freezes Tk, uses a lot of memory and makes scrolling sluggish. TranscriptView
+keeps the transcript as a list of entries (one per segment or line) and only
+ever renders the entries that fit in the visible window; scrolling, appending
+and jumping re-render that window, so their cost does not depend on the length
+of the transcript.
+
+While new segments arrive the view follows the end of the transcript, unless
+the user scrolled away from it. A time field jumps to the first segment
+starting at or after the given time (e.g. "1:23:45", "83:20" or "75").
+
+Example:
+    >>> from transcript_view import TranscriptView
+    >>> view = TranscriptView(frame, height=200)
+    >>> view.frame.grid(row=1, column=0, sticky="nsew")
+    >>> view.append_segments(segments, format_segment, "\\n")
+    >>> view.jump_to(3600)
+    >>> text = view.get_text()
+"""
+
+import re
+from tkinter import messagebox
+from typing import Callable, List, Optional
+import customtkinter as ctk
+
+# Lines longer than this are split at whitespace, so a transcript without
+# timestamps (one long line) is virtualized as well
+MAX_ENTRY_CHARS = 300
+
+# Entries scrolled per mouse wheel step
+WHEEL_STEP = 3
+
+TIMESTAMP = re.compile(r"^\[(\d+(?:\.\d+)?)s ->")
+
+def parse_time(value: str) -> float:
+    """
+    Parse "hh:mm:ss", "mm:ss" or seconds (optionally with an "s" suffix).
+
+    Raises:
+        ValueError: If the value is not a time
+    """
+    parts = value.strip().rstrip("s").split(":")
+    if not 1 <= len(parts) <= 3 or not all(parts):
+        raise ValueError(f"Invalid time: {value}")
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    if seconds < 0:
+        raise ValueError(f"Invalid time: {value}")
+    return seconds
+
+def split_entry(text: str) -> List[str]:
+    """Split a long line at whitespace into pieces of at most MAX_ENTRY_CHARS"""
+    pieces = []
+    while len(text) > MAX_ENTRY_CHARS:
+        cut = text.rfind(" ", 0, MAX_ENTRY_CHARS) + 1 or MAX_ENTRY_CHARS
+        pieces.append(text[:cut])
+        text = text[cut:]
+    pieces.append(text)
+    return pieces
+
+class TranscriptView:
+    def __init__(self, parent, height: int = 200):
+        self.frame = ctk.CTkFrame(parent, fg_color="transparent")
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.frame.grid_rowconfigure(1, weight=1)
+
+        # Entries keep their trailing separator, so joining them restores the text
+        self.entries: List[str] = []
+        # Start time of each entry; None for entries without a timestamp
+        self.starts: List[Optional[float]] = []
+        self.offset = 0
+        self.rows = max(1, height // 16)
+        self.follow = True
+
+        # Jump to timestamp
+        jump_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        jump_frame.grid(row=0, column=0, columnspan=2, sticky="e", pady=(0, 5))
+        self.time_entry = ctk.CTkEntry(jump_frame, placeholder_text="Czas, np. 1:23:45", width=140)
+        self.time_entry.grid(row=0, column=0, padx=(0, 5))
+        self.time_entry.bind("<Return>", lambda event: self.jump_to_entered_time())
+        ctk.CTkButton(jump_frame, text="Przejdź", width=80, command=self.jump_to_entered_time).grid(
+            row=0, column=1
+        )
+
+        # Only the visible entries are in the textbox; the scrollbar spans the whole transcript
+        self.textbox = ctk.CTkTextbox(self.frame, height=height, wrap="word", activate_scrollbars=False)
+        self.textbox.grid(row=1, column=0, sticky="nsew")
+        self.textbox.tag_config("jump", background="#1f538d")
+        self.textbox.configure(state="disabled")
+        self.scrollbar = ctk.CTkScrollbar(self.frame, command=self.yview)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.textbox.bind("<Configure>", self._on_resize)
+        self.textbox.bind("<MouseWheel>", self._on_wheel)
+        self.textbox.bind("<Button-4>", lambda event: self.scroll(-WHEEL_STEP))
+        self.textbox.bind("<Button-5>", lambda event: self.scroll(WHEEL_STEP))
+        self.textbox.bind("<Prior>", lambda event: self.scroll(-self.rows))
+        self.textbox.bind("<Next>", lambda event: self.scroll(self.rows))
+        self._render()
+
+    def clear(self) -> None:
+        self.entries = []
+        self.starts = []
+        self.offset = 0
+        self.follow = True
+        self._render()
+
+    def is_empty(self) -> bool:
+        return not self.entries
+
+    def set_text(self, text: str) -> None:
+        self.clear()
+        self.append_text(text)
+
+    def append_text(self, text: str) -> None:
+        """Append plain text; lines starting with "[12.3s -> ...]" can be jumped to"""
+        entries = []
+        starts = []
+        lines = text.split("\n")
+        for i, line in enumerate(lines):
+            match = TIMESTAMP.match(line)
+            pieces = split_entry(line)
+            if i < len(lines) - 1:
+                pieces[-1] += "\n"
+            entries.extend(pieces)
+            starts.append(float(match.group(1)) if match else None)
+            starts.extend([None] * (len(pieces) - 1))
+        self._append(entries, starts, "\n")
+
+    def append_segments(self, segments: List[dict], format_segment: Callable[[dict], str],
+                        separator: str) -> None:
+        """Append transcribed segments, formatted by format_segment and joined with separator"""
+        if not segments:
+            return
+        entries = [format_segment(segment) + separator for segment in segments]
+        # The last entry has no successor yet
+        entries[-1] = entries[-1][:-len(separator)]
+        self._append(entries, [segment['start'] for segment in segments], separator)
+
+    def get_text(self) -> str:
+        return "".join(self.entries)
+
+    def jump_to(self, seconds: float) -> bool:
+        """
+        Show the first entry starting at or after seconds at the top of the view.
+
+        Returns:
+            bool: False if no entry starts that late
+        """
+        index = self._find(seconds)
+        if index is None:
+            return False
+        self.offset = index
+        self.follow = False
+        self._render(highlight=True)
+        return True
+
+    def jump_to_entered_time(self) -> None:
+        value = self.time_entry.get()
+        try:
+            seconds = parse_time(value)
+        except ValueError:
+            messagebox.showerror("Error", f"Nieprawidłowy czas: {value}")
+            return
+        if not self.jump_to(seconds):
+            messagebox.showinfo("Info", f"Brak fragmentu od {value}")
+
+    def scroll(self, entries: int) -> str:
+        self._scroll_to(self.offset + entries)
+        # Stop Tk from scrolling the textbox itself
+        return "break"
+
+    def yview(self, *args) -> None:
+        """Scrollbar command: ("moveto", fraction) or ("scroll", count, "units"/"pages")"""
+        if args[0] == "moveto":
+            self._scroll_to(round(float(args[1]) * len(self.entries)))
+        elif args[0] == "scroll":
+            step = self.rows if len(args) > 2 and args[2] == "pages" else 1
+            self._scroll_to(self.offset + int(args[1]) * step)
+
+    def _append(self, entries: List[str], starts: List[Optional[float]], separator: str) -> None:
+        if not entries:
+            return
+        # The last entry never ends with a separator; an empty one is left by text ending in "\n"
+        if self.entries and self.entries[-1]:
+            self.entries[-1] += separator
+        elif self.entries:
+            self.entries.pop()
+            self.starts.pop()
+        self.entries.extend(entries)
+        self.starts.extend(starts)
+        if self.follow:
+            self.offset = self._last_offset()
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def _find(self, seconds: float) -> Optional[int]:
+        # Batch results hold several transcripts, each starting again at 0; the first
+        # match is in the first transcript that is long enough
+        for index, start in enumerate(self.starts):
+            if start is not None and start >= seconds:
+                return index
+        return None
+
+    def _scroll_to(self, offset: int) -> None:
+        self.offset = max(0, min(offset, self._last_offset()))
+        self.follow = self.offset >= self._last_offset()
+        self._render()
+
+    def _last_offset(self) -> int:
+        return max(0, len(self.entries) - self.rows)
+
+    def _render(self, highlight: bool = False) -> None:
+        visible = self.entries[self.offset:self.offset + self.rows + 1]
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("end", "".join(visible))
+        if highlight and visible:
+            self.textbox.tag_add("jump", "1.0", f"1.0+{len(visible[0].rstrip())}c")
+        self.textbox.configure(state="disabled")
+        if self.follow:
+            # Wrapped lines may not all fit; keep the newest text in sight
+            self.textbox.see("end")
+        else:
+            self.textbox.yview_moveto(0)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self) -> None:
+        total = len(self.entries)
+        if total <= self.rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.rows) / total))
+
+    def _on_resize(self, event) -> None:
+        font = self.textbox.cget("font")
+        linespace = font.metrics("linespace") if hasattr(font, "metrics") else 16
+        rows = max(1, event.height // max(1, linespace))
+        if rows != self.rows:
+            self.rows = rows
+            if self.follow:
+                self.offset = self._last_offset()
+            self._render()
+
+    def _on_wheel(self, event) -> str:
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-delta * WHEEL_STEP if delta else 0)
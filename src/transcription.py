@@ -2,16 +2,47 @@
 Transcription Module
 
 This module handles audio transcription and summarization using Whisper and Ollama.
+
+The audio file is decoded to a 16 kHz mono float32 buffer once per job and the
+same buffer is shared by the language detection and transcription models, so
+FFmpeg decoding and resampling happen only once. With "parallelism" above 1 the
+audio is split at VAD silence boundaries and the chunks are transcribed
+concurrently. In pipelined mode, audio is transcribed window by window while it
+is still being downloaded.
+
+Segments are collected in a SegmentCollection, which renders plain text,
+timestamped text, SRT, VTT and JSON from the same transcription; with the
+word_timestamps setting each segment also carries the timings of its words.
+An interrupted transcription can be resumed: with start_time, only the audio
+after the last checkpointed segment is transcribed, and keep_audio leaves the
+audio file for the next attempt.
 """
 
-import yt_dlp
 import os
-import requests
-import json
-from faster_whisper import WhisperModel
-from utils import create_temp_audio_file, cleanup_temp_file
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from audio_processor import AudioProcessor, PCMStream, PCM_EXTENSION, SAMPLE_RATE, read_pcm, wav_pcm_layout
+from chunking import split_on_silence, find_cut_point
+from model_registry import model_registry, effective_compute_type, tuned_for_device
+from segments import SegmentCollection
+from summarizer import Summarizer
+from metrics import timed, timed_iter, record_audio
+from utils import cleanup_temp_file
 from logger import logger
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Iterable, Iterator
+
+# Only the beginning of the audio is needed to detect the spoken language
+LANGUAGE_DETECTION_SECONDS = 300
+
+# Upper bound for the length of a chunk in parallel transcription mode
+PARALLEL_CHUNK_SECONDS = 60
+
+# Audio read from the stream per step in pipelined mode
+PIPELINE_CHUNK_SECONDS = 60
+
+# Tail of the previous window's text passed as prompt to the next one
+PROMPT_CONTEXT_CHARS = 200
 
 class TranscriptionError(Exception):
     """Base exception for transcription-related errors"""
@@ -25,32 +56,45 @@ class AudioFileError(TranscriptionError):
     """Exception raised when there are issues with the audio file"""
     pass
 
+def format_segment(segment: dict, show_timestamps: bool = True) -> str:
+    """Format a single segment as a line of the transcript"""
+    if show_timestamps:
+        return f"[{segment['start']:.1f}s -> {segment['end']:.1f}s] {segment['text']}"
+    return segment['text']
+
 class TranscriptionManager:
     def __init__(self, models_dir: str, settings: dict):
         self.models_dir = models_dir
         self.settings = settings
         self.whisper_model = None
         self.lang_detect_model = None
+        self.loaded_model_key = None
         self.temp_audio_file = None
         logger.info("TranscriptionManager initialized with settings: %s", settings)
         
     def load_models(self, progress_callback=None) -> None:
-        """Load Whisper models for language detection and transcription"""
+        """
+        Load Whisper models for language detection and transcription.
+
+        Models come from the shared model registry, so this is cheap when the
+        models for the current settings are already warm and picks up model
+        changes when they are not.
+        """
         try:
             if progress_callback:
                 progress_callback("Loading models...", 0)
             
+            device = self.settings["device"]
+            compute_type = effective_compute_type(self.settings)
+            if not tuned_for_device(self.settings):
+                logger.warning("Settings were tuned on %s; using %s and the default thread count on %s",
+                               self.settings["tuned_device"], compute_type, device)
+            
             # Load tiny model for language detection first
-            if not self.lang_detect_model:
-                logger.info("Loading language detection model...")
-                if progress_callback:
-                    progress_callback("Loading language detection model...", 10)
-                self.lang_detect_model = WhisperModel(
-                    "tiny",
-                    device=self.settings["device"],
-                    compute_type="int8",
-                    download_root=self.models_dir
-                )
+            logger.info("Loading language detection model...")
+            if progress_callback:
+                progress_callback("Loading language detection model...", 10)
+            self.lang_detect_model = model_registry.get("tiny", device, compute_type, self.models_dir)
             
             # Check if main model exists locally
             model_path = os.path.join(self.models_dir, self.settings['model'])
@@ -60,17 +104,20 @@ class TranscriptionManager:
                     progress_callback(f"Downloading {self.settings['model']} model... This might take a while.", 20)
             
             # Load main model for transcription
-            if not self.whisper_model:
-                self.whisper_model = WhisperModel(
-                    self.settings["model"],
-                    device=self.settings["device"],
-                    compute_type="int8",
-                    download_root=self.models_dir
-                )
+            num_workers, cpu_threads = self._thread_config()
+            self.whisper_model = model_registry.get(
+                self.settings["model"],
+                device,
+                compute_type,
+                self.models_dir,
+                num_workers=num_workers,
+                cpu_threads=cpu_threads
+            )
+            self.loaded_model_key = self._model_key()
             
             if progress_callback:
                 progress_callback(
-                    f"Models loaded successfully (Device: {self.settings['device'].upper()})",
+                    f"Models loaded successfully (Device: {device.upper()})",
                     100
                 )
             logger.info("Models loaded successfully")
@@ -84,96 +131,78 @@ class TranscriptionManager:
 
     def download_audio(self, url: str, ffmpeg_path: str, progress_callback=None) -> str:
         """Download audio from URL and save to temporary file"""
-        temp_file = create_temp_audio_file()
-        
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'wav',
-            }],
-            'progress_hooks': [progress_callback] if progress_callback else None,
-            'ffmpeg_location': ffmpeg_path,
-            'outtmpl': temp_file
-        }
-        
+        processor = AudioProcessor(ffmpeg_path, self.settings.get("audio_extraction", "pcm"))
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-            
-            output_file = f"{temp_file}.wav"
-            if not os.path.exists(output_file):
-                raise FileNotFoundError(f"Downloaded audio file not found at {output_file}")
-                
-            # Verify file is readable
-            try:
-                with open(output_file, 'rb') as f:
-                    # Read a small chunk to verify file is readable
-                    f.read(1024)
-                    f.seek(0)
-            except Exception as e:
-                raise AudioFileError(f"Audio file is not readable: {str(e)}")
-            
-            self.temp_audio_file = output_file
-            logger.info("Audio file downloaded and verified: %s", output_file)
-            return output_file
-            
+            output_file = processor.download_audio(url, progress_callback)
         except Exception as e:
-            cleanup_temp_file(temp_file)
             error_msg = f"Error downloading or verifying audio: {str(e)}"
             logger.error(error_msg, exc_info=True)
             raise AudioFileError(error_msg) from e
 
+        self.temp_audio_file = output_file
+        logger.info("Audio file downloaded: %s", output_file)
+        return output_file
+
     def send_to_ollama(self, text: str) -> Optional[str]:
-        """Send text to Ollama for summarization"""
-        prompt = f"""
-                    Your output should use the following template:
-                    ### Summary
-                    ### Analogy
-                    ### Notes
-                    - [Emoji] Bulletpoint
-                    ### Keywords
-                    - Explanation
-                    You have been tasked with creating a concise summary of a YouTube video using its transcription.
-                    Make a summary of the transcript.
-                    Additionally make a short complex analogy to give context and/or analogy from day-to-day life from the transcript.
-                    Create 10 bullet points (each with an appropriate emoji) that summarize the key points or important moments from the video's transcription.
-                    In addition to the bullet points, extract the most important keywords and any complex words not known to the average reader as
-                    well as any acronyms mentioned. For each keyword and complex word, provide an explanation and definition based on its occurrence in the transcription.
-                    Please ensure that the summary, bullet points, and explanations fit within the 330-word limit, while still offering a comprehensive and clear understanding of the video's content.
-                    Use the text above: {text}.
-                    """
-                    
+        """
+        Send text to Ollama for summarization.
+
+        Transcripts longer than summary_chunk_tokens are summarized with
+        map-reduce, see summarizer.Summarizer.
+        """
+        with timed("summarization"):
+            return Summarizer(self.settings).summarize(text)
+
+    def load_audio(self, audio_file: str) -> np.ndarray:
+        """
+        Decode an audio file to a 16 kHz mono float32 buffer.
+
+        Args:
+            audio_file: Path to the audio file
+
+        Returns:
+            np.ndarray: Decoded samples
+
+        Raises:
+            AudioFileError: If the file cannot be decoded
+        """
         try:
-            logger.info("Sending text to Ollama for summarization")
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={
-                    "model": "mistral:latest",
-                    "prompt": prompt,
-                },
-                stream=True
-            )
-            
-            if response.status_code == 200:
-                full_response = ""
-                for line in response.iter_lines():
-                    if line:
-                        json_response = json.loads(line)
-                        if 'response' in json_response:
-                            full_response += json_response['response']
-                logger.info("Successfully received summary from Ollama")
-                return full_response
-            
-            logger.error("Failed to get response from Ollama: %s", response.status_code)
-            return None
-            
+            wav_layout = None if audio_file.endswith(PCM_EXTENSION) else wav_pcm_layout(audio_file)
+            if audio_file.endswith(PCM_EXTENSION):
+                # Already 16 kHz mono; no decoding or resampling needed
+                audio = read_pcm(audio_file)
+            elif wav_layout:
+                audio = read_pcm(audio_file, *wav_layout)
+            else:
+                from faster_whisper import decode_audio
+                audio = decode_audio(audio_file, sampling_rate=SAMPLE_RATE)
         except Exception as e:
-            logger.error("Error sending to Ollama: %s", str(e), exc_info=True)
-            return None
+            raise AudioFileError(f"Audio file could not be decoded: {str(e)}") from e
+        logger.info("Decoded %.1f seconds of audio from %s", len(audio) / SAMPLE_RATE, audio_file)
+        return audio
+
+    def stream_segments(self, progress_callback=None, start_time: float = 0.0,
+                        keep_audio: bool = False) -> Tuple[str, Iterator[dict]]:
+        """
+        Prepare the audio and start transcription, yielding segments as they are decoded.
+
+        Language detection and audio decoding happen eagerly; the returned
+        iterator then produces each segment as soon as Whisper emits it. The
+        audio file is removed once it has been decoded into memory, unless
+        keep_audio is set.
 
-    def transcribe(self, progress_callback=None) -> Tuple[str, Optional[str]]:
-        """Transcribe audio file and generate summary"""
+        Args:
+            progress_callback: Optional callback taking (message, progress)
+            start_time: Seconds of audio already transcribed (e.g. by an
+                interrupted run); transcription starts there. The language is
+                still detected on the beginning of the audio
+            keep_audio: Leave the audio file in place, e.g. so an interrupted
+                job can resume from it
+
+        Returns:
+            Tuple[str, Iterator[dict]]: The language and an iterator of
+            {'start', 'end', 'text'} segment dicts
+        """
         try:
             # Verify audio file exists and is readable
             if not self.temp_audio_file or not os.path.exists(self.temp_audio_file):
@@ -187,75 +216,329 @@ class TranscriptionManager:
             except Exception as e:
                 raise AudioFileError(f"Audio file is not readable: {str(e)}")
             
-            if not self.whisper_model or not self.lang_detect_model:
-                logger.info("Models not loaded, loading now...")
-                self.load_models(progress_callback)
+            self._ensure_models(progress_callback)
             
+            # Decode once; both models share the same buffer
             if progress_callback:
-                progress_callback("Detecting language... This will be quick...", 50)
+                progress_callback("Decoding audio...", 45)
+            with timed("decode"):
+                audio = self.load_audio(self.temp_audio_file)
             
-            logger.info("Starting language detection")
-            # First detect language using tiny model
-            segments, info = self.lang_detect_model.transcribe(
-                self.temp_audio_file,
-                beam_size=1,
-                language=None,
-                condition_on_previous_text=False,
-                vad_filter=True
-            )
+            detected_language = self._detect_language(audio, progress_callback)
+            if start_time > 0:
+                logger.info("Resuming transcription at %.1fs", start_time)
+                audio = audio[int(start_time * SAMPLE_RATE):]
+            record_audio(len(audio) / SAMPLE_RATE)
+            if not len(audio):
+                return detected_language, iter(())
             
-            detected_language = info.language
-            logger.info("Detected language: %s", detected_language)
-            if progress_callback:
-                progress_callback(f"Detected language: {detected_language}. Starting transcription...", 60)
+            parallelism = self._parallelism()
+            if parallelism > 1:
+                logger.info("Starting parallel transcription with %d workers", parallelism)
+                return detected_language, timed_iter("transcription", self._iter_parallel_segments(
+                    audio, detected_language, parallelism, progress_callback, start_time
+                ))
             
             # Now transcribe with the main model using the detected language
             logger.info("Starting main transcription")
+            # transcribe() runs the VAD eagerly; decoding happens while iterating
+            started = time.perf_counter()
             segments, info = self.whisper_model.transcribe(
-                self.temp_audio_file,
+                audio,
                 beam_size=5,
                 language=detected_language,
                 condition_on_previous_text=True,
-                vad_filter=True
+                vad_filter=True,
+                word_timestamps=self._word_timestamps()
             )
             
-            # Process segments
-            segments_list = list(segments)
-            total_segments = len(segments_list)
-            processed_text: List[str] = []
+            return detected_language, timed_iter(
+                "transcription",
+                self._iter_segments(segments, info.duration + start_time, progress_callback, start_time),
+                time.perf_counter() - started
+            )
             
-            for i, segment in enumerate(segments_list):
-                if progress_callback:
-                    progress = 70 + (i / total_segments) * 20
-                    progress_callback(f"Processing segment {i+1}/{total_segments}...", progress)
-                
-                # Format text based on settings
-                if self.settings.get("show_timestamps", True):
-                    processed_text.append(f"[{segment.start:.1f}s -> {segment.end:.1f}s] {segment.text}")
-                else:
-                    processed_text.append(segment.text)
+        except Exception as e:
+            error_msg = f"Transcription failed: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            raise TranscriptionError(error_msg) from e
             
-            # Combine results
+        finally:
+            if self.temp_audio_file and not keep_audio:
+                logger.info("Cleaning up temporary audio file")
+                cleanup_temp_file(self.temp_audio_file)
+            self.temp_audio_file = None
+
+    def stream_segments_from(self, pcm_stream: PCMStream, progress_callback=None) -> Tuple[str, Iterator[dict]]:
+        """
+        Transcribe audio while it is still being downloaded.
+
+        Audio is consumed from the stream in windows of PIPELINE_CHUNK_SECONDS.
+        Each window is cut at the start of its last speech region (i.e. in a
+        pause), transcribed, and the remainder is carried over into the next
+        window, so words are not split between windows. The language is
+        detected on the first window.
+
+        Args:
+            pcm_stream: A running stream from AudioProcessor.open_pcm_stream
+
+        Returns:
+            Tuple[str, Iterator[dict]]: The language and an iterator of segment dicts
+        """
+        try:
+            self._ensure_models(progress_callback)
             if progress_callback:
-                progress_callback("Finalizing transcription...", 90)
-            
-            final_text = "\n".join(processed_text) if self.settings.get("show_timestamps", True) else " ".join(processed_text)
+                progress_callback("Waiting for audio...", 45)
+            first_window = pcm_stream.read(PIPELINE_CHUNK_SECONDS)
+            if not len(first_window):
+                raise AudioFileError("The audio stream is empty")
+            detected_language = self._detect_language(first_window, progress_callback)
+        except Exception as e:
+            error_msg = f"Transcription failed: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            raise TranscriptionError(error_msg) from e
+
+        return detected_language, timed_iter("transcription", self._iter_stream_segments(
+            pcm_stream, first_window, detected_language, progress_callback
+        ))
+
+    def _iter_stream_segments(self, pcm_stream: PCMStream, first_window: np.ndarray, language: str,
+                              progress_callback=None) -> Iterator[dict]:
+        try:
+            pending = first_window
+            offset = 0
+            previous_text = ""
+            logger.info("Starting pipelined transcription")
+            # A window cut in a pause leaves nothing pending, but the stream goes on
+            while len(pending) or not pcm_stream.eof:
+                if not pcm_stream.eof:
+                    pending = np.concatenate([pending, pcm_stream.read(PIPELINE_CHUNK_SECONDS)])
+                if not len(pending):
+                    continue
+                cut = len(pending) if pcm_stream.eof else find_cut_point(pending)
+
+                segments, _ = self.whisper_model.transcribe(
+                    pending[:cut],
+                    beam_size=5,
+                    language=language,
+                    condition_on_previous_text=True,
+                    # Carry context across windows like Whisper does across its own 30 s windows
+                    initial_prompt=previous_text[-PROMPT_CONTEXT_CHARS:] or None,
+                    vad_filter=True,
+                    word_timestamps=self._word_timestamps()
+                )
+                start_time = offset / SAMPLE_RATE
+                for segment in segments:
+                    previous_text += segment.text
+                    yield self._to_dict(segment, start_time)
+
+                offset += cut
+                pending = pending[cut:]
+                if progress_callback:
+                    position = offset / SAMPLE_RATE
+                    if pcm_stream.duration:
+                        progress = 60 + min(position / pcm_stream.duration, 1.0) * 30
+                        progress_callback(f"Transcribing... {position:.0f}s / {pcm_stream.duration:.0f}s", progress)
+                    else:
+                        progress_callback(f"Transcribing... {position:.0f}s", None)
+            # The download may have failed after its last bytes were read
+            if pcm_stream.error:
+                raise pcm_stream.error
+            record_audio(offset / SAMPLE_RATE)
             logger.info("Transcription completed successfully")
-            
-            # Send to Ollama for summarization
+        except Exception as e:
+            error_msg = f"Transcription failed: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            raise TranscriptionError(error_msg) from e
+
+    def _ensure_models(self, progress_callback=None) -> None:
+        if self.loaded_model_key != self._model_key():
+            logger.info("Models not loaded for current settings, loading now...")
+            self.load_models(progress_callback)
+        elif not model_registry.holds(self.whisper_model, self.lang_detect_model):
+            # Evicted or replaced since the last job; holding on to them would keep them resident
+            logger.info("Models were evicted from the registry, loading them again...")
+            self.load_models(progress_callback)
+
+    def _detect_language(self, audio: np.ndarray, progress_callback=None) -> str:
+        """Return the configured language, or detect it with the tiny model"""
+        detected_language = self.settings.get("language") or None
+        if detected_language:
+            logger.info("Using configured language: %s", detected_language)
+        else:
             if progress_callback:
-                progress_callback("Sending to Ollama for summarization...", 95)
-            summary = self.send_to_ollama(final_text)
+                progress_callback("Detecting language... This will be quick...", 50)
             
-            return final_text, summary
+            logger.info("Starting language detection")
+            # First detect language using tiny model
+            with timed("language_detection"):
+                segments, info = self.lang_detect_model.transcribe(
+                    audio[:LANGUAGE_DETECTION_SECONDS * SAMPLE_RATE],
+                    beam_size=1,
+                    language=None,
+                    condition_on_previous_text=False,
+                    vad_filter=True
+                )
             
+            detected_language = info.language
+            logger.info("Detected language: %s", detected_language)
+        if progress_callback:
+            progress_callback(f"Detected language: {detected_language}. Starting transcription...", 60)
+        return detected_language
+
+    def _iter_segments(self, segments, duration: float, progress_callback=None,
+                       offset: float = 0.0) -> Iterator[dict]:
+        """Convert faster-whisper segments to dicts shifted by offset seconds while reporting progress"""
+        try:
+            for segment in segments:
+                if progress_callback and duration:
+                    position = segment.end + offset
+                    progress = 60 + min(position / duration, 1.0) * 30
+                    progress_callback(f"Transcribing... {position:.0f}s / {duration:.0f}s", progress)
+                
+                yield self._to_dict(segment, offset)
+            logger.info("Transcription completed successfully")
+        except Exception as e:
+            error_msg = f"Transcription failed: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            raise TranscriptionError(error_msg) from e
+
+    @staticmethod
+    def _to_dict(segment, offset: float = 0.0) -> dict:
+        """Convert a faster-whisper segment to a dict, shifted by offset seconds"""
+        result = {
+            'start': segment.start + offset,
+            'end': segment.end + offset,
+            'text': segment.text
+        }
+        if segment.words:
+            result['words'] = [
+                {'start': word.start + offset, 'end': word.end + offset, 'word': word.word}
+                for word in segment.words
+            ]
+        return result
+
+    def _word_timestamps(self) -> bool:
+        return bool(self.settings.get("word_timestamps", False))
+
+    def _model_key(self) -> tuple:
+        return (
+            self.settings["model"],
+            self.settings["device"],
+            effective_compute_type(self.settings),
+            self._thread_config()
+        )
+
+    def _parallelism(self) -> int:
+        return max(1, int(self.settings.get("parallelism", 1)))
+
+    def _thread_config(self) -> Tuple[int, int]:
+        """
+        Return (num_workers, cpu_threads) for the main model.
+
+        Tuned values from `main.py --autotune` are used when present; a thread
+        count tuned on another device is ignored. Parallel mode needs at least
+        one model replica per concurrent chunk; without a tuned thread count
+        the cores are then shared between the replicas.
+        """
+        parallelism = self._parallelism()
+        num_workers = max(parallelism, int(self.settings.get("num_workers", 1)))
+        cpu_threads = int(self.settings.get("cpu_threads", 0)) if tuned_for_device(self.settings) else 0
+        if not cpu_threads and num_workers > 1:
+            cpu_threads = max(1, (os.cpu_count() or 1) // num_workers)
+        return num_workers, cpu_threads
+
+    def _transcribe_chunk(self, audio: np.ndarray, start: int, end: int, language: str,
+                          offset: float = 0.0) -> List[dict]:
+        """Transcribe audio[start:end] and shift the segments to absolute timestamps (plus offset)"""
+        segments, _ = self.whisper_model.transcribe(
+            audio[start:end],
+            beam_size=5,
+            language=language,
+            condition_on_previous_text=True,
+            vad_filter=False,
+            word_timestamps=self._word_timestamps()
+        )
+        offset += start / SAMPLE_RATE
+        return [self._to_dict(segment, offset) for segment in segments]
+
+    def _iter_parallel_segments(self, audio: np.ndarray, language: str, parallelism: int,
+                                progress_callback=None, offset: float = 0.0) -> Iterator[dict]:
+        """
+        Transcribe VAD-delimited chunks concurrently and yield segments in timestamp order.
+
+        Every chunk is cut in silence, so no words are split between chunks.
+        Segments of a chunk are yielded as soon as it and all earlier chunks
+        are done. Timestamps are shifted by offset seconds.
+        """
+        duration = len(audio) / SAMPLE_RATE + offset
+        executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="whisper-chunk")
+        futures = []
+        try:
+            chunks = split_on_silence(audio, PARALLEL_CHUNK_SECONDS)
+            logger.info("Split audio into %d chunks", len(chunks))
+            futures = [
+                executor.submit(self._transcribe_chunk, audio, start, end, language, offset)
+                for start, end in chunks
+            ]
+            for (_, end), future in zip(chunks, futures):
+                yield from future.result()
+                if progress_callback and duration:
+                    chunk_end = end / SAMPLE_RATE + offset
+                    progress = 60 + min(chunk_end / duration, 1.0) * 30
+                    progress_callback(f"Transcribing... {chunk_end:.0f}s / {duration:.0f}s", progress)
+            logger.info("Transcription completed successfully")
         except Exception as e:
             error_msg = f"Transcription failed: {str(e)}"
             logger.error(error_msg, exc_info=True)
             raise TranscriptionError(error_msg) from e
-            
         finally:
-            if self.temp_audio_file:
-                logger.info("Cleaning up temporary audio file")
-                cleanup_temp_file(self.temp_audio_file)
-                self.temp_audio_file = None
+            # Drop chunks that have not started if the consumer stops early
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def transcribe_segments(self, progress_callback=None, start_time: float = 0.0,
+                            keep_audio: bool = False) -> Tuple[SegmentCollection, str]:
+        """
+        Transcribe the audio file without summarizing it.
+
+        start_time and keep_audio work as in stream_segments().
+
+        Returns:
+            Tuple[SegmentCollection, str]: The segments (from start_time on) and the language
+        """
+        language, segments = self.stream_segments(progress_callback, start_time, keep_audio)
+        return SegmentCollection.from_dicts(segments, language), language
+
+    def format_segment(self, segment: dict) -> str:
+        """Format a single segment based on the show_timestamps setting"""
+        return format_segment(segment, self.settings.get("show_timestamps", True))
+
+    def format_transcription(self, segments: Iterable[dict]) -> str:
+        """Format segments as text based on the show_timestamps setting"""
+        if not isinstance(segments, SegmentCollection):
+            segments = SegmentCollection.from_dicts(segments)
+        return segments.render("timestamped" if self.settings.get("show_timestamps", True) else "text")
+
+    def transcribe(self, progress_callback=None) -> Tuple[SegmentCollection, Optional[str]]:
+        """
+        Transcribe audio file and generate summary.
+
+        Returns:
+            Tuple[SegmentCollection, Optional[str]]: The segments, which render
+            to any output format (see segments.FORMATS), and the summary
+        """
+        segments, _ = self.transcribe_segments(progress_callback)
+        
+        # Combine results
+        if progress_callback:
+            progress_callback("Finalizing transcription...", 90)
+        final_text = self.format_transcription(segments)
+        
+        # Send to Ollama for summarization
+        if progress_callback:
+            progress_callback("Sending to Ollama for summarization...", 95)
+        summary = self.send_to_ollama(final_text)
+        
+        return segments, summary
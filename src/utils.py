@@ -9,6 +9,8 @@ Functions:
     find_ffmpeg(): Locate FFmpeg executable in system PATH
     create_temp_audio_file(): Create temporary file for audio processing
     cleanup_temp_file(temp_file): Clean up temporary files and directories
+    cleanup_temp_dir(temp_file): Remove a temporary directory with all its contents
+    available_memory_mb(): Memory available to new work, if the platform reports it
 
 Example:
     >>> from utils import find_ffmpeg, create_temp_audio_file
@@ -22,6 +24,7 @@ Example:
 import shutil
 import os
 import tempfile
+from typing import Optional
 from logger import logger
 
 def find_ffmpeg() -> str:
@@ -68,3 +71,40 @@ def cleanup_temp_file(temp_audio_file: str) -> None:
             logger.debug("Cleaned up temporary file and directory: %s", temp_audio_file)
         except Exception as e:
             logger.error("Error cleaning up temporary files: %s", str(e), exc_info=True)
+
+def cleanup_temp_dir(temp_audio_file: str) -> None:
+    """
+    Remove the temporary directory of a file together with everything in it.
+
+    Used when a download fails part-way and may have left partial files
+    with unknown extensions next to the expected output.
+
+    Args:
+        temp_audio_file: Path returned by create_temp_audio_file()
+    """
+    temp_dir = os.path.dirname(temp_audio_file) if temp_audio_file else ""
+    if temp_dir and os.path.isdir(temp_dir):
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.debug("Cleaned up temporary directory: %s", temp_dir)
+
+def available_memory_mb() -> Optional[int]:
+    """
+    Return the memory available for new work in MB.
+
+    Uses MemAvailable from /proc/meminfo (which counts reclaimable page cache)
+    and falls back to the free physical pages reported by sysconf.
+
+    Returns:
+        Optional[int]: Available memory in MB, or None if it cannot be determined
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
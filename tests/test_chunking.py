@@ -0,0 +1,37 @@
+import faster_whisper.vad
+import numpy as np
+import pytest
+from audio_processor import SAMPLE_RATE
+from chunking import find_cut_point
+
+WINDOW = 60 * SAMPLE_RATE
+
+@pytest.fixture
+def speech(monkeypatch):
+    """Speech regions the VAD reports, as (start, end) seconds"""
+    regions = []
+    monkeypatch.setattr(faster_whisper.vad, "get_speech_timestamps", lambda audio, options: [
+        {'start': int(start * SAMPLE_RATE), 'end': int(end * SAMPLE_RATE)} for start, end in regions
+    ])
+    return regions
+
+def cut() -> float:
+    return find_cut_point(np.zeros(WINDOW, dtype=np.float32)) / SAMPLE_RATE
+
+def test_speech_running_to_the_end_is_carried_over(speech):
+    speech += [(5, 20), (30, 60)]
+    assert cut() == 30
+
+def test_single_region_running_to_the_end_is_carried_over(speech):
+    speech += [(12, 60)]
+    assert cut() == 12
+
+def test_window_of_one_region_is_cut_whole(speech):
+    speech += [(0, 60)]
+    assert cut() == 60
+
+def test_window_ending_in_silence_is_cut_whole(speech):
+    speech += [(12, 50)]
+    assert cut() == 60
+    speech.clear()
+    assert cut() == 60
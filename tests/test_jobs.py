@@ -0,0 +1,219 @@
+import os
+import tempfile
+import types
+import numpy as np
+import pytest
+from audio_cache import AudioCache
+from audio_processor import AudioProcessor, SAMPLE_RATE
+from job_store import JobStore
+from jobs import Job, JobManager, JobStatus, RemoteJobManager, MAX_RUN_ATTEMPTS
+from transcript_cache import TranscriptCache
+from transcript_store import TranscriptStore
+from transcription import TranscriptionManager
+
+AUDIO_SECONDS = 20
+
+class FakeModel:
+    """Emits one segment for every two seconds of the audio it is given"""
+
+    def transcribe(self, audio, **kwargs):
+        segments = [
+            types.SimpleNamespace(start=start, end=start + 2.0, text=f" part {i}", words=None)
+            for i, start in enumerate(np.arange(0, len(audio) / SAMPLE_RATE - 1, 2.0))
+        ]
+        return iter(segments), types.SimpleNamespace(duration=len(audio) / SAMPLE_RATE)
+
+def write_audio() -> str:
+    path = os.path.join(tempfile.mkdtemp(), "audio.pcm")
+    np.full(AUDIO_SECONDS * SAMPLE_RATE, 1000, dtype="<i2").tofile(path)
+    return path
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """URLs downloaded by the pipeline; Whisper, yt-dlp and Ollama are replaced by fakes"""
+    downloaded = []
+
+    def download_audio(self, url, progress_hook=None):
+        downloaded.append(url)
+        return write_audio()
+
+    def ensure_models(self, progress_callback=None):
+        self.whisper_model = FakeModel()
+
+    monkeypatch.setattr(AudioProcessor, "download_audio", download_audio)
+    monkeypatch.setattr(AudioProcessor, "get_video_id", lambda self, url: "test:" + url)
+    monkeypatch.setattr(TranscriptionManager, "_ensure_models", ensure_models)
+    monkeypatch.setattr(TranscriptionManager, "send_to_ollama", lambda self, text: "Summary")
+    return downloaded
+
+@pytest.fixture
+def settings():
+    return {"model": "base", "device": "cpu", "language": "en", "download_concurrency": 1}
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs"))
+
+def interrupted_job(store: JobStore, url: str, checkpointed: int, keep_audio: bool = True,
+                    attempts: int = 1) -> Job:
+    """A job that a killed process left claimed, with checkpointed segments and maybe its audio"""
+    job = Job(url, store=store)
+    job.attempts = attempts
+    store.track(job.to_request())
+    for i in range(checkpointed):
+        store.append_segment(job.id, {'start': i * 2.0, 'end': i * 2.0 + 2.0, 'text': f" part {i}"})
+    if keep_audio:
+        store.keep_audio(job.id, write_audio())
+    return job
+
+def run_resumed(manager: JobManager) -> Job:
+    try:
+        [job] = manager.resume_unfinished()
+        assert job.wait(30)
+    finally:
+        manager.shutdown()
+    assert job.status == JobStatus.COMPLETED, job.error
+    return job
+
+def starts(segments) -> list:
+    return [segment['start'] for segment in segments]
+
+ALL_STARTS = [float(start) for start in range(0, AUDIO_SECONDS, 2)]
+
+def test_resumed_job_continues_after_its_checkpoint(tmp_path, store, settings, downloads):
+    interrupted = interrupted_job(store, "a", checkpointed=3)
+    manager = JobManager(str(tmp_path / "models"), settings, 1, job_store=store)
+
+    job = run_resumed(manager)
+
+    assert job.id == interrupted.id
+    assert starts(job.segments) == ALL_STARTS
+    assert starts(store.read_segments(job.id)[0]) == ALL_STARTS
+    # The kept audio was used, and the finished job is neither claimed nor holding audio
+    assert downloads == []
+    assert store.claimed_requests() == []
+    assert store.find_audio(job.id) is None
+
+def test_checkpoint_cut_off_mid_write_is_dropped(tmp_path, store, settings, downloads):
+    interrupted = interrupted_job(store, "a", checkpointed=3)
+    with open(os.path.join(store.directory, interrupted.id + ".segments.jsonl"), "a") as f:
+        f.write('{"start": 6.0, "end"')
+    manager = JobManager(str(tmp_path / "models"), settings, 1, job_store=store)
+
+    job = run_resumed(manager)
+
+    assert starts(store.read_segments(job.id)[0]) == ALL_STARTS
+
+def test_resumed_job_hitting_the_cache_does_not_repeat_segments(tmp_path, store, settings, downloads):
+    cache = TranscriptCache(str(tmp_path / "cache"), 1024 * 1024)
+    manager = JobManager(str(tmp_path / "models"), settings, 1, transcript_cache=cache, job_store=store)
+    first = manager.submit("a")
+    assert first.wait(30)
+    manager.shutdown()
+
+    interrupted_job(store, "a", checkpointed=3, keep_audio=False)
+    manager = JobManager(str(tmp_path / "models"), settings, 1, transcript_cache=cache, job_store=store)
+    job = run_resumed(manager)
+
+    assert job.result['cached']
+    assert starts(job.segments) == ALL_STARTS
+    assert starts(store.read_segments(job.id)[0]) == ALL_STARTS
+    assert downloads == ["a"]
+
+def test_resumed_job_counts_its_runs(tmp_path, store, settings, downloads):
+    interrupted_job(store, "a", checkpointed=3)
+    manager = JobManager(str(tmp_path / "models"), settings, 1, job_store=store)
+
+    job = run_resumed(manager)
+
+    assert job.attempts == 2
+
+def test_job_interrupted_too_often_is_failed(tmp_path, store, settings, downloads):
+    interrupted = interrupted_job(store, "a", checkpointed=3, attempts=MAX_RUN_ATTEMPTS)
+    manager = JobManager(str(tmp_path / "models"), settings, 1, job_store=store)
+
+    assert manager.resume_unfinished() == []
+
+    assert store.load_job(interrupted.id)['status'] == JobStatus.FAILED
+    assert store.claimed_requests() == []
+    assert store.find_audio(interrupted.id) is None
+    assert downloads == []
+
+def test_remote_manager_reports_the_inference_process_state(tmp_path, store, settings):
+    cache = TranscriptCache(str(tmp_path / "cache"), 1024 * 1024)
+    cache.get("missing")
+    manager = JobManager(str(tmp_path / "models"), settings, 1, transcript_cache=cache, job_store=store)
+    remote = RemoteJobManager(store)
+    assert remote.cache_stats() is None
+
+    store.save_status({'models': manager.models_state(), 'cache': manager.cache_stats()})
+
+    assert remote.cache_stats()['misses'] == 1
+    assert remote.cache_stats()['audio'] == {'enabled': False}
+    assert remote.models_state() == manager.models_state()
+
+def test_audio_is_cached_after_transcription(tmp_path, settings, downloads, monkeypatch):
+    audio_cache = AudioCache(str(tmp_path / "audio"), 1024 * 1024 * 1024, "pcm")
+    manager = JobManager(str(tmp_path / "models"), settings, 1, audio_cache=audio_cache)
+    stored_after = []
+    store = AudioCache.store
+
+    def record_store(self, video_id, audio_file, audio_processor):
+        stored_after.append(len(job.segments))
+        store(self, video_id, audio_file, audio_processor)
+    monkeypatch.setattr(AudioCache, "store", record_store)
+
+    job = manager.submit("a")
+    assert job.wait(30)
+    manager.shutdown()
+
+    assert job.status == JobStatus.COMPLETED, job.error
+    assert stored_after == [len(ALL_STARTS)]
+    assert audio_cache.contains("test:a")
+
+def test_word_timestamps_are_part_of_the_cache_key(tmp_path, settings, downloads):
+    cache = TranscriptCache(str(tmp_path / "cache"), 1024 * 1024)
+    for word_timestamps in (False, True, True):
+        manager = JobManager(str(tmp_path / "models"), {**settings, "word_timestamps": word_timestamps}, 1,
+                             transcript_cache=cache)
+        job = manager.submit("a")
+        assert job.wait(30)
+        manager.shutdown()
+
+    assert downloads == ["a", "a"]
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_spellings_of_one_url_are_stored_once(tmp_path, settings, downloads, monkeypatch, cached):
+    monkeypatch.setattr(AudioProcessor, "get_video_id", lambda self, url: "test:" + url.split("&")[0])
+    transcript_store = TranscriptStore(str(tmp_path / "data" / "transcripts.db"))
+    cache = TranscriptCache(str(tmp_path / "cache"), 1024 * 1024) if cached else None
+    for url in ("a", "a&t=10", "a"):
+        manager = JobManager(str(tmp_path / "models"), settings, 1, transcript_cache=cache,
+                             transcript_store=transcript_store)
+        job = manager.submit(url)
+        assert job.wait(30)
+        manager.shutdown()
+        assert job.status == JobStatus.COMPLETED, job.error
+
+    [hit] = transcript_store.search("part 0")
+    assert transcript_store.get(hit['transcript_id'])['video_id'] == "test:a"
+
+def test_shutdown_without_drain_stops_downloads_waiting_for_a_slot(tmp_path, store, settings, downloads):
+    manager = JobManager(str(tmp_path / "models"), settings, 1, job_store=store)
+    manager._ensure_started()
+    # Audio of other jobs fills every slot, so the download waits for one
+    slots = manager.download_concurrency + manager.num_workers
+    for _ in range(slots):
+        manager._prefetch_slots.acquire()
+    job = manager.submit("a", prefetch=True)
+    download_workers = list(manager._download_workers)
+
+    manager.shutdown(wait=False, drain=False)
+    for _ in range(slots):
+        manager._prefetch_slots.release()
+    for worker in download_workers:
+        worker.join(30)
+
+    assert downloads == []
+    assert job.status == JobStatus.QUEUED
+    assert [request['id'] for request in store.claimed_requests()] == [job.id]
@@ -0,0 +1,20 @@
+from metrics import registry
+from transcript_cache import TranscriptCache
+
+def lookups(result: str) -> float:
+    prefix = f'yapper_cache_lookups_total{{cache="transcripts",result="{result}"}} '
+    lines = [line for line in registry.render().splitlines() if line.startswith(prefix)]
+    return float(lines[0][len(prefix):]) if lines else 0.0
+
+def test_cache_lookups_are_a_counter(tmp_path):
+    hits, misses = lookups("hit"), lookups("miss")
+    cache = TranscriptCache(str(tmp_path), 1024 * 1024)
+
+    cache.put("a", {'segments': [], 'summary': "", 'language': "en"})
+    cache.get("a")
+    cache.get("b")
+    cache.get("c")
+
+    assert "# TYPE yapper_cache_lookups_total counter" in registry.render()
+    assert lookups("hit") == hits + 1
+    assert lookups("miss") == misses + 2
@@ -0,0 +1,45 @@
+import faster_whisper
+import pytest
+import model_registry
+from model_registry import ModelRegistry, effective_compute_type
+
+class FakeWhisperModel:
+    def __init__(self, model_name, num_workers=1, cpu_threads=0, **kwargs):
+        self.model_name = model_name
+        self.num_workers = num_workers
+
+@pytest.fixture(autouse=True)
+def fake_whisper(monkeypatch):
+    monkeypatch.setattr(faster_whisper, "WhisperModel", FakeWhisperModel)
+
+def test_thread_configurations_share_the_weights(tmp_path):
+    registry = ModelRegistry(4096)
+    model = registry.get("base", "cpu", "int8", str(tmp_path), num_workers=2, cpu_threads=4)
+
+    assert registry.get("base", "cpu", "int8", str(tmp_path), num_workers=1, cpu_threads=8) is model
+    more_workers = registry.get("base", "cpu", "int8", str(tmp_path), num_workers=4, cpu_threads=2)
+
+    assert more_workers is not model
+    assert [(entry['model'], entry['num_workers']) for entry in registry.loaded()] == [("base", 4)]
+
+def test_evicted_models_in_use_count_against_the_budget(tmp_path):
+    registry = ModelRegistry(300)
+    in_use = registry.get("base", "cpu", "int8", str(tmp_path))
+    registry.get("tiny", "cpu", "int8", str(tmp_path))
+
+    # The old base model is still in use, so the idle tiny model makes room for the new one
+    registry.get("base", "cpu", "int8", str(tmp_path), num_workers=2)
+
+    assert [(entry['model'], entry['num_workers']) for entry in registry.loaded()] == [("base", 2)]
+    assert registry.retained_mb() == ModelRegistry.estimate_mb("base", "int8")
+    del in_use
+    assert registry.retained_mb() == 0
+
+def test_compute_type_tuned_on_another_device_is_ignored(monkeypatch):
+    monkeypatch.setattr(model_registry, "supported_compute_types", lambda device: ["int8", "float32"])
+    tuned = {"device": "cuda", "compute_type": "float16", "tuned_device": "cuda"}
+
+    assert effective_compute_type(tuned) == "float16"
+    assert effective_compute_type({**tuned, "device": "cpu"}) == "int8"
+    # Settings from before the device was saved with the tuned values
+    assert effective_compute_type({"device": "cpu", "compute_type": "float32"}) == "float32"
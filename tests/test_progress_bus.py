@@ -0,0 +1,71 @@
+import threading
+from progress_bus import ProgressBus
+
+class FakeRoot:
+    """Runs after() callbacks only when the test draws a frame"""
+
+    def __init__(self):
+        self.scheduled = None
+
+    def after(self, delay_ms, callback):
+        self.scheduled = callback
+        return "after-id"
+
+    def after_cancel(self, after_id):
+        self.scheduled = None
+
+    def frame(self):
+        callback, self.scheduled = self.scheduled, None
+        callback()
+
+def test_notifications_between_frames_run_the_handler_once():
+    root = FakeRoot()
+    bus = ProgressBus(root)
+    bus.start()
+    calls = []
+    refresh = lambda: calls.append("refresh")
+
+    def post():
+        for _ in range(100):
+            bus.notify(refresh)
+
+    threads = [threading.Thread(target=post) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    root.frame()
+    assert calls == ["refresh"]
+
+    root.frame()
+    assert calls == ["refresh"]
+    bus.notify(refresh)
+    root.frame()
+    assert calls == ["refresh", "refresh"]
+
+def test_calls_run_in_order_after_earlier_notifications():
+    root = FakeRoot()
+    bus = ProgressBus(root)
+    bus.start()
+    calls = []
+    refresh = lambda: calls.append("refresh")
+
+    bus.notify(refresh)
+    bus.call(calls.append, "attach")
+    bus.notify(refresh)
+    root.frame()
+
+    assert calls == ["refresh", "attach", "refresh"]
+
+def test_a_failing_handler_does_not_stop_the_bus():
+    root = FakeRoot()
+    bus = ProgressBus(root)
+    bus.start()
+    calls = []
+
+    bus.call(lambda: 1 / 0)
+    bus.call(calls.append, "next")
+    root.frame()
+
+    assert calls == ["next"]
+    assert root.scheduled is not None
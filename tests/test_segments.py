@@ -0,0 +1,20 @@
+import random
+from segments import SegmentCollection
+
+def test_texts_survive_interleaved_appends_and_reads():
+    random.seed(1)
+    segments = SegmentCollection()
+    expected = []
+    for i in range(2000):
+        text = "" if i % 7 == 0 else f" part {i}" * random.randint(1, 5)
+        words = [{'start': float(i), 'end': i + 0.5, 'word': word} for word in text.split()]
+        segments.append(float(i), i + 1.0, text, words)
+        expected.append((text, text.split()))
+        # Reads between appends join only what was appended since the last read
+        if random.random() < 0.5:
+            index = random.randrange(len(segments))
+            assert segments.text(index) == expected[index][0]
+
+    assert [segment['text'] for segment in segments] == [text for text, _ in expected]
+    assert [[word['word'] for word in segment['words']] for segment in segments] == [words for _, words in expected]
+    assert len(segments._texts._chunks) <= 12
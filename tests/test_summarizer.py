@@ -0,0 +1,71 @@
+import pytest
+from ollama_stub import OllamaStub, CANNED_SUMMARY
+from summarizer import (Summarizer, CHUNK_PROMPT, REDUCE_HEADER, TERSE_CHUNK_PROMPT, context_tokens,
+                        estimate_tokens, split_into_chunks)
+
+@pytest.fixture
+def stub():
+    with OllamaStub() as stub:
+        yield stub
+
+@pytest.fixture
+def settings(stub):
+    return {
+        "ollama_host": stub.url,
+        "ollama_retries": 0,
+        "summary_chunk_tokens": 500,
+        "summary_concurrency": 3,
+    }
+
+def transcript(lines: int) -> str:
+    return "\n".join(f"[{i * 5}.0s -> {i * 5 + 5}.0s] Sentence number {i} of the talk about neural networks."
+                     for i in range(lines))
+
+def test_long_transcript_is_summarized_chunk_by_chunk(stub, settings):
+    text = transcript(400)
+    chunks = split_into_chunks(text, 500)
+    assert len(chunks) > 1
+
+    summary = Summarizer(settings).summarize(text)
+
+    assert summary.strip() == CANNED_SUMMARY.strip()
+    *maps, final = stub.received
+    assert len(maps) == len(chunks)
+    assert sorted(request["prompt"] for request in maps) == sorted(
+        CHUNK_PROMPT.format(index=i + 1, total=len(chunks), text=chunk) for i, chunk in enumerate(chunks)
+    )
+    assert REDUCE_HEADER in final["prompt"]
+
+def test_every_prompt_fits_the_requested_context(stub, settings):
+    Summarizer(settings).summarize(transcript(400))
+
+    for request in stub.received:
+        assert request["options"]["num_ctx"] == context_tokens(settings)
+        assert estimate_tokens(request["prompt"]) < request["options"]["num_ctx"]
+
+def test_context_grows_with_the_chunk_size():
+    assert context_tokens({"summary_chunk_tokens": 3000}) > 2048
+    assert context_tokens({"summary_chunk_tokens": 8000}) > 8000
+
+def test_short_transcript_is_summarized_in_one_request(stub, settings):
+    assert Summarizer(settings).summarize(transcript(5)).strip() == CANNED_SUMMARY.strip()
+    assert len(stub.received) == 1
+
+def test_summaries_that_do_not_shrink_fail_the_summary(settings, monkeypatch):
+    summarizer = Summarizer(settings)
+    # A model that repeats its input never gets the text under the budget
+    monkeypatch.setattr(summarizer, "generate", lambda prompt: prompt)
+
+    assert summarizer.summarize(transcript(400)) is None
+
+def test_summaries_that_do_not_shrink_are_retried_with_a_stricter_prompt(settings, monkeypatch):
+    summarizer = Summarizer(settings)
+    terse_prompt = TERSE_CHUNK_PROMPT.split("{index}")[0]
+    # Only the stricter prompt gets a short answer
+    monkeypatch.setattr(summarizer, "generate",
+                        lambda prompt: "Short part." if prompt.startswith(terse_prompt) else prompt)
+
+    reduced = summarizer.reduce_to_budget(transcript(400))
+
+    assert reduced is not None
+    assert set(reduced.split("\n\n")) == {"Short part."}
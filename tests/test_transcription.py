@@ -0,0 +1,131 @@
+import os
+import tempfile
+import threading
+import types
+import numpy as np
+import pytest
+import transcription
+from audio_processor import PCMStream, SAMPLE_RATE
+from transcription import TranscriptionManager, TranscriptionError
+
+def speech_regions(audio: np.ndarray) -> list:
+    """(start, end) sample offsets of the non-silent stretches of audio"""
+    voiced = np.concatenate([[0], (audio != 0).astype(np.int8), [0]])
+    edges = np.flatnonzero(np.diff(voiced))
+    return list(zip(edges[::2], edges[1::2]))
+
+def fake_cut_point(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> int:
+    # Same rules as chunking.find_cut_point, with silence instead of Silero VAD
+    speech = speech_regions(audio)
+    if not speech or len(audio) - speech[-1][1] > sample_rate // 2:
+        return len(audio)
+    return speech[-1][0] or len(audio)
+
+class FakeModel:
+    """Emits one segment per speech region of the audio it is given"""
+
+    def transcribe(self, audio, **kwargs):
+        segments = [
+            types.SimpleNamespace(start=start / SAMPLE_RATE, end=end / SAMPLE_RATE, text=" speech", words=None)
+            for start, end in speech_regions(audio)
+        ]
+        return iter(segments), types.SimpleNamespace(duration=len(audio) / SAMPLE_RATE)
+
+class FakeStream:
+    """A PCMStream whose download has already finished"""
+
+    def __init__(self, audio: np.ndarray):
+        self.audio = audio
+        self.duration = len(audio) / SAMPLE_RATE
+        self.position = 0
+        self.error = None
+
+    @property
+    def eof(self) -> bool:
+        return self.position >= len(self.audio)
+
+    def read(self, seconds: float) -> np.ndarray:
+        window = self.audio[self.position:self.position + int(seconds * SAMPLE_RATE)]
+        self.position += len(window)
+        return window
+
+class FakeProcess:
+    """The last process of a `yt-dlp | ffmpeg` pipeline, writing PCM into a pipe"""
+
+    def __init__(self, returncode: int):
+        read_fd, self.write_fd = os.pipe()
+        self.stdout = os.fdopen(read_fd, "rb")
+        self.returncode = returncode
+        self.exited = threading.Event()
+
+    def send(self, audio: np.ndarray, extra: bytes = b"") -> None:
+        os.write(self.write_fd, (audio * 32768).astype("<i2").tobytes() + extra)
+
+    def exit(self) -> None:
+        os.close(self.write_fd)
+        self.exited.set()
+
+    def wait(self) -> int:
+        self.exited.wait()
+        return self.returncode
+
+    def poll(self):
+        return self.returncode if self.exited.is_set() else None
+
+    def kill(self) -> None:
+        self.exit()
+
+def pcm_stream(tmp_path, process: FakeProcess) -> PCMStream:
+    return PCMStream([process], [tempfile.TemporaryFile()], str(tmp_path / "stream.pcm"))
+
+def wait_finished(stream: PCMStream) -> None:
+    with stream._condition:
+        assert stream._condition.wait_for(lambda: stream._finished, 10)
+
+def speech_with_pauses(seconds: int, speech: int = 20, pause: int = 10) -> np.ndarray:
+    audio = np.zeros(seconds * SAMPLE_RATE, dtype=np.float32)
+    for start in range(0, seconds, speech + pause):
+        audio[start * SAMPLE_RATE:(start + speech) * SAMPLE_RATE] = 0.1
+    return audio
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(transcription, "find_cut_point", fake_cut_point)
+    manager = TranscriptionManager("models", {"model": "base", "device": "cpu"})
+    manager.whisper_model = FakeModel()
+    return manager
+
+def test_stream_with_pauses_is_transcribed_to_the_end(manager):
+    stream = FakeStream(speech_with_pauses(600))
+    segments = list(manager._iter_stream_segments(stream, stream.read(60), "en"))
+
+    assert [segment['start'] for segment in segments] == [float(start) for start in range(0, 600, 30)]
+    assert segments[-1]['end'] == 590.0
+
+def test_download_failing_after_the_last_read_fails_the_transcription(manager, tmp_path):
+    process = FakeProcess(returncode=1)
+    stream = pcm_stream(tmp_path, process)
+    process.send(speech_with_pauses(60))
+    first_window = stream.read(60)
+    process.exit()
+    wait_finished(stream)
+
+    with pytest.raises(TranscriptionError):
+        list(manager._iter_stream_segments(stream, first_window, "en"))
+    stream.close()
+
+def test_stream_ending_in_half_a_sample_finishes(manager, tmp_path):
+    process = FakeProcess(returncode=0)
+    stream = pcm_stream(tmp_path, process)
+    process.send(speech_with_pauses(90), extra=b"\x00")
+    process.exit()
+    segments = []
+    reader = threading.Thread(
+        target=lambda: segments.extend(manager._iter_stream_segments(stream, stream.read(60), "en")), daemon=True
+    )
+    reader.start()
+    reader.join(10)
+
+    assert not reader.is_alive()
+    assert [segment['start'] for segment in segments] == [0.0, 30.0, 60.0]
+    stream.close()